@@ -1,16 +1,1252 @@
 # api.py
+import base64
+import contextvars
+import hashlib
 import json
 import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 
 import requests
 import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 base_url = os.getenv("API_URL")
 
 load_dotenv()
 
 
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# =============================================================================
+# POOL DE CONEXÕES (KEEP-ALIVE) COMPARTILHADO ENTRE SESSÕES
+# =============================================================================
+
+# Configuração do pool lida do ambiente; ver .env.example
+POOL_CONFIG = {
+    "enabled": _env_bool("API_POOLING", True),
+    # Quantidade de hosts distintos com pool próprio mantido em memória
+    "pool_connections": _env_int("API_POOL_CONNECTIONS", 4),
+    # Máximo de conexões keep-alive por host
+    "pool_maxsize": _env_int("API_POOL_MAXSIZE", 20),
+    # Se True, o limite por host é rígido (requisições aguardam conexão livre)
+    "pool_block": _env_bool("API_POOL_BLOCK", False),
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONFIG["pool_connections"],
+        pool_maxsize=POOL_CONFIG["pool_maxsize"],
+        pool_block=POOL_CONFIG["pool_block"],
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def get_session():
+    """
+    Retorna a requests.Session única do processo.
+
+    A sessão é criada sob demanda e reutilizada por todas as sessões do
+    Streamlit, de modo que as conexões TCP/TLS com o backend permanecem
+    abertas (keep-alive) entre reruns e entre usuários.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def configure_pool(**overrides):
+    """
+    Altera a configuração do pool (enabled, pool_connections, pool_maxsize,
+    pool_block) e descarta a sessão atual para que a próxima chamada use
+    os novos valores.
+    """
+    global _session
+    unknown = set(overrides) - set(POOL_CONFIG)
+    if unknown:
+        raise ValueError(f"Opções de pool desconhecidas: {sorted(unknown)}")
+    with _session_lock:
+        POOL_CONFIG.update(overrides)
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _send(method, url, **kwargs):
+    _count("backend_calls")
+    kwargs["headers"] = {"Accept-Encoding": ACCEPT_ENCODING, **(kwargs.get("headers") or {})}
+    if POOL_CONFIG["enabled"]:
+        response = get_session().request(method, url, **kwargs)
+    else:
+        response = requests.request(method, url, **kwargs)
+    if not kwargs.get("stream"):
+        _record_transfer(url, response)
+    authorization = kwargs["headers"].get("Authorization") or ""
+    if authorization.startswith("Bearer "):
+        _mark_token(authorization[len("Bearer "):], response.status_code)
+    return response
+
+
+# =============================================================================
+# CONTADORES DO CLIENTE
+# =============================================================================
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] = _stats.get(name, 0) + amount
+
+
+def get_client_stats():
+    """
+    Retorna um snapshot dos contadores do cliente HTTP.
+
+    - backend_calls: requisições efetivamente enviadas ao backend
+    - singleflight_saved: chamadas atendidas por uma requisição idêntica
+      que já estava em andamento (não chegaram ao backend)
+    - revalidated_304: GETs condicionais respondidos com 304 (corpo servido
+      do cache local, sem download nem novo parse de JSON)
+    - validators_stored: respostas 200 guardadas com ETag/Last-Modified
+    - retries: novas tentativas após 429/5xx transitório ou falha de conexão
+    - retry_giveups: chamadas que esgotaram tentativas ou orçamento de tempo
+    - circuit_short_circuits: chamadas recusadas na hora com o circuito aberto
+    - circuit_stale_served: dessas, as atendidas com o último corpo guardado
+    - deadline_degraded: chamadas puladas ou interrompidas pelo prazo da página
+    - negative_served: GETs respondidos com um 404/5xx recente guardado
+      (cache negativo), sem ir ao backend
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_client_stats():
+    with _stats_lock:
+        _stats.clear()
+        _transfer.clear()
+
+
+# =============================================================================
+# ESTATÍSTICAS DOS CACHES
+# =============================================================================
+
+CACHE_EVENTS = ("hits", "misses", "stale", "evictions")
+
+
+class CacheStats:
+    """
+    Contadores de um cache, por chave de detalhamento (família de
+    endpoints, tag, estação...):
+
+    - hits: servido do cache
+    - misses: não havia entrada utilizável; foi buscado
+    - stale: servido vencido ou guardado no lugar de uma busca que falhou
+      ou ficou para depois (circuito aberto, stale-while-revalidate)
+    - evictions: entradas removidas por limite, validade ou invalidação
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_key = {}
+
+    def record(self, event, key="", amount=1):
+        with self._lock:
+            counts = self._by_key.setdefault(key, dict.fromkeys(CACHE_EVENTS, 0))
+            counts[event] += amount
+
+    def snapshot(self, sizes=None):
+        """
+        Totais + by_key. Com sizes ([(chave, bytes)] das entradas atuais),
+        acrescenta entries e bytes no total e por chave.
+        """
+        with self._lock:
+            by_key = {key: dict(counts) for key, counts in self._by_key.items()}
+        totals = {event: sum(c[event] for c in by_key.values()) for event in CACHE_EVENTS}
+        if sizes is not None:
+            totals["entries"] = totals["bytes"] = 0
+            for key, size in sizes:
+                counts = by_key.setdefault(key, dict.fromkeys(CACHE_EVENTS, 0))
+                counts["entries"] = counts.get("entries", 0) + 1
+                counts["bytes"] = counts.get("bytes", 0) + size
+                totals["entries"] += 1
+                totals["bytes"] += size
+        return dict(totals, by_key=by_key)
+
+    def reset(self):
+        with self._lock:
+            self._by_key.clear()
+
+
+_caches = {}
+
+
+def register_cache(name, cache):
+    """
+    Registra um cache no painel de observabilidade. O cache expõe
+    .counters (CacheStats) e cache_stats(), que devolve o snapshot dos
+    contadores com entries e bytes (aproximados) das entradas atuais.
+    """
+    with _stats_lock:
+        _caches[name] = cache
+
+
+def get_cache_stats():
+    """{nome: estatísticas} de todos os caches registrados, com hit_ratio."""
+    with _stats_lock:
+        caches = dict(_caches)
+    stats = {}
+    for name, cache in caches.items():
+        entry = cache.cache_stats()
+        for counts in [entry] + list(entry.get("by_key", {}).values()):
+            lookups = counts.get("hits", 0) + counts.get("stale", 0) + counts.get("misses", 0)
+            served = counts.get("hits", 0) + counts.get("stale", 0)
+            counts["hit_ratio"] = round(served / lookups, 3) if lookups else None
+        stats[name] = entry
+    return stats
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.counters.reset()
+
+
+# =============================================================================
+# TRANSFERÊNCIA COMPRIMIDA
+# =============================================================================
+
+# Negociado explicitamente em todas as chamadas (pooled ou não)
+ACCEPT_ENCODING = "gzip, deflate"
+
+_transfer = {}
+
+
+def _wire_bytes(response):
+    # urllib3 conta os bytes lidos do socket, antes da descompressão
+    raw = getattr(response, "raw", None)
+    tell = getattr(raw, "tell", None)
+    try:
+        value = tell() if tell else None
+    except Exception:
+        return None
+    return value if isinstance(value, int) else None
+
+
+def _record_transfer(url, response, decoded=None):
+    if decoded is None:
+        content = getattr(response, "_content", None)
+        if not isinstance(content, bytes):
+            return
+        decoded = len(content)
+    wire = _wire_bytes(response)
+    if wire is None:
+        wire = decoded
+    family = endpoint_family(url)
+    with _stats_lock:
+        entry = _transfer.setdefault(
+            family, {"responses": 0, "wire_bytes": 0, "decoded_bytes": 0}
+        )
+        entry["responses"] += 1
+        entry["wire_bytes"] += wire
+        entry["decoded_bytes"] += decoded
+
+
+def record_streamed_transfer(response, decoded_bytes):
+    """
+    Contabiliza uma resposta stream=True depois que quem chamou leu o corpo
+    (ex.: spool_export): _send não vê esses bytes.
+    """
+    _record_transfer(response.url, response, decoded=decoded_bytes)
+
+
+def get_transfer_stats():
+    """
+    Bytes recebidos por família de endpoints: wire_bytes (como vieram pela
+    rede, comprimidos ou não) e decoded_bytes (corpo após descompressão).
+    """
+    with _stats_lock:
+        stats = {family: dict(entry) for family, entry in _transfer.items()}
+    for entry in stats.values():
+        entry["ratio"] = round(entry["decoded_bytes"] / entry["wire_bytes"], 2) if entry["wire_bytes"] else None
+    return stats
+
+
+# =============================================================================
+# PRAZO (DEADLINE) DA PÁGINA PROPAGADO ÀS CHAMADAS
+# =============================================================================
+
+# Prazo padrão de uma página aberta com page_deadline() (s)
+PAGE_DEADLINE_SECONDS = _env_float("API_PAGE_DEADLINE", 4.0)
+# Abaixo disso não vale a pena abrir a chamada: serve cache ou pula
+DEADLINE_MIN_CALL_SECONDS = 0.2
+
+_current_deadline = contextvars.ContextVar("api_deadline", default=None)
+
+
+class Deadline:
+    """
+    Orçamento de tempo de uma página. Registra os endpoints que foram
+    pulados ou interrompidos para que a página saiba o que está degradado.
+    """
+
+    def __init__(self, seconds, label=None, expires_at=None):
+        self.seconds = seconds
+        self.label = label
+        self.expires_at = expires_at if expires_at is not None else time.monotonic() + seconds
+        self.degraded = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def mark_degraded(self, endpoint):
+        with self._lock:
+            if endpoint not in self.degraded:
+                self.degraded.append(endpoint)
+
+    def is_degraded(self, endpoint_prefix=""):
+        with self._lock:
+            return any(e.startswith(endpoint_prefix) for e in self.degraded)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """
+    Timeout encurtado pelo prazo da página: quem esgotou foi a página, não
+    o backend, então o circuit breaker não conta a falha.
+    """
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+@contextmanager
+def page_deadline(seconds=None, label=None):
+    """
+    Abre um prazo para tudo o que for chamado dentro do bloco:
+
+        with api.page_deadline(4, "Consumos") as deadline:
+            ...
+        if deadline.degraded: ...
+
+    Cada api_request recebe como timeout apenas o tempo restante; chamadas
+    que não cabem mais são puladas (servindo o último corpo guardado,
+    quando houver). Prazos aninhados nunca estendem o prazo externo.
+    """
+    seconds = PAGE_DEADLINE_SECONDS if seconds is None else seconds
+    expires_at = time.monotonic() + seconds
+    outer = _current_deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer.expires_at)
+    deadline = Deadline(seconds, label, expires_at)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+        if outer is not None:
+            for endpoint in deadline.degraded:
+                outer.mark_degraded(endpoint)
+
+
+# =============================================================================
+# RETRY COM BACKOFF EXPONENCIAL, JITTER E RETRY-AFTER
+# =============================================================================
+
+RETRY_CONFIG = {
+    # Novas tentativas além da primeira
+    "max_retries": _env_int("API_RETRY_MAX", 3),
+    # Base e teto do backoff exponencial (segundos)
+    "backoff_base": _env_float("API_RETRY_BACKOFF", 0.25),
+    "backoff_max": _env_float("API_RETRY_BACKOFF_MAX", 2.0),
+    # Tempo total que uma chamada pode gastar entre tentativas e esperas;
+    # um Retry-After maior que o restante encerra as tentativas na hora
+    "budget": _env_float("API_RETRY_BUDGET", 5.0),
+    # Orçamento das chamadas que seguram a renderização (thread do script
+    # do Streamlit ou tarefas que ela aguarda): a espera não aparece na tela
+    "script_budget": _env_float("API_RETRY_SCRIPT_BUDGET", 1.0),
+}
+
+# Só métodos idempotentes são repetidos (POST pode ter sido processado)
+RETRY_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+RETRY_STATUSES = (429, 502, 503, 504)
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def configure_retry(**overrides):
+    """Altera max_retries, backoff_base, backoff_max, budget ou script_budget."""
+    unknown = set(overrides) - set(RETRY_CONFIG)
+    if unknown:
+        raise ValueError(f"Opções de retry desconhecidas: {sorted(unknown)}")
+    RETRY_CONFIG.update(overrides)
+
+
+def retry_after_seconds(response):
+    """Segundos pedidos pelo cabeçalho Retry-After (número ou data HTTP)."""
+    if response is None:
+        return None
+    value = (response.headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+# Tarefa do pool que a thread do script aguarda (task_context)
+_script_waits = contextvars.ContextVar("api_script_waits", default=False)
+
+
+def blocks_script():
+    """
+    True se a chamada segura a renderização: roda na thread do script do
+    Streamlit ou numa tarefa do pool criada com task_context() por ela.
+    """
+    return _script_waits.get() or get_script_run_ctx(suppress_warning=True) is not None
+
+
+def task_context():
+    """
+    Cópia do contexto atual (prazo da página incluído) para uma tarefa do
+    pool. Criada na thread do script, a tarefa também usa o orçamento de
+    retry menor, já que o script fica esperando por ela.
+    """
+    context = contextvars.copy_context()
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        context.run(_script_waits.set, True)
+    return context
+
+
+def _backoff_delay(attempt, response):
+    retry_after = retry_after_seconds(response)
+    if retry_after is not None:
+        return retry_after
+    # "Full jitter": espalha as novas tentativas de várias sessões
+    ceiling = min(RETRY_CONFIG["backoff_max"], RETRY_CONFIG["backoff_base"] * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+def _send_within_deadline(method, url, timeout=None, **kwargs):
+    """
+    Uma tentativa, com o timeout limitado ao que resta do prazo da página.
+    Se o timeout encurtado estoura, levanta DeadlineExceeded.
+    """
+    page = current_deadline()
+    if page is None:
+        return _send(method, url, timeout=timeout, **kwargs)
+    remaining = page.remaining()
+    capped = timeout is None or remaining < timeout
+    try:
+        return _send(method, url, timeout=remaining if capped else timeout, **kwargs)
+    except requests.exceptions.Timeout as e:
+        if capped:
+            raise DeadlineExceeded(f"prazo da página esgotado: {e}") from e
+        raise
+
+
+def _send_with_retry(method, url, **kwargs):
+    """
+    Envia a requisição repetindo falhas transitórias.
+
+    A espera nunca ultrapassa o orçamento da chamada: se o próximo
+    backoff (ou o Retry-After do servidor) não cabe no tempo restante,
+    a última resposta/erro é devolvida imediatamente. Chamadas que seguram
+    a renderização (blocks_script) usam script_budget em vez de budget.
+    Dentro de page_deadline cada tentativa recebe só o tempo que ainda
+    resta, e não há nova tentativa se depois do backoff sobrar menos que
+    DEADLINE_MIN_CALL_SECONDS.
+    """
+    if method.upper() not in RETRY_METHODS:
+        return _send_within_deadline(method, url, **kwargs)
+
+    budget = RETRY_CONFIG["script_budget"] if blocks_script() else RETRY_CONFIG["budget"]
+    deadline = time.monotonic() + budget
+    page = current_deadline()
+    if page is not None:
+        deadline = min(deadline, page.expires_at - DEADLINE_MIN_CALL_SECONDS)
+    attempt = 0
+    while True:
+        error = response = None
+        try:
+            response = _send_within_deadline(method, url, **kwargs)
+        except RETRY_EXCEPTIONS as e:
+            error = e
+        if error is None and response.status_code not in RETRY_STATUSES:
+            return response
+
+        attempt += 1
+        delay = _backoff_delay(attempt, response)
+        if attempt > RETRY_CONFIG["max_retries"] or time.monotonic() + delay > deadline:
+            _count("retry_giveups")
+            if error is not None:
+                raise error
+            return response
+
+        _count("retries")
+        if response is not None:
+            response.close()
+        time.sleep(delay)
+
+
+# =============================================================================
+# CIRCUIT BREAKER POR FAMÍLIA DE ENDPOINTS
+# =============================================================================
+
+BREAKER_CONFIG = {
+    # Falhas consecutivas (após as novas tentativas) que abrem o circuito
+    "failure_threshold": _env_int("API_BREAKER_FAILURES", 5),
+    # Tempo com o circuito aberto até liberar uma chamada de teste (s)
+    "open_seconds": _env_float("API_BREAKER_OPEN_SECONDS", 30.0),
+}
+
+# Respostas que indicam backend fora do ar (4xx é erro do chamador)
+BREAKER_STATUSES = (500, 502, 503, 504)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Chamada recusada sem ir à rede porque o circuito está aberto."""
+
+    def __init__(self, family, retry_in):
+        super().__init__(f"circuito aberto para /api/{family}")
+        self.family = family
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Estados: closed (normal) -> open (falha rápida) -> half_open (uma
+    chamada de teste). Sucesso no teste fecha o circuito; falha reabre.
+    """
+
+    def __init__(self, family, failure_threshold=None, open_seconds=None, clock=time.monotonic):
+        self.family = family
+        self.failure_threshold = failure_threshold or BREAKER_CONFIG["failure_threshold"]
+        self.open_seconds = open_seconds or BREAKER_CONFIG["open_seconds"]
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def retry_in(self):
+        if self.state != CIRCUIT_OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_seconds - self._clock())
+
+    def allow(self):
+        with self._lock:
+            if self.state == CIRCUIT_OPEN and self.retry_in() <= 0:
+                self.state = CIRCUIT_HALF_OPEN
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+                return True
+            return self.state == CIRCUIT_CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CIRCUIT_OPEN
+                self.opened_at = self._clock()
+            self._probing = False
+
+    def release(self):
+        """Encerra uma chamada de teste sem veredito (erro local, não do backend)."""
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "retry_in": round(self.retry_in(), 1),
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def endpoint_family(url):
+    """/api/monitoring-stations/3/sensors -> "monitoring-stations"."""
+    parts = [p for p in urlsplit(url).path.split("/") if p]
+    if parts and parts[0] == "api":
+        parts = parts[1:]
+    return parts[0] if parts else ""
+
+
+def get_breaker(url):
+    family = endpoint_family(url)
+    with _breakers_lock:
+        breaker = _breakers.get(family)
+        if breaker is None:
+            breaker = _breakers[family] = CircuitBreaker(family)
+        return breaker
+
+
+def get_circuit_states():
+    """Estado de cada família de endpoints já chamada neste processo."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.family: b.snapshot() for b in breakers}
+
+
+def is_api_degraded():
+    """True se algum circuito está aberto ou em teste (consulta sem rede)."""
+    return any(s["state"] != CIRCUIT_CLOSED for s in get_circuit_states().values())
+
+
+def reset_circuits():
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def _send_guarded(method, url, headers, fallback=None, **kwargs):
+    """
+    Envia pela família de endpoints correspondente. Com o circuito aberto
+    a chamada falha na hora; GETs com corpo guardado (fallback) da mesma
+    identidade de quem chama (_cache_identity) recebem esse corpo em vez
+    do erro. Corpo de outra identidade nunca é servido: CircuitOpenError.
+    """
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        _count("circuit_short_circuits")
+        if fallback is not None and fallback.identity == _cache_identity(headers):
+            _count("circuit_stale_served")
+            return CachedResponse(fallback, None, from_cache=True)
+        raise CircuitOpenError(breaker.family, breaker.retry_in())
+
+    try:
+        response = _send_with_retry(method, url, headers=headers, **kwargs)
+    except DeadlineExceeded:
+        # Timeout cortado pelo prazo da página: sem veredito sobre o backend
+        breaker.release()
+        raise
+    except RETRY_EXCEPTIONS:
+        breaker.record_failure()
+        raise
+    except Exception:
+        breaker.release()
+        raise
+
+    if response.status_code in BREAKER_STATUSES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+# =============================================================================
+# SINGLE-FLIGHT: COALESCÊNCIA DE GETs IDÊNTICOS EM ANDAMENTO
+# =============================================================================
+
+COALESCED_METHODS = ("GET", "HEAD")
+
+
+class _InFlightCall:
+    __slots__ = ("done", "response", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Garante no máximo uma chamada em andamento por chave.
+
+    Quem chega enquanto a chamada líder está em andamento aguarda e recebe
+    o mesmo resultado (ou a mesma exceção), sem gerar nova requisição.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+
+        if not leader:
+            page = current_deadline()
+            if not call.done.wait(page.remaining() if page is not None else None):
+                raise requests.exceptions.Timeout(
+                    "prazo da página esgotado aguardando chamada idêntica"
+                )
+            _count("singleflight_saved")
+            if call.error is not None:
+                raise call.error
+            return call.response
+
+        try:
+            call.response = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.response
+
+
+_singleflight = SingleFlight()
+
+
+def _request_key(method, url, headers, kwargs):
+    """
+    Chave de coalescência, ou None se a requisição não pode ser compartilhada
+    (método não idempotente, corpo, upload ou resposta em streaming).
+    """
+    if method.upper() not in COALESCED_METHODS:
+        return None
+    if any(kwargs.get(k) is not None for k in ("data", "json", "files")):
+        return None
+    if kwargs.get("stream"):
+        return None
+    prepared_url = requests.Request(method, url, params=kwargs.get("params")).prepare().url
+    # No lugar do Authorization entra a identidade (_cache_identity):
+    # operadores com o mesmo escopo de token compartilham a chamada; tokens
+    # sem escopo só com o mesmo token; escopos diferentes nunca.
+    others = tuple(sorted((k, v) for k, v in headers.items() if k != "Authorization"))
+    return (method.upper(), prepared_url, _cache_identity(headers), others)
+
+
+def _send_coalesced(method, url, headers, **kwargs):
+    key = _request_key(method, url, headers, kwargs)
+    if key is None:
+        return _send_conditional(method, url, headers, **kwargs)
+    return _singleflight.do(
+        key, lambda: _send_conditional(method, url, headers, **kwargs)
+    )
+
+
+# =============================================================================
+# REVALIDAÇÃO CONDICIONAL (ETag / Last-Modified)
+# =============================================================================
+
+# Orçamento total de corpos guardados para revalidação (bytes)
+CONDITIONAL_CACHE_BYTES = _env_int("API_CONDITIONAL_CACHE_BYTES", 16 * 1024 * 1024)
+
+
+class _ValidatedEntry:
+    """Última resposta 200 de uma URL para uma identidade, com seus validadores."""
+
+    def __init__(self, response, identity=None):
+        self.identity = identity
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.content = response.content
+        self.headers = dict(response.headers)
+        self.encoding = response.encoding
+        self._parsed = None
+        self._parsed_ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return len(self.content)
+
+    def json(self):
+        # JSON decodificado uma única vez por entrada; deve ser tratado
+        # como somente leitura pelos chamadores.
+        if not self._parsed_ready:
+            with self._lock:
+                if not self._parsed_ready:
+                    self._parsed = json.loads(self.content)
+                    self._parsed_ready = True
+        return self._parsed
+
+
+class CachedResponse(requests.Response):
+    """
+    Resposta 200 montada a partir de uma entrada do cache de validadores.
+
+    from_cache=True indica que o corpo não veio pela rede (304 ou
+    circuito aberto).
+    """
+
+    def __init__(self, entry, origin, from_cache):
+        super().__init__()
+        self.status_code = 200
+        self.reason = "OK"
+        self._content = entry.content
+        self._content_consumed = True
+        self.headers = CaseInsensitiveDict(entry.headers)
+        self.encoding = entry.encoding
+        self.url = getattr(origin, "url", None)
+        self.request = getattr(origin, "request", None)
+        self.elapsed = getattr(origin, "elapsed", self.elapsed)
+        self.from_cache = from_cache
+        self._entry = entry
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        return self._entry.json()
+
+
+class ValidatorCache:
+    """
+    LRU de entradas validadas por (identidade, URL), limitado pelo total
+    de bytes. A identidade é a de _cache_identity: quem não tem a mesma
+    nunca recebe a entrada.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = CacheStats()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, entry):
+        # Corpos grandes demais não valem a pena (e expulsariam todo o resto)
+        if entry.size > self.max_bytes // 8:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.counters.record("evictions", endpoint_family(evicted_key[1]))
+        return True
+
+    def discard(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+                self.counters.record("evictions", endpoint_family(key[1]))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def cache_stats(self):
+        with self._lock:
+            sizes = [(endpoint_family(key[1]), entry.size) for key, entry in self._entries.items()]
+        return self.counters.snapshot(sizes)
+
+
+_validator_cache = ValidatorCache(CONDITIONAL_CACHE_BYTES)
+register_cache("Revalidação ETag/Last-Modified (api)", _validator_cache)
+
+
+def _validator_key(method, url, headers, params):
+    """Chave do cache de validadores: (identidade de quem chama, URL)."""
+    return (_cache_identity(headers), requests.Request(method, url, params=params).prepare().url)
+
+
+def _send_conditional(method, url, headers, **kwargs):
+    """
+    Envia GETs com If-None-Match/If-Modified-Since quando há validadores
+    guardados para a URL e serve o corpo guardado quando o backend
+    responde 304 Not Modified.
+
+    As entradas são separadas por identidade (escopo do token ou hash do
+    Authorization): tokens de escopos diferentes nunca compartilham corpo
+    nem validadores. Dentro do mesmo escopo o corpo e o JSON decodificado
+    (CachedResponse.json) são o mesmo objeto para todas as sessões e
+    devem ser tratados como somente leitura.
+    """
+    if method.upper() != "GET" or kwargs.get("stream"):
+        return _send_guarded(method, url, headers, **kwargs)
+
+    key = _validator_key(method, url, headers, kwargs.get("params"))
+    entry = _validator_cache.get(key)
+    if entry is not None:
+        headers = dict(headers)
+        if entry.etag:
+            headers.setdefault("If-None-Match", entry.etag)
+        if entry.last_modified:
+            headers.setdefault("If-Modified-Since", entry.last_modified)
+
+    family = endpoint_family(url)
+    response = _send_guarded(method, url, headers, fallback=entry, **kwargs)
+    if getattr(response, "from_cache", False):
+        _validator_cache.counters.record("stale", family)
+        return response
+
+    if response.status_code == 304 and entry is not None:
+        _count("revalidated_304")
+        _validator_cache.counters.record("hits", family)
+        return CachedResponse(entry, response, from_cache=True)
+    _validator_cache.counters.record("misses", family)
+
+    if response.status_code == 200 and (
+        response.headers.get("ETag") or response.headers.get("Last-Modified")
+    ):
+        fresh = _ValidatedEntry(response, identity=key[0])
+        if _validator_cache.store(key, fresh):
+            _count("validators_stored")
+            return CachedResponse(fresh, response, from_cache=False)
+    elif entry is not None and response.status_code in (404, 410):
+        # Recurso removido: validadores antigos não servem mais
+        _validator_cache.discard(key)
+
+    return response
+
+
+# =============================================================================
+# CACHE NEGATIVO (404 / 5xx)
+# =============================================================================
+
+# Validade de uma resposta negativa de GET (s): endpoint ausente (404/410)
+# muda raramente; erro do servidor (5xx) deve passar logo
+NEGATIVE_TTL = _env_float("API_NEGATIVE_TTL", 60.0)
+NEGATIVE_ERROR_TTL = _env_float("API_NEGATIVE_ERROR_TTL", 10.0)
+NEGATIVE_MAX_ENTRIES = 1024
+NEGATIVE_MISSING_STATUSES = (404, 410)
+
+_bypass_cache = contextvars.ContextVar("api_bypass_cache", default=False)
+
+
+@contextmanager
+def bypass_cache():
+    """
+    Chamadas dentro do bloco ignoram as respostas negativas guardadas e vão
+    ao backend (ex.: botão "Recarregar"); o resultado renova a entrada.
+    """
+    token = _bypass_cache.set(True)
+    try:
+        yield
+    finally:
+        _bypass_cache.reset(token)
+
+
+class NegativeResponse(requests.Response):
+    """Cópia de uma resposta negativa guardada (from_cache=True, sem corpo)."""
+
+    def __init__(self, url, status_code, reason, expires_in):
+        super().__init__()
+        self.status_code = status_code
+        self.reason = reason
+        self.url = url
+        self._content = b""
+        self._content_consumed = True
+        self.from_cache = True
+        self.expires_in = expires_in
+
+
+class NegativeCache:
+    """
+    Respostas negativas de GET (404/410 e 5xx) por (escopo do token, URL).
+    Enquanto valem, a mesma chamada recebe uma NegativeResponse sem ir à
+    rede. Só tokens com escopo conhecido participam (token_scope); uma
+    mutation bem-sucedida apaga as entradas do recurso alterado e dos que
+    ficam abaixo dele (invalidate_resource).
+    """
+
+    def __init__(
+        self,
+        ttl=NEGATIVE_TTL,
+        error_ttl=NEGATIVE_ERROR_TTL,
+        max_entries=NEGATIVE_MAX_ENTRIES,
+        clock=time.monotonic,
+    ):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = CacheStats()
+
+    def ttl_for(self, status_code):
+        if status_code in NEGATIVE_MISSING_STATUSES:
+            return self.ttl
+        if status_code in BREAKER_STATUSES:
+            return self.error_ttl
+        return None
+
+    def get(self, key):
+        family = endpoint_family(key[1])
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.counters.record("evictions", family)
+                entry = None
+        if entry is None:
+            self.counters.record("misses", family)
+            return None
+        self.counters.record("hits", family)
+        expires, status_code, reason = entry
+        return NegativeResponse(key[1], status_code, reason, expires - now)
+
+    def store(self, key, response):
+        ttl = self.ttl_for(response.status_code)
+        if not ttl or ttl <= 0:
+            return False
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + ttl, response.status_code, response.reason)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self.counters.record("evictions", endpoint_family(evicted[1]))
+        return True
+
+    def discard(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.counters.record("evictions", endpoint_family(key[1]))
+
+    def invalidate_resource(self, url):
+        """
+        Remove as entradas do caminho de url e dos caminhos abaixo dele
+        (POST /api/monitoring-stations/7/sensors apaga o 404 de
+        /api/monitoring-stations/7/sensors e de .../sensors/5); retorna
+        quantas saíram.
+        """
+        path = urlsplit(url).path.rstrip("/")
+        with self._lock:
+            evicted = [
+                key for key in self._entries
+                if urlsplit(key[1]).path == path or urlsplit(key[1]).path.startswith(path + "/")
+            ]
+            for key in evicted:
+                del self._entries[key]
+                self.counters.record("evictions", endpoint_family(key[1]))
+        return len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def cache_stats(self):
+        with self._lock:
+            sizes = [(endpoint_family(url), len(url)) for _, url in self._entries]
+        return self.counters.snapshot(sizes)
+
+
+_negative_cache = NegativeCache()
+register_cache("Respostas negativas (404/5xx)", _negative_cache)
+
+
+def _negative_key(method, url, token, params):
+    """Chave do cache negativo, ou None (não é GET ou token sem escopo)."""
+    if method.upper() != "GET" or not token:
+        return None
+    scope = token_scope(token)
+    if scope is None:
+        return None
+    return (scope, requests.Request(method, url, params=params).prepare().url)
+
+
+def _remember_outcome(method, url, key, response):
+    status_code = response.status_code
+    if key is not None:
+        # 5xx com corpo guardado fica com a revalidação/circuit breaker,
+        # que servem o último corpo em vez do erro; (escopo, URL) também é
+        # a chave do cache de validadores para tokens com escopo
+        stale_body = status_code in BREAKER_STATUSES and _validator_cache.get(key) is not None
+        if _negative_cache.ttl_for(status_code) is not None and not stale_body:
+            _negative_cache.store(key, response)
+        elif status_code < 400:
+            _negative_cache.discard(key)
+    elif method.upper() != "GET" and status_code < 400:
+        # Cadastro novo pode fazer surgir o que antes era 404 no mesmo
+        # recurso; consultas por POST (ex.: /api/measurements/report) não
+        # apagam os erros guardados de outros GETs da família
+        _negative_cache.invalidate_resource(url)
+
+
+# =============================================================================
+# ESCOPO DO TOKEN: IDENTIDADE PARA CACHES COMPARTILHADOS ENTRE SESSÕES
+# =============================================================================
+
+# Claims do JWT que definem o que o token enxerga (tenant e perfil)
+SCOPE_CLAIMS = tuple(
+    claim.strip()
+    for claim in os.getenv(
+        "API_SCOPE_CLAIMS",
+        "tenant,tenantId,role,roles,"
+        "http://schemas.microsoft.com/ws/2008/06/identity/claims/role",
+    ).split(",")
+    if claim.strip()
+)
+# Tokens aceitos pelo backend lembrados (só o hash)
+ACCEPTED_TOKENS_MAX = 1024
+
+_accepted_tokens = OrderedDict()
+_accepted_lock = threading.Lock()
+
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _mark_token(token, status_code):
+    """Lembra tokens aceitos pelo backend e esquece os recusados (401)."""
+    if status_code >= 400 and status_code != 401:
+        return
+    digest = _token_digest(token)
+    with _accepted_lock:
+        if status_code == 401:
+            _accepted_tokens.pop(digest, None)
+            return
+        _accepted_tokens[digest] = True
+        _accepted_tokens.move_to_end(digest)
+        while len(_accepted_tokens) > ACCEPTED_TOKENS_MAX:
+            _accepted_tokens.popitem(last=False)
+
+
+def token_accepted(token):
+    """True se o backend já respondeu com sucesso a uma chamada com o token."""
+    if not token:
+        return False
+    with _accepted_lock:
+        return _token_digest(token) in _accepted_tokens
+
+
+def token_claims(token):
+    """Payload do JWT sem verificar assinatura ({} se não for um JWT)."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (AttributeError, IndexError, ValueError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def token_scope(token):
+    """
+    Chave de cache que identifica o que o token pode ver: backend + claims
+    de SCOPE_CLAIMS. Tokens diferentes (novo login, refresh, outro
+    operador) com o mesmo escopo compartilham as entradas.
+
+    Retorna None para token ausente, expirado, que não é JWT ou que o
+    backend ainda não aceitou (token_accepted): nesses casos não há
+    compartilhamento e a chamada deve ir ao backend com o próprio token.
+    A assinatura não é verificada aqui; quem garante a identidade é a
+    aceitação do token pelo backend.
+    """
+    claims = token_claims(token)
+    if not claims or not token_accepted(token):
+        return None
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)) and exp <= time.time():
+        return None
+    scope = []
+    for claim in SCOPE_CLAIMS:
+        value = claims.get(claim)
+        if isinstance(value, list):
+            value = tuple(sorted(map(str, value)))
+        if value is not None:
+            scope.append((claim, value))
+    return (base_url, tuple(scope))
+
+
+def _cache_identity(headers):
+    """
+    Quem pode receber uma resposta guardada para esta chamada: o escopo do
+    token (token_scope) ou, para tokens sem escopo, o hash do cabeçalho
+    Authorization. None para chamadas sem Authorization.
+    """
+    authorization = headers.get("Authorization")
+    if not authorization:
+        return None
+    if authorization.startswith("Bearer "):
+        scope = token_scope(authorization[len("Bearer "):])
+        if scope is not None:
+            return scope
+    return ("authorization", _token_digest(authorization))
+
+
 def get_token(email, password):
     payload = {"email": email, "password": password}
     headers = {"Content-Type": "application/json"}
@@ -27,32 +1263,258 @@ def get_token(email, password):
 
     if response.status_code == 200:
         try:
-            return response.json().get("token")
+            token = response.json().get("token")
         except (ValueError, KeyError):
             st.error("Resposta da API de login inválida.")
             return None
+        if token:
+            # Emitido pelo próprio backend: já vale como aceito
+            _mark_token(token, response.status_code)
+        return token
     else:
         st.error("Email ou senha inválidos.")
         return None
 
 
-def api_request(method, endpoint, token=None, timeout=10, **kwargs):
+def _perform(method, endpoint, token=None, timeout=10, **kwargs):
     """
-    Função utilitária para realizar chamadas à API,
-    centralizando tratamento de erros e inclusão de cabeçalhos.
+    Executa a chamada sem tocar na interface.
+
+    Retorna (response, mensagem_de_erro); seguro para uso fora da thread
+    do script do Streamlit.
     """
     url = f"{base_url}{endpoint}"
-    headers = kwargs.pop("headers", {})
+    headers = dict(kwargs.pop("headers", None) or {})
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    page = current_deadline()
+    if page is not None:
+        remaining = page.remaining()
+        if remaining < DEADLINE_MIN_CALL_SECONDS:
+            return _deadline_fallback(page, method, url, endpoint, headers, kwargs.get("params"))
+    negative_key = _negative_key(method, url, token, kwargs.get("params"))
     try:
-        response = requests.request(
-            method, url, headers=headers, timeout=timeout, **kwargs
-        )
+        response = None
+        if negative_key is not None and not _bypass_cache.get():
+            response = _negative_cache.get(negative_key)
+        if response is None:
+            response = _send_coalesced(method, url, headers, timeout=timeout, **kwargs)
+            _remember_outcome(method, url, negative_key, response)
+        else:
+            _count("negative_served")
         response.raise_for_status()
-        return response
+        return response, None
+    except requests.exceptions.Timeout as e:
+        if page is not None:
+            return _deadline_fallback(page, method, url, endpoint, headers, kwargs.get("params"))
+        return None, f"Erro de conexão com a API: {e}"
     except requests.exceptions.HTTPError as http_err:
-        st.error(f"Erro HTTP ao chamar a API: {http_err}")
+        if http_err.response is not None:
+            http_err.response.close()
+        wait = retry_after_seconds(http_err.response)
+        if http_err.response is not None and http_err.response.status_code == 429 and wait:
+            return None, (
+                f"Muitas requisições à API. Tente novamente em {int(wait + 0.999)} segundos."
+            )
+        if isinstance(http_err.response, NegativeResponse):
+            return None, (
+                f"Erro HTTP ao chamar a API: {http_err} (resposta recente repetida; "
+                f"nova consulta em {int(http_err.response.expires_in + 0.999)} segundos)"
+            )
+        return None, f"Erro HTTP ao chamar a API: {http_err}"
+    except CircuitOpenError as e:
+        return None, (
+            f"API indisponível (/api/{e.family}). "
+            f"Nova tentativa automática em {int(e.retry_in + 0.999)} segundos."
+        )
     except requests.exceptions.RequestException as e:
-        st.error(f"Erro de conexão com a API: {e}")
-    return None
+        return None, f"Erro de conexão com a API: {e}"
+
+
+def _deadline_fallback(page, method, url, endpoint, headers, params):
+    """
+    Chamada que não cabe no prazo da página: marca o endpoint como
+    degradado e devolve o último corpo guardado (GET) da mesma identidade
+    de quem chama, sem exibir erro. Sem esse corpo, a falha de prazo fica
+    como está (response None); corpo de outra identidade nunca é servido.
+    """
+    page.mark_degraded(endpoint)
+    _count("deadline_degraded")
+    if method.upper() == "GET":
+        key = _validator_key(method, url, headers, params)
+        entry = _validator_cache.get(key)
+        if entry is not None and entry.identity == key[0]:
+            return CachedResponse(entry, None, from_cache=True), None
+    return None, None
+
+
+def api_request(method, endpoint, token=None, timeout=10, **kwargs):
+    """
+    Função utilitária para realizar chamadas à API,
+    centralizando tratamento de erros e inclusão de cabeçalhos.
+    """
+    response, error = _perform(method, endpoint, token=token, timeout=timeout, **kwargs)
+    if error:
+        st.error(error)
+    return response
+
+
+# =============================================================================
+# LOTES DE REQUISIÇÕES EM PARALELO
+# =============================================================================
+
+# Limite de requisições simultâneas feitas pelo processo em lotes
+MAX_WORKERS = _env_int("API_MAX_WORKERS", 8)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Pool de threads compartilhado pelas chamadas paralelas à API."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAX_WORKERS, thread_name_prefix="api"
+                )
+    return _executor
+
+
+def _perform_safe(call):
+    call = dict(call)
+    try:
+        return _perform(call.pop("method"), call.pop("endpoint"), **call)
+    except Exception as e:  # falha de um item não derruba o lote
+        return None, f"Erro inesperado ao chamar a API: {e}"
+
+
+def api_request_quiet(method, endpoint, **kwargs):
+    """
+    Como api_request, sem tocar na interface: retorna (response, mensagem
+    de erro), com response None na falha. Para quem roda fora da thread do
+    script ou mostra o erro depois, com o próprio contexto (ex.: cargas em
+    lote no pool).
+    """
+    return _perform_safe(dict(kwargs, method=method, endpoint=endpoint))
+
+
+def api_request_many(calls, show_errors=True):
+    """
+    Executa um lote de requisições independentes em paralelo.
+
+    calls: lista de dicts com os mesmos argumentos de api_request, ex.:
+        [{"method": "GET", "endpoint": "/api/home", "token": token}, ...]
+
+    Retorna a lista de respostas na mesma ordem da entrada; itens que
+    falharam vêm como None. O tempo total é o da chamada mais lenta, não a
+    soma. Os erros são exibidos aqui, na thread do script, um por item.
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    if len(calls) == 1:
+        results = [_perform_safe(calls[0])]
+    else:
+        executor = get_executor()
+        # Cada tarefa leva uma cópia do contexto (prazo da página incluído)
+        futures = [
+            executor.submit(task_context().run, _perform_safe, call)
+            for call in calls
+        ]
+        results = [future.result() for future in futures]
+
+    responses = []
+    for response, error in results:
+        if error and show_errors:
+            st.error(error)
+        responses.append(response)
+    return responses
+
+
+# =============================================================================
+# PAGINAÇÃO COM PRÉ-BUSCA DA PRÓXIMA PÁGINA
+# =============================================================================
+
+
+class PageFetchError(requests.exceptions.RequestException):
+    """Página que não pôde ser buscada em paginate(raise_errors=True)."""
+
+
+def _json_page(response):
+    return response.json()
+
+
+def paginate(
+    endpoint,
+    params=None,
+    page_size=15,
+    token=None,
+    start_page=1,
+    parse=_json_page,
+    timeout=10,
+    raise_errors=False,
+):
+    """
+    Percorre um endpoint paginado (page/pageSize do swagger.yml), ex.:
+
+        pages = api.paginate("/api/measurements", {"sort": "desc"}, 15, token=token)
+        first = next(pages, None)   # página 2 já começa a ser buscada
+        ...
+        pages.close()               # cancela a pré-busca pendente
+
+    Gera o resultado de parse(response) de cada página (lista do
+    response.json() por padrão; qualquer coisa com len()). Enquanto a
+    página N é consumida, a N+1 é buscada no pool de threads; uma página
+    com menos de page_size itens, ou uma falha, encerra a iteração. O erro
+    é exibido aqui, na thread do script; exceções de parse (ValueError)
+    sobem para quem consome.
+
+    parse roda na thread da pré-busca: não deve chamar o Streamlit. A
+    pré-busca não herda o prazo da página (page_deadline): ela serve a
+    próxima interação, não a renderização atual. A primeira página é
+    buscada na hora e respeita o prazo corrente.
+
+    Com raise_errors=True a falha levanta PageFetchError em vez de exibir
+    o erro, para quem precisa distinguir "acabou" de "falhou" (ex.: cargas
+    em lote que guardam o resultado).
+    """
+    params = dict(params or {})
+    executor = get_executor()
+    page = start_page
+    pending = None
+
+    def fetch(number):
+        page_params = dict(params, page=number, pageSize=page_size)
+        response, error = _perform(
+            "GET", endpoint, token=token, timeout=timeout, params=page_params
+        )
+        if response is None or error:
+            return None, error
+        return parse(response), None
+
+    try:
+        while True:
+            if pending is None:
+                items, error = fetch(page)
+            else:
+                items, error = pending.result()
+                pending = None
+            if items is None and raise_errors:
+                raise PageFetchError(error or f"Página {page} de {endpoint} fora do prazo.")
+            if error:
+                st.error(error)
+            if items is None:
+                return
+            last = len(items) < page_size
+            if not last:
+                # Contexto vazio: sem o prazo da página atual
+                pending = executor.submit(contextvars.Context().run, fetch, page + 1)
+            yield items
+            if last:
+                return
+            page += 1
+    finally:
+        if pending is not None:
+            pending.cancel()
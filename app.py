@@ -5,6 +5,8 @@ from streamlit_option_menu import option_menu
 
 load_dotenv()
 # Importações dos módulos
+import api
+import src.cache_panel as cache_panel
 import src.controller_activations as controller_activations
 import src.controllers as controllers
 import src.consumptions as consumptions
@@ -21,7 +23,8 @@ import src.water_consumptions as water_consumptions  # Assumindo que existe este
 
 # Design system
 from src.design_tokens import DesignTokens, generate_button_styles
-from src.ui_components import ComponentLibrary
+from src.session_frames import show_memory_meter
+from src.ui_components import ComponentLibrary, format_age, show_degraded_state, snapshot_cache
 
 # Exemplo da sua função de login/logout
 from login import login, logout
@@ -199,36 +202,34 @@ def main():
         unsafe_allow_html=True,
     )
 
-    # ---------- SIDEBAR ----------
-    with st.sidebar:
-        st.markdown("## Status", unsafe_allow_html=True)
-        health.show_health_in_sidebar()
-        st.markdown("---")
-        if st.button("Sair", key="logout", help="Clique para sair do sistema"):
-            logout()
-
     # ---------- MENU DE NAVEGAÇÃO REORGANIZADO ----------
     # Menu horizontal com a nova estrutura solicitada
+    menu_options = [
+        "Dashboard",
+        "Relatórios de Medição",     
+        "Relatórios de Ativação",
+        "Consumos",
+        "Cadastrar Equipamentos",
+        "Tarifas",
+        "Usuários",
+    ]
+    menu_icons = [
+        "house",              # Dashboard
+        "speedometer2",       # Relatórios de Medição
+        "power",              # Relatórios de Ativação
+        "bar-chart-line",     # Consumos
+        "tools",              # Cadastrar Equipamentos
+        "currency-dollar",    # Tarifas
+        "people",             # Usuários
+    ]
+    # Painel dos caches: só para administradores
+    if cache_panel.is_admin(st.session_state.get("token")):
+        menu_options.append("Caches")
+        menu_icons.append("database")
     app_mode = option_menu(
         menu_title=None,
-        options=[
-            "Dashboard",
-            "Relatórios de Medição",     
-            "Relatórios de Ativação",
-            "Consumos",
-            "Cadastrar Equipamentos",
-            "Tarifas",
-            "Usuários",
-        ],
-        icons=[
-            "house",              # Dashboard
-            "speedometer2",       # Relatórios de Medição
-            "power",              # Relatórios de Ativação
-            "bar-chart-line",     # Consumos
-            "tools",              # Cadastrar Equipamentos
-            "currency-dollar",    # Tarifas
-            "people",             # Usuários
-        ],
+        options=menu_options,
+        icons=menu_icons,
         default_index=0,
         orientation="horizontal",
         styles={
@@ -262,6 +263,24 @@ def main():
     )
     st.markdown("---")
 
+    # Na aba Dashboard, /api/home e /api/health são buscados juntos e o
+    # health é reaproveitado pelo sidebar (uma chamada a menos por rerun),
+    # inclusive quando falhou: o sidebar mostra a falha sem nova chamada
+    home_data, health_data = None, health.NOT_LOADED
+    if app_mode == "Dashboard":
+        with st.spinner("Carregando dados do dashboard..."):
+            home_data, health_data = fetch_dashboard_data()
+
+    # ---------- SIDEBAR ----------
+    with st.sidebar:
+        st.markdown("## Status", unsafe_allow_html=True)
+        health.show_health_in_sidebar(health_data)
+        st.markdown("---")
+        show_memory_meter()
+        st.markdown("---")
+        if st.button("Sair", key="logout", help="Clique para sair do sistema"):
+            logout()
+
     # ---------- GESTÃO DE SUBMENUS ----------
     # Inicializar ou obter o estado do submenu
     if "submenu_selection" not in st.session_state:
@@ -277,7 +296,7 @@ def main():
 
     # ---------- RENDERIZAÇÃO DE CONTEÚDO BASEADO NO MENU ----------
     if app_mode == "Dashboard":
-        show_enhanced_dashboard()
+        show_enhanced_dashboard(home_data, health_data)
         
     elif app_mode == "Relatórios de Medição":
         # Usar tabs para Medições e Relatórios pré-programados
@@ -295,12 +314,15 @@ def main():
     elif app_mode == "Consumos":
         # Submenu para tipos de consumo
         tab1, tab2 = st.tabs(["💧 Consumo de Água", "⚡ Consumo de Energia"])
-        
-        with tab1:
-            water_consumptions.show()  # Assumindo que esse módulo existe
-            
-        with tab2:
-            energy_consumptions.show()
+
+        # As duas abas rodam a cada rerun: dividem o mesmo prazo (API_PAGE_DEADLINE)
+        with api.page_deadline(label="Consumos") as deadline:
+            with tab1:
+                water_consumptions.show()  # Assumindo que esse módulo existe
+
+            with tab2:
+                energy_consumptions.show()
+        show_degraded_state(deadline)
             
     elif app_mode == "Cadastrar Equipamentos":
         # Submenu para tipos de equipamentos
@@ -345,17 +367,13 @@ def main():
     elif app_mode == "Usuários":
         users.show()
 
+    elif app_mode == "Caches":
+        cache_panel.show()
 
 
-def fetch_home_data():
-    """Busca dados do endpoint /api/home conforme Swagger"""
-    token = st.session_state.get("token")
-    if not token:
-        return None
-    
-    from api import api_request
-    response = api_request("GET", "/api/home", token=token)
-    
+
+def parse_home_response(response):
+    """Interpreta a resposta de /api/home conforme Swagger"""
     if response and response.status_code == 200:
         try:
             return response.json()
@@ -369,6 +387,29 @@ def fetch_home_data():
         st.error(f"Erro ao buscar dados do dashboard: HTTP {response.status_code if response else 'Sem conexão'}")
         return None
 
+
+def parse_health_response(response):
+    """Interpreta a resposta de /api/health"""
+    if response and response.status_code == 200:
+        try:
+            return response.json()
+        except ValueError:
+            st.error("Erro ao processar resposta da API /api/health")
+            return None
+    else:
+        st.error(f"Erro ao buscar dados de saúde: HTTP {response.status_code if response else 'Sem conexão'}")
+        return None
+
+
+def fetch_home_data():
+    """Busca dados do endpoint /api/home conforme Swagger"""
+    token = st.session_state.get("token")
+    if not token:
+        return None
+    
+    from api import api_request
+    return parse_home_response(api_request("GET", "/api/home", token=token))
+
 def fetch_health_data():
     """Busca dados do endpoint /api/health"""
     token = st.session_state.get("token")
@@ -376,32 +417,90 @@ def fetch_health_data():
         return None
     
     from api import api_request
-    response = api_request("GET", "/api/health", token=token)
-    
-    if response and response.status_code == 200:
+    return parse_health_response(api_request("GET", "/api/health", token=token))
+
+
+DASHBOARD_SNAPSHOTS = {
+    "home": ("/api/home", parse_home_response),
+    "health": ("/api/health", parse_health_response),
+}
+
+
+def load_snapshot_quietly(endpoint):
+    """Loader de refresh em segundo plano: JSON do endpoint ou None, sem st.*"""
+    def loader(token):
+        from api import api_request_many
+        response = api_request_many(
+            [{"method": "GET", "endpoint": endpoint, "token": token}], show_errors=False
+        )[0]
+        if response is None or response.status_code != 200:
+            return None
         try:
             return response.json()
         except ValueError:
-            st.error("Erro ao processar resposta da API /api/health")
             return None
-    else:
-        st.error(f"Erro ao buscar dados de saúde: HTTP {response.status_code if response else 'Sem conexão'}")
-        return None
+    return loader
 
 
-def show_enhanced_dashboard():
+def fetch_dashboard_data():
+    """
+    /api/home e /api/health com stale-while-revalidate (snapshot_cache):
+    snapshot com menos de SNAPSHOT_MAX_AGE é usado na hora e, se já não
+    estiver fresco, atualizado em segundo plano para o próximo rerun. Só o
+    que não tem snapshot é buscado aqui (em paralelo). Retorna (home, health).
+    """
+    token = st.session_state.get("token")
+    if not token:
+        return None, None
+
+    snapshots = {name: snapshot_cache.get(token, name) for name in DASHBOARD_SNAPSHOTS}
+    missing = [name for name, snapshot in snapshots.items() if snapshot is None]
+
+    for name, snapshot in snapshots.items():
+        if snapshot is not None and snapshot_cache.is_stale(snapshot[1]):
+            endpoint = DASHBOARD_SNAPSHOTS[name][0]
+            snapshot_cache.refresh(token, name, load_snapshot_quietly(endpoint))
+
+    if missing:
+        from api import api_request_many
+        responses = api_request_many([
+            {"method": "GET", "endpoint": DASHBOARD_SNAPSHOTS[name][0], "token": token}
+            for name in missing
+        ])
+        for name, response in zip(missing, responses):
+            data = DASHBOARD_SNAPSHOTS[name][1](response)
+            snapshot_cache.put(token, name, data)
+            snapshots[name] = (data, 0.0)
+
+    return snapshots["home"][0], snapshots["health"][0]
+
+
+def show_snapshot_age():
+    """Marcador "Atualizado há N s" do snapshot mais antigo do Dashboard."""
+    token = st.session_state.get("token")
+    ages = [snapshot_cache.age(token, name) for name in DASHBOARD_SNAPSHOTS]
+    if token and all(age is not None for age in ages):
+        st.caption(f"🕒 Atualizado {format_age(max(ages))}")
+
+
+def show_enhanced_dashboard(home_data=None, health_data=health.NOT_LOADED):
     """
     Dashboard com seções reordenadas e cores padronizadas:
     - Cards verdes para dispositivos online e informações disponíveis
     - Cards cinzas para dispositivos offline
     - Texto colorido para condições de umidade
+
+    home_data/health_data podem vir já carregados (ver fetch_dashboard_data),
+    mesmo que como None por falha; sem eles os dois endpoints são buscados
+    em paralelo aqui.
     """
     st.title("🏠 Dashboard - Visão Geral")
+    show_snapshot_age()
 
     # Buscar dados do endpoint /api/home e /api/health
-    with st.spinner("Carregando dados do dashboard..."):
-        home_data = fetch_home_data()
-        health_data = fetch_health_data()
+    if health_data is health.NOT_LOADED:
+        with st.spinner("Carregando dados do dashboard..."):
+            home_data, health_data = fetch_dashboard_data()
     
     if home_data and health_data:
         # Extrair dados conforme schema HomeResponse
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latência de um rerun completo da aba Dashboard com e sem pool
+de conexões keep-alive em api.py.
+
+Um "rerun" executa o mesmo que app.main() para a aba Dashboard:
+health.show_health_in_sidebar() + show_enhanced_dashboard().
+
+Uso:
+    python benchmarks/bench_connection_pool.py --runs 200 --handshake-ms 20
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+logging.disable(logging.WARNING)
+
+import streamlit as st  # noqa: E402
+
+import api  # noqa: E402
+from stub_server import dashboard_backend  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run(runs, pooled, backend):
+    import app
+    import src.health as health
+
+    api.configure_pool(enabled=pooled)
+    connections_before = backend.connections
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        health.show_health_in_sidebar()
+        app.show_enhanced_dashboard()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "connections": backend.connections - connections_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument(
+        "--handshake-ms",
+        type=float,
+        default=20.0,
+        help="custo simulado de abrir uma conexão (TCP+TLS até o backend)",
+    )
+    args = parser.parse_args()
+
+    with dashboard_backend(handshake_delay=args.handshake_ms / 1000) as backend:
+        api.base_url = backend.url
+        st.session_state["token"] = "benchmark-token"
+
+        # Aquecimento (imports, primeira conexão)
+        run(5, True, backend)
+
+        results = {
+            "sem pool": run(args.runs, False, backend),
+            "com pool": run(args.runs, True, backend),
+        }
+
+    print(f"Reruns por cenário: {args.runs}, handshake simulado: {args.handshake_ms} ms")
+    print(f"{'cenário':<10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'conexões':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<10} {result['p50']:>10.2f} {result['p95']:>10.2f} "
+            f"{result['connections']:>10}"
+        )
+    gain = results["sem pool"]["p50"] / max(results["com pool"]["p50"], 1e-9)
+    print(f"Ganho no p50: {gain:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
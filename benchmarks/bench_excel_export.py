@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Excel local da aba de exportação de Medições.
+
+Cenários:
+- to_excel a cada rerun: pandas ExcelWriter + to_excel em toda execução
+  do script com o expander aberto (comportamento anterior de
+  measurements.show)
+- sob demanda: cached_excel; sem pedido não gera nada, com um workbook
+  guardado só calcula a chave (hash dos dados); o workbook sai de
+  export_to_excel, linha a linha no modo constant_memory (comportamento
+  atual)
+
+Mede o custo por rerun sem clique, o tempo de geração e o pico de
+memória do Python (tracemalloc) ao gerar.
+
+Uso:
+    python benchmarks/bench_excel_export.py --records 50000 200000
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from unittest.mock import patch
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pandas as pd  # noqa: E402
+
+from src import measurements  # noqa: E402
+from src.measurement_decoder import decode_measurements  # noqa: E402
+from src.measurements import (  # noqa: E402
+    EXCEL_DATETIME_FORMAT,
+    cached_excel,
+    datetime_columns,
+    export_to_excel,
+    format_measurements,
+)
+from stub_server import sample_measurements  # noqa: E402
+
+
+def pandas_excel(df, selected_columns):
+    output = io.BytesIO()
+    frame = df[selected_columns]
+    frame = frame.assign(**{column: frame[column].dt.tz_localize(None) for column in datetime_columns(frame)})
+    writer = pd.ExcelWriter(output, engine="xlsxwriter", datetime_format=EXCEL_DATETIME_FORMAT)
+    frame.to_excel(writer, index=False, sheet_name="Amostras")
+    writer.close()
+    return output.getvalue()
+
+
+def timed(func, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def peak(func):
+    tracemalloc.start()
+    func()
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'medições':>9} {'cenário':<24} {'rerun (ms)':>11} "
+        f"{'geração (ms)':>13} {'pico (MB)':>10}"
+    )
+    for records in args.records:
+        df = format_measurements(decode_measurements(json.dumps(sample_measurements(records)).encode()))
+        columns = df.columns.tolist()
+
+        build = lambda: pandas_excel(df, columns)  # noqa: E731
+        elapsed = timed(build, args.runs)
+        print(
+            f"{records:>9} {'to_excel a cada rerun':<24} {elapsed * 1000:>11.0f} "
+            f"{elapsed * 1000:>13.0f} {peak(build) / 1e6:>10.1f}"
+        )
+
+        with patch.object(measurements, "st") as st:
+            st.session_state = {}
+            idle = timed(lambda: cached_excel(df, columns), args.runs)
+            cached_excel(df, columns, build=True)
+            hit = timed(lambda: cached_excel(df, columns), args.runs)
+        build = lambda: export_to_excel(df, columns)  # noqa: E731
+        print(
+            f"{records:>9} {'sob demanda':<24} {f'{idle * 1000:.0f}/{hit * 1000:.0f}':>11} "
+            f"{timed(build, args.runs) * 1000:>13.0f} {peak(build) / 1e6:>10.1f}"
+        )
+    print("rerun sob demanda: sem workbook / com workbook guardado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark: carga de 90 dias de uma estação movimentada por
+GET /api/measurements, em sequência ou em fatias paralelas.
+
+Cenários:
+- sequencial: um único período paginado com páginas de 10000 e pré-busca
+  da próxima (comportamento anterior de measurement_cache)
+- fatias paralelas: src.measurement_loader.load_measurements, uma fatia
+  por dia, até --workers ao mesmo tempo (comportamento atual)
+
+O backend falso filtra por período, pagina e responde com latência fixa
+por requisição (--latency-ms) e banda simulada por conexão (--mbps).
+
+Uso:
+    python benchmarks/bench_measurement_bulk.py --days 90 --sensors 24 --interval 10
+"""
+
+import argparse
+import base64
+import bisect
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+logging.disable(logging.WARNING)
+
+import pandas as pd  # noqa: E402
+
+import api  # noqa: E402
+from src.measurement_decoder import decode_measurements  # noqa: E402
+from src.measurement_loader import load_measurements  # noqa: E402
+from stub_server import StubBackend  # noqa: E402
+
+START = datetime(2025, 1, 1)
+SEQUENTIAL_PAGE_SIZE = 10000
+
+
+def station_history(days, sensors, interval_minutes):
+    """(datas em ordem crescente, registros JSON já codificados)."""
+    dates, bodies = [], []
+    for step in range(days * 24 * 60 // interval_minutes):
+        date = (START + timedelta(minutes=step * interval_minutes)).strftime("%Y-%m-%dT%H:%M:%S")
+        for sensor in range(sensors):
+            i = len(bodies) + 1
+            dates.append(date)
+            bodies.append(json.dumps({
+                "id": i,
+                "date": date,
+                "stationId": 1,
+                "sensorId": 10 + sensor,
+                "batteryVoltage": round(3.3 + (i % 90) / 100, 2),
+                "boardTemperature": round(20 + (i % 150) / 10, 1),
+                "sensorTemperature": round(18 + (i % 120) / 10, 1),
+                "sampleTemperature": round(17 + (i % 110) / 10, 1),
+                "moisture": round(15 + (i % 400) / 10, 1),
+                "salinity": round((i % 500) / 100, 2),
+                "conductivity": None if i % 7 == 0 else round(0.5 + (i % 300) / 100, 2),
+            }).encode())
+    return dates, bodies
+
+
+def measurements_backend(dates, bodies, latency, mbps):
+    def handler(h):
+        query = {k: v[0] for k, v in parse_qs(urlsplit(h.path).query).items()}
+        first = bisect.bisect_left(dates, query["startDate"].rstrip("Z"))
+        last = bisect.bisect_right(dates, query["endDate"].rstrip("Z"))
+        size, page = int(query["pageSize"]), int(query["page"])
+        # sort=desc: do fim do período para o início
+        stop = last - (page - 1) * size
+        chunk = bodies[max(first, stop - size):max(first, stop)][::-1]
+        return 200, b"[" + b",".join(chunk) + b"]", {}
+
+    backend = StubBackend(request_delay=latency, bandwidth=mbps * 1_000_000 / 8 if mbps else None)
+    backend.route("GET", "/api/measurements", handler)
+    backend.route("GET", "/api/controllers", lambda h: [])
+    return backend
+
+
+def bench_token():
+    payload = json.dumps({"role": "Admin", "exp": time.time() + 3600}).encode()
+    token = "eyJhbGciOiJIUzI1NiJ9." + base64.urlsafe_b64encode(payload).rstrip(b"=").decode() + ".x"
+    api.api_request("GET", "/api/controllers", token=token)
+    return token
+
+
+def sequential(token, start, end, workers):
+    params = {
+        "startDate": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "endDate": end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "sort": "desc",
+        "stationId": 1,
+    }
+    pages = list(api.paginate(
+        "/api/measurements",
+        params,
+        SEQUENTIAL_PAGE_SIZE,
+        token=token,
+        parse=lambda response: decode_measurements(response.content),
+        raise_errors=True,
+    ))
+    return pd.concat(pages, ignore_index=True)
+
+
+def sliced(token, start, end, workers):
+    return load_measurements(token, [(start, end)], station_id=1, max_workers=workers)
+
+
+SCENARIOS = {
+    "sequencial": sequential,
+    "fatias paralelas": sliced,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--sensors", type=int, default=24)
+    parser.add_argument("--interval", type=int, default=10, help="minutos entre medições")
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--mbps", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    dates, bodies = station_history(args.days, args.sensors, args.interval)
+    start, end = pd.Timestamp(START), pd.Timestamp(START + timedelta(days=args.days))
+    print(
+        f"{args.days} dias, {args.sensors} sensores: {len(bodies)} medições; "
+        f"latência {args.latency_ms:.0f} ms, {args.mbps:.0f} Mbps por conexão, "
+        f"{args.workers} fatias simultâneas"
+    )
+    print(f"{'cenário':<18} {'mediana (ms)':>13} {'requisições':>12}")
+    with measurements_backend(dates, bodies, args.latency_ms / 1000, args.mbps) as backend:
+        api.base_url = backend.url
+        token = bench_token()
+        for name, load in SCENARIOS.items():
+            times = []
+            before = backend.requests
+            for _ in range(args.runs):
+                # Sem revalidação condicional entre rodadas
+                api._validator_cache.clear()
+                begin = time.perf_counter()
+                df = load(token, start, end, args.workers)
+                times.append(time.perf_counter() - begin)
+                assert len(df) == len(bodies) and df["id"].is_unique
+            requests_made = (backend.requests - before) // args.runs
+            print(f"{name:<18} {statistics.median(times) * 1000:>13.0f} {requests_made:>12}")
+
+
+if __name__ == "__main__":
+    main()
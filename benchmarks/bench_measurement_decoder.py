@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: corpo de /api/measurements (bytes) -> DataFrame tipado.
+
+Cenários:
+- json() + DataFrame: response.json() e pd.DataFrame(lista de dicts)
+  (comportamento anterior de measurements.fetch_data)
+- decode_measurements: src.measurement_decoder, colunas NumPy direto dos
+  bytes (comportamento atual)
+
+Todos terminam com a coluna date em datetime64. O pico de memória inclui
+o DataFrame resultante, mas não o corpo de entrada.
+
+Uso:
+    python benchmarks/bench_measurement_decoder.py --records 100000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pandas as pd  # noqa: E402
+from src.measurement_decoder import decode_measurements  # noqa: E402
+from stub_server import sample_measurements  # noqa: E402
+
+
+def decode(scenario, body):
+    if scenario == "decode_measurements":
+        return decode_measurements(body)
+    df = pd.DataFrame(json.loads(body))
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def run(scenario, body, runs, expected):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        df = decode(scenario, body)
+        times.append(time.perf_counter() - start)
+        assert len(df) == expected
+    del df
+
+    tracemalloc.start()
+    df = decode(scenario, body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    body = json.dumps(sample_measurements(args.records)).encode()
+    print(f"{args.records} medições, corpo de {len(body) / 1e6:.1f} MB")
+    print(
+        f"{'cenário':<20} {'mediana (ms)':>13} {'linhas/s':>11} "
+        f"{'pico (MB)':>10} {'DataFrame (MB)':>15}"
+    )
+    for scenario in ("json() + DataFrame", "decode_measurements"):
+        median, peak, size = run(scenario, body, args.runs, args.records)
+        print(
+            f"{scenario:<20} {median * 1000:>13.0f} {args.records / median:>11,.0f} "
+            f"{peak / 1e6:>10.1f} {size / 1e6:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
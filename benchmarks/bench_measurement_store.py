@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: visão de 30 dias de uma estação (todos os sensores) pelo
+measurement_cache, com e sem o armazenamento em disco.
+
+Cenários:
+- partida a frio: processo novo, disco vazio; tudo vem do backend
+  (comportamento a cada deploy sem MEASUREMENT_STORE_PATH)
+- reinício com disco: processo novo (cache em memória vazio), dias
+  assentados lidos do SQLite (comportamento atual com
+  MEASUREMENT_STORE_PATH)
+- memória: mesma consulta no mesmo processo
+
+O backend falso serve /api/measurements paginado, filtrado por período,
+com banda simulada (--mbps) e gzip.
+
+Uso:
+    python benchmarks/bench_measurement_store.py --sensors 24 --interval 10 --mbps 50
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+logging.disable(logging.WARNING)
+
+import api  # noqa: E402
+from src.measurement_cache import MeasurementSegmentCache  # noqa: E402
+from src.measurement_store import MeasurementStore  # noqa: E402
+from stub_server import StubBackend  # noqa: E402
+
+START = datetime(2025, 1, 1)
+DAYS = 30
+
+
+def station_history(sensors, interval_minutes):
+    """Medições da estação 1, ordem decrescente como sort=desc."""
+    records = []
+    steps = DAYS * 24 * 60 // interval_minutes
+    for step in range(steps):
+        date = START + timedelta(minutes=step * interval_minutes)
+        for sensor in range(sensors):
+            i = len(records) + 1
+            records.append({
+                "id": i,
+                "date": date.strftime("%Y-%m-%dT%H:%M:%S"),
+                "stationId": 1,
+                "sensorId": 10 + sensor,
+                "batteryVoltage": round(3.3 + (i % 90) / 100, 2),
+                "boardTemperature": round(20 + (i % 150) / 10, 1),
+                "sensorTemperature": round(18 + (i % 120) / 10, 1),
+                "sampleTemperature": round(17 + (i % 110) / 10, 1),
+                "moisture": round(15 + (i % 400) / 10, 1),
+                "salinity": round((i % 500) / 100, 2),
+                "conductivity": None if i % 7 == 0 else round(0.5 + (i % 300) / 100, 2),
+            })
+    records.reverse()
+    return records
+
+
+def measurements_backend(records, mbps):
+    dates = [r["date"] for r in records]
+
+    def handler(h):
+        query = {k: v[0] for k, v in parse_qs(urlsplit(h.path).query).items()}
+        start, end = query["startDate"].rstrip("Z"), query["endDate"].rstrip("Z")
+        matching = [r for r, d in zip(records, dates) if start <= d <= end]
+        size, page = int(query["pageSize"]), int(query["page"])
+        body = json.dumps(matching[(page - 1) * size:page * size]).encode()
+        if "gzip" in (h.headers.get("Accept-Encoding") or ""):
+            return 200, gzip.compress(body, compresslevel=6), {"Content-Encoding": "gzip"}
+        return 200, body, {}
+
+    backend = StubBackend(bandwidth=mbps * 1_000_000 / 8 if mbps else None)
+    backend.route("GET", "/api/measurements", handler)
+    backend.route("GET", "/api/controllers", lambda h: [])
+    return backend
+
+
+def bench_token():
+    """JWT não assinado, aceito pelo backend falso (escopo conhecido)."""
+    payload = json.dumps({"role": "Admin", "exp": time.time() + 3600}).encode()
+    token = "eyJhbGciOiJIUzI1NiJ9." + base64.urlsafe_b64encode(payload).rstrip(b"=").decode() + ".x"
+    api.api_request("GET", "/api/controllers", token=token)
+    return token
+
+
+def load(cache, token):
+    end = START + timedelta(days=DAYS) - timedelta(seconds=1)
+    start = time.perf_counter()
+    df = cache.query(token, START, end, station_id=1)
+    return time.perf_counter() - start, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sensors", type=int, default=24)
+    parser.add_argument("--interval", type=int, default=10, help="minutos entre medições")
+    parser.add_argument("--mbps", type=float, default=50)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    records = station_history(args.sensors, args.interval)
+    print(f"{DAYS} dias, {args.sensors} sensores: {len(records)} medições")
+
+    results = {"partida a frio": [], "reinício com disco": [], "memória": []}
+    with measurements_backend(records, args.mbps) as backend:
+        api.base_url = backend.url
+        token = bench_token()
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "measurements.db")
+
+                cold = MeasurementSegmentCache(store=MeasurementStore(path))
+                elapsed, rows = load(cold, token)
+                results["partida a frio"].append(elapsed)
+                results["memória"].append(load(cold, token)[0])
+                cold.store.close()
+
+                # Processo novo: só o arquivo sobrevive
+                warm = MeasurementSegmentCache(store=MeasurementStore(path))
+                elapsed, warm_rows = load(warm, token)
+                results["reinício com disco"].append(elapsed)
+                warm.store.close()
+                assert warm_rows == rows == len(records)
+        requests_made = backend.requests
+
+    print(f"{'cenário':<20} {'mediana (ms)':>13}")
+    for scenario, times in results.items():
+        print(f"{scenario:<20} {statistics.median(times) * 1000:>13.0f}")
+    print(f"requisições ao backend: {requests_made}")
+
+
+if __name__ == "__main__":
+    main()
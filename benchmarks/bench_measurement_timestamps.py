@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fetch -> render de /api/measurements com a coluna Data em
+texto ou em datetime64.
+
+Cenários:
+- texto: datas convertidas para "dd/mm/YYYY HH:MM:SS" logo após o decode
+  (comportamento anterior de measurements.format_measurements)
+- datetime64: datas datetime64 com fuso (comportamento atual); o texto
+  é gerado pelo grid, só para as linhas visíveis
+
+Etapas medidas (CPU, mediana de --runs):
+- fetch: decode_measurements + format_measurements
+- render: card "Última Medição", ordenação por Data e, se o pyarrow
+  estiver disponível, a conversão para Arrow que o st.dataframe faz
+
+Memória: pico (tracemalloc) de fetch + render e tamanho do DataFrame
+resultante (memory_usage deep).
+
+Uso:
+    python benchmarks/bench_measurement_timestamps.py --records 200000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.measurement_decoder import decode_measurements  # noqa: E402
+from src.measurements import format_measurements, rename_columns  # noqa: E402
+from stub_server import sample_measurements  # noqa: E402
+
+try:
+    import pyarrow  # noqa: E402
+except ImportError:
+    pyarrow = None
+
+
+def fetch_text(body):
+    df = decode_measurements(body)
+    df["date"] = (
+        df["date"]
+        .dt.tz_localize("UTC")
+        .dt.tz_convert("America/Sao_Paulo")
+        .dt.strftime("%d/%m/%Y %H:%M:%S")
+    )
+    rename_columns(df)
+    return df
+
+
+def render_text(df):
+    latest = str(df["Data"].iloc[0])[:10]
+    ordered = df.sort_values("Data")
+    return latest, ordered
+
+
+def fetch_datetime(body):
+    return format_measurements(decode_measurements(body))
+
+
+def render_datetime(df):
+    latest = df["Data"].max().strftime("%d/%m/%Y")
+    ordered = df.sort_values("Data")
+    return latest, ordered
+
+
+SCENARIOS = {
+    "texto": (fetch_text, render_text),
+    "datetime64": (fetch_datetime, render_datetime),
+}
+
+
+def run(fetch, render, body):
+    start = time.process_time()
+    df = fetch(body)
+    fetched = time.process_time()
+    _, ordered = render(df)
+    if pyarrow is not None:
+        pyarrow.Table.from_pandas(ordered)
+    return fetched - start, time.process_time() - fetched, df
+
+
+def peak(fetch, render, body):
+    tracemalloc.start()
+    df = fetch(body)
+    _, ordered = render(df)
+    if pyarrow is not None:
+        pyarrow.Table.from_pandas(ordered)
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top, int(df.memory_usage(deep=True).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    body = json.dumps(sample_measurements(args.records)).encode()
+    print(f"{args.records} medições, corpo de {len(body) / 1e6:.1f} MB")
+    if pyarrow is None:
+        print("pyarrow indisponível: render sem a conversão do st.dataframe")
+    print(
+        f"{'cenário':<12} {'fetch (ms)':>11} {'render (ms)':>12} "
+        f"{'pico (MB)':>10} {'DataFrame (MB)':>15}"
+    )
+    for name, (fetch, render) in SCENARIOS.items():
+        runs = [run(fetch, render, body) for _ in range(args.runs)]
+        top, frame_bytes = peak(fetch, render, body)
+        print(
+            f"{name:<12} {statistics.median(r[0] for r in runs) * 1000:>11.0f} "
+            f"{statistics.median(r[1] for r in runs) * 1000:>12.0f} "
+            f"{top / 1e6:>10.1f} {frame_bytes / 1e6:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
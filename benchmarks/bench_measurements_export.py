@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memória para receber o CSV de GET /api/measurements/export.
+
+Cenários:
+- response.content: corpo inteiro lido pelo requests (comportamento
+  anterior de measurements.show, que passava response.content ao
+  download_button)
+- spool_export: corpo em blocos para um SpooledTemporaryFile, que passa
+  para o disco acima de EXPORT_SPOOL_BYTES (comportamento atual)
+
+Mede o pico de memória do Python (tracemalloc) e o tempo da recepção.
+Nos dois casos o download_button ainda guarda uma cópia do arquivo na
+memória do Streamlit; no atual ela é a única.
+
+Uso:
+    python benchmarks/bench_measurements_export.py --mb 50 100 200
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+logging.disable(logging.WARNING)
+
+import api  # noqa: E402
+from src.measurements import export_measurements_csv, spool_export  # noqa: E402
+from stub_server import StubBackend  # noqa: E402
+
+ROW = b"2025-01-01T00:00:00,1,10,3.70,25.5,21.0,20.5,31.2,0.45,1.25\n"
+
+
+def export_backend(size):
+    body = b"date,stationId,sensorId,batteryVoltage,boardTemperature,sensorTemperature," \
+        b"sampleTemperature,moisture,salinity,conductivity\n" + ROW * (size // len(ROW))
+    backend = StubBackend()
+    backend.route("GET", "/api/measurements/export", lambda h: (200, body, {"Content-Type": "text/csv"}))
+    return backend, len(body)
+
+
+def whole_body():
+    return len(export_measurements_csv("tok").content)
+
+
+def spooled():
+    spool, received = spool_export(export_measurements_csv("tok", stream=True))
+    spool.close()
+    return received
+
+
+SCENARIOS = {
+    "response.content": whole_body,
+    "spool_export": spooled,
+}
+
+
+def measure(receive):
+    tracemalloc.start()
+    start = time.perf_counter()
+    received = receive()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return received, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=int, nargs="+", default=[50, 100, 200])
+    args = parser.parse_args()
+
+    print(f"{'CSV (MB)':>9} {'cenário':<18} {'pico (MB)':>10} {'tempo (ms)':>11}")
+    for mb in args.mb:
+        backend, size = export_backend(mb * 1024 * 1024)
+        with backend:
+            api.base_url = backend.url
+            for name, receive in SCENARIOS.items():
+                received, elapsed, peak = measure(receive)
+                assert received == size
+                print(f"{mb:>9} {name:<18} {peak / 1024 / 1024:>10.1f} {elapsed * 1000:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
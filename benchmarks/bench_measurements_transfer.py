@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: download + decodificação de um lote grande de medições
+(/api/measurements) com e sem compressão.
+
+Cenários:
+- identity + json(): corpo sem compressão, lido inteiro e decodificado
+  de uma vez (comportamento anterior de dashboard.fetch_data)
+- gzip + json(): corpo comprimido, ainda lido inteiro
+- gzip + decode_measurements: corpo comprimido decodificado direto em
+  colunas por src.measurement_decoder (comportamento atual)
+
+Uso:
+    python benchmarks/bench_measurements_transfer.py --records 100000 --mbps 50
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+logging.disable(logging.WARNING)
+
+import api  # noqa: E402
+from src.measurement_decoder import decode_measurements  # noqa: E402
+from stub_server import StubBackend, sample_measurements  # noqa: E402
+
+
+def measurements_backend(records, mbps):
+    body = json.dumps(records).encode()
+    compressed = gzip.compress(body, compresslevel=6)
+
+    def handler(h):
+        if "gzip" in (h.headers.get("Accept-Encoding") or ""):
+            return 200, compressed, {"Content-Encoding": "gzip"}
+        return 200, body, {}
+
+    backend = StubBackend(bandwidth=mbps * 1_000_000 / 8 if mbps else None)
+    backend.route("GET", "/api/measurements", handler)
+    return backend, len(body), len(compressed)
+
+
+def load(scenario):
+    headers = {"Accept-Encoding": "identity"} if scenario == "identity + json()" else None
+    response = api.api_request("GET", "/api/measurements", token="t", headers=headers)
+    if scenario == "gzip + decode_measurements":
+        return decode_measurements(response.content)
+    return response.json()
+
+
+def run(scenario, runs, expected):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        data = load(scenario)
+        times.append((time.perf_counter() - start) * 1000)
+        assert len(data) == expected
+    del data
+
+    tracemalloc.start()
+    load(scenario)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--mbps",
+        type=float,
+        default=50.0,
+        help="banda simulada até o backend em Mbit/s (0 = loopback sem limite)",
+    )
+    args = parser.parse_args()
+
+    records = sample_measurements(args.records)
+    backend, plain_size, gzip_size = measurements_backend(records, args.mbps)
+    del records
+    with backend:
+        api.base_url = backend.url
+        api.configure_retry(max_retries=0)
+        load("gzip + decode_measurements")  # aquecimento
+
+        print(
+            f"{args.records} medições: {plain_size / 1e6:.1f} MB sem compressão, "
+            f"{gzip_size / 1e6:.1f} MB gzip; banda {args.mbps or 'ilimitada'} Mbit/s"
+        )
+        print(f"{'cenário':<26} {'mediana (ms)':>13} {'pico (MB)':>10} {'rede (MB)':>10}")
+        for scenario in ("identity + json()", "gzip + json()", "gzip + decode_measurements"):
+            api.reset_client_stats()
+            median, peak = run(scenario, args.runs, args.records)
+            transfer = api.get_transfer_stats()["measurements"]
+            wire = transfer["wire_bytes"] / transfer["responses"]
+            print(f"{scenario:<26} {median:>13.0f} {peak / 1e6:>10.1f} {wire / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
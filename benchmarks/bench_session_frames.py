@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latência de cada clique em "Carregar Mais" (acrescentar uma
+página ao frame da sessão) da página 1 à 500.
+
+Cenários:
+- pd.concat: get + pd.concat([atual, página]) + set a cada clique
+  (comportamento anterior de session_frames.append); o custo cresce com
+  tudo o que já foi carregado
+- blocos: session_frames.append guarda a página como um bloco novo
+  (comportamento atual); a visão contígua só é montada no get
+
+Cada clique é seguido, como no app, de um rerun que lê a tabela inteira
+para exibir (get). Para cada faixa de páginas mostra a mediana do
+clique e a do get do rerun; no fim, os totais.
+
+Uso:
+    python benchmarks/bench_session_frames.py --pages 500 --page-rows 15
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.session_frames import SessionFrameStore  # noqa: E402
+
+CHECKPOINTS = (1, 10, 50, 100, 250, 500)
+
+
+def page(number, rows):
+    """Página formatada como em measurements.format_measurements."""
+    start = pd.Timestamp("2024-01-01") + pd.Timedelta(minutes=number * rows)
+    dates = pd.date_range(start, periods=rows, freq="min")
+    return pd.DataFrame({
+        "ID": np.arange(number * rows, (number + 1) * rows),
+        "Data": dates.tz_localize("America/Sao_Paulo"),
+        "ID do Sensor": np.full(rows, 7),
+        "Umidade": np.random.default_rng(number).uniform(10, 40, rows),
+        "Temperatura": np.random.default_rng(number + 1).uniform(15, 35, rows),
+    })
+
+
+def concat_click(store, state, frame):
+    current = store.get("data", state)
+    store.set("data", pd.concat([current, frame], ignore_index=True), state)
+
+
+def chunk_click(store, state, frame):
+    store.append("data", frame, state)
+
+
+SCENARIOS = {
+    "pd.concat": concat_click,
+    "blocos": chunk_click,
+}
+
+
+def run(click, pages, rows, spill_dir):
+    # Orçamentos folgados: mede só o acréscimo, sem despejo para o disco
+    store = SessionFrameStore(session_bytes=1 << 40, total_bytes=1 << 40, spill_dir=spill_dir)
+    state = {}
+    store.set("data", page(0, rows), state)
+    clicks, reruns = [], []
+    for number in range(1, pages + 1):
+        frame = page(number, rows)
+        start = time.perf_counter()
+        click(store, state, frame)
+        clicks.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        data = store.get("data", state)
+        reruns.append(time.perf_counter() - start)
+    assert len(data) == (pages + 1) * rows
+    return clicks, reruns
+
+
+def window(latencies, page_number):
+    """Mediana de até 10 cliques terminando na página pedida."""
+    return statistics.median(latencies[max(0, page_number - 10):page_number])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--page-rows", type=int, default=15)
+    args = parser.parse_args()
+
+    checkpoints = [p for p in CHECKPOINTS if p <= args.pages]
+    results = {}
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for name, click in SCENARIOS.items():
+            results[name] = run(click, args.pages, args.page_rows, spill_dir)
+
+    print(f"{args.pages} cliques de {args.page_rows} linhas (ms)")
+    print(f"{'página':>8} " + " ".join(
+        f"{name + ' clique':>18} {name + ' get':>15}" for name in SCENARIOS
+    ))
+    for number in checkpoints:
+        print(f"{number:>8} " + " ".join(
+            f"{window(results[name][0], number) * 1000:>18.3f} "
+            f"{window(results[name][1], number) * 1000:>15.3f}"
+            for name in SCENARIOS
+        ))
+    print(f"{'total':>8} " + " ".join(
+        f"{sum(results[name][0]) * 1000:>18.0f} {sum(results[name][1]) * 1000:>15.0f}"
+        for name in SCENARIOS
+    ))
+
+
+if __name__ == "__main__":
+    main()
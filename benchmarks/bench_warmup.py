@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tempo até a primeira interação de cada aba logo após o login,
+com e sem a pré-carga da topologia (src/warmup.py).
+
+Cada rodada simula um processo novo: cache de referência vazio, login
+(token aceito pelo backend), pré-carga disparada ou não e, depois de
+--think-ms (rerun pós-login + clique na aba), a carga que a aba faz na
+primeira visita, com os mesmos getters usados pelas telas.
+
+Abas:
+- Ativações/Consumos: lista de controladores (controller_selector)
+- Válvulas: controladores + válvulas do primeiro controlador
+- Sensores: estações + sensores da primeira estação
+- Tarifas: tarifa vigente
+- todas as abas: as quatro visitas em sequência
+
+Uso:
+    python benchmarks/bench_warmup.py --stations 6 --controllers 4 --latency-ms 60
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+logging.disable(logging.WARNING)
+
+import api  # noqa: E402
+from src.controllers import get_controllers  # noqa: E402
+from src.ui_components import (  # noqa: E402
+    cache_tag,
+    get_current_tariff_cached,
+    get_monitoring_stations_cached,
+    get_sensors_cached,
+    get_valves_cached,
+    reference_cache,
+)
+from src.warmup import start_warm_up  # noqa: E402
+from stub_server import StubBackend  # noqa: E402
+
+
+def topology_backend(stations, controllers, latency):
+    backend = StubBackend(request_delay=latency)
+    backend.route("GET", "/api/monitoring-stations", lambda h: [
+        {"id": i, "name": f"Estação {i}"} for i in range(1, stations + 1)
+    ])
+    backend.route("GET", "/api/controllers", lambda h: [
+        {"id": i, "name": f"Controlador {i}"} for i in range(1, controllers + 1)
+    ])
+    backend.route("GET", "/api/tariff-schedules/current", lambda h: {
+        "id": 1, "daytimeTariff": 0.75, "nighttimeTariff": 0.45, "nighttimeDiscount": 40.0,
+    })
+    for i in range(1, stations + 1):
+        backend.route("GET", f"/api/monitoring-stations/{i}/sensors", lambda h, i=i: [
+            {"id": i * 10 + s, "name": f"Sensor {s}"} for s in range(4)
+        ])
+    for i in range(1, controllers + 1):
+        backend.route("GET", f"/api/controllers/{i}/valves", lambda h, i=i: [
+            {"id": i * 10 + v, "name": f"Válvula {v}"} for v in range(6)
+        ])
+    backend.route("GET", "/api/login-check", lambda h: {})
+    return backend
+
+
+def controllers_tab(token):
+    return reference_cache.get(token, cache_tag("controllers"), get_controllers)
+
+
+def valves_tab(token):
+    controllers = controllers_tab(token)
+    return get_valves_cached(token, controllers[0]["id"])
+
+
+def sensors_tab(token):
+    stations = get_monitoring_stations_cached(token)
+    return get_sensors_cached(token, stations[0]["id"])
+
+
+def tariffs_tab(token):
+    return get_current_tariff_cached(token)
+
+
+def all_tabs(token):
+    for tab in (controllers_tab, valves_tab, sensors_tab, tariffs_tab):
+        tab(token)
+
+
+TABS = {
+    "Ativações/Consumos": controllers_tab,
+    "Válvulas": valves_tab,
+    "Sensores": sensors_tab,
+    "Tarifas": tariffs_tab,
+    "todas as abas": all_tabs,
+}
+
+
+def login():
+    """Token novo, aceito pelo backend (escopo conhecido), como após get_token."""
+    payload = json.dumps({"role": "Admin", "exp": time.time() + 3600}).encode()
+    token = "eyJhbGciOiJIUzI1NiJ9." + base64.urlsafe_b64encode(payload).rstrip(b"=").decode() + ".x"
+    api.api_request("GET", "/api/login-check", token=token)
+    return token
+
+
+def first_visit(tab, warm, think):
+    reference_cache.clear()
+    token = login()
+    thread = start_warm_up(token) if warm else None
+    time.sleep(think)
+    start = time.perf_counter()
+    tab(token)
+    elapsed = time.perf_counter() - start
+    if thread is not None:
+        thread.join()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stations", type=int, default=6)
+    parser.add_argument("--controllers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=60)
+    parser.add_argument("--think-ms", type=float, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with topology_backend(args.stations, args.controllers, args.latency_ms / 1000) as backend:
+        api.base_url = backend.url
+        print(
+            f"{args.stations} estações, {args.controllers} controladores, "
+            f"latência {args.latency_ms:.0f} ms, {args.think_ms:.0f} ms até a aba"
+        )
+        print(f"{'aba':<20} {'sem pré-carga (ms)':>19} {'com pré-carga (ms)':>19}")
+        for name, tab in TABS.items():
+            cold = [first_visit(tab, False, args.think_ms / 1000) for _ in range(args.runs)]
+            warm = [first_visit(tab, True, args.think_ms / 1000) for _ in range(args.runs)]
+            print(
+                f"{name:<20} {statistics.median(cold) * 1000:>19.0f} "
+                f"{statistics.median(warm) * 1000:>19.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
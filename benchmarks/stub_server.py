@@ -0,0 +1,192 @@
+"""
+Servidor HTTP local que imita o backend do IrrigoSystem para benchmarks.
+
+Fala HTTP/1.1 com keep-alive e permite simular o custo de abertura de
+conexão (handshake TCP/TLS) e a latência de processamento por requisição.
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+def sample_home():
+    return {
+        "gateway": True,
+        "monitoringStations": [
+            {
+                "id": i,
+                "name": f"Estação {i}",
+                "status": i % 3 != 0,
+                "averageMoisture": 30.0 + i,
+                "moistureLimit": "between",
+            }
+            for i in range(1, 7)
+        ],
+        "controllers": [
+            {"id": i, "name": f"Controlador {i}", "status": True, "numberOfValvesOn": i}
+            for i in range(1, 4)
+        ],
+    }
+
+
+def sample_health():
+    return {
+        "broker": True,
+        "monitoringStations": [
+            {
+                "id": i,
+                "name": f"Estação {i}",
+                "sensors": [{"id": i * 10 + s, "status": s % 2 == 0} for s in range(4)],
+            }
+            for i in range(1, 7)
+        ],
+    }
+
+
+def sample_measurements(n, start_id=1):
+    """Registros no formato Measurement do swagger.yml."""
+    records = []
+    for i in range(start_id, start_id + n):
+        records.append({
+            "id": i,
+            "date": f"2025-01-{1 + (i // 86400) % 28:02d}T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}",
+            "stationId": 1 + i % 6,
+            "sensorId": 10 + i % 24,
+            "batteryVoltage": round(3.3 + (i % 90) / 100, 2),
+            "boardTemperature": round(20 + (i % 150) / 10, 1),
+            "sensorTemperature": round(18 + (i % 120) / 10, 1),
+            "sampleTemperature": round(17 + (i % 110) / 10, 1),
+            "moisture": round(15 + (i % 400) / 10, 1),
+            "salinity": round((i % 500) / 100, 2),
+            "conductivity": None if i % 7 == 0 else round(0.5 + (i % 300) / 100, 2),
+        })
+    return records
+
+
+class StubBackend:
+    """
+    Backend falso em thread própria.
+
+    routes: dict "METHOD /path" -> callable(handler) que retorna
+    (status, body_bytes, headers_dict) ou um objeto serializável em JSON.
+    """
+
+    def __init__(self, routes=None, handshake_delay=0.0, request_delay=0.0, bandwidth=None):
+        self.routes = dict(routes or {})
+        self.handshake_delay = handshake_delay
+        self.request_delay = request_delay
+        # Banda simulada do link até o backend (bytes/s); None = loopback
+        self.bandwidth = bandwidth
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, method, path, handler):
+        self.routes[f"{method} {path}"] = handler
+
+    def _make_handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Como servidores reais: sem Nagle, cabeçalho e corpo não esperam ACK
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with backend._lock:
+                    backend.connections += 1
+                if backend.handshake_delay:
+                    time.sleep(backend.handshake_delay)
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self, method):
+                with backend._lock:
+                    backend.requests += 1
+                if backend.request_delay:
+                    time.sleep(backend.request_delay)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                path = urlsplit(self.path).path
+                handler = backend.routes.get(f"{method} {path}")
+                if handler is None:
+                    self._reply(404, b'{"message": "Not Found"}', {})
+                    return
+                result = handler(self)
+                if isinstance(result, tuple):
+                    status, body, headers = result
+                else:
+                    status, body, headers = 200, json.dumps(result).encode(), {}
+                self._reply(status, body, headers)
+
+            def _reply(self, status, body, headers):
+                self.send_response(status)
+                headers = dict(headers)
+                headers.setdefault("Content-Type", "application/json")
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self._write_body(body)
+
+            def _write_body(self, body):
+                if not backend.bandwidth:
+                    self.wfile.write(body)
+                    return
+                block = 64 * 1024
+                for start in range(0, len(body), block):
+                    piece = body[start:start + block]
+                    self.wfile.write(piece)
+                    time.sleep(len(piece) / backend.bandwidth)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_HEAD(self):
+                self._dispatch("HEAD")
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def dashboard_backend(**kwargs):
+    """Backend com os endpoints usados na aba Dashboard e no sidebar."""
+    backend = StubBackend(**kwargs)
+    backend.route("GET", "/api/home", lambda h: sample_home())
+    backend.route("GET", "/api/health", lambda h: sample_health())
+    return backend
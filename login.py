@@ -5,6 +5,7 @@ import pickle
 from datetime import datetime, timedelta
 
 from api import get_token
+from src.warmup import start_warm_up
 
 # Constante para armazenamento da sessão
 SESSION_FILE = ".session_data"
@@ -51,6 +52,9 @@ def process_login(email, password, keep_logged_in=False):
         if token:
             st.session_state["token"] = token
             st.session_state["authenticated"] = True
+            # Topologia (estações, sensores, controladores, válvulas,
+            # tarifa) carregada em segundo plano enquanto o app abre
+            start_warm_up(token)
             
             # Se o usuário marcou "Manter conectado", salva a sessão
             if keep_logged_in:
@@ -0,0 +1,111 @@
+# src/cache_panel.py
+"""
+Painel de observabilidade dos caches (somente administradores).
+
+Mostra, para cada cache registrado com api.register_cache: acertos,
+faltas, entregas vencidas (stale), remoções, entradas e bytes
+aproximados, com o detalhamento por família de endpoints/tag de cada um.
+Serve para ajustar TTLs e limites de tamanho com números em vez de
+palpites.
+"""
+
+import pandas as pd
+import streamlit as st
+
+import api
+from src.ui_components import ComponentLibrary
+
+ADMIN_ROLE = "admin"
+ROLE_CLAIMS = (
+    "role",
+    "roles",
+    "http://schemas.microsoft.com/ws/2008/06/identity/claims/role",
+)
+
+COLUMNS = {
+    "hit_ratio": "Taxa de acerto",
+    "hits": "Acertos",
+    "stale": "Vencidos servidos",
+    "misses": "Faltas",
+    "evictions": "Remoções",
+    "entries": "Entradas",
+    "bytes": "Bytes (aprox.)",
+}
+
+
+def is_admin(token):
+    """
+    Perfil admin nas claims do token. A assinatura não é verificada aqui
+    (api.token_claims): o painel só exibe contadores locais do processo.
+    """
+    claims = api.token_claims(token)
+    for claim in ROLE_CLAIMS:
+        value = claims.get(claim)
+        roles = value if isinstance(value, list) else [value]
+        if any(isinstance(role, str) and role.lower() == ADMIN_ROLE for role in roles):
+            return True
+    return False
+
+
+def _row(counts):
+    row = {column: counts.get(key) for key, column in COLUMNS.items()}
+    ratio = counts.get("hit_ratio")
+    row[COLUMNS["hit_ratio"]] = ratio * 100 if ratio is not None else None
+    return row
+
+
+def stats_frames(stats):
+    """
+    (visão geral, {cache: detalhamento}) como DataFrames prontos para
+    exibir; a taxa de acerto vai em porcentagem.
+    """
+    overview = pd.DataFrame(
+        [dict(Cache=name, **_row(entry)) for name, entry in stats.items()],
+        columns=["Cache"] + list(COLUMNS.values()),
+    )
+    breakdowns = {}
+    for name, entry in stats.items():
+        by_key = {key: counts for key, counts in entry.get("by_key", {}).items() if key}
+        if by_key:
+            breakdowns[name] = pd.DataFrame(
+                [dict(Chave=key, **_row(counts)) for key, counts in sorted(by_key.items())],
+                columns=["Chave"] + list(COLUMNS.values()),
+            )
+    return overview, breakdowns
+
+
+def show():
+    st.title("🗄️ Caches")
+
+    token = st.session_state.get("token")
+    if not token or not is_admin(token):
+        ComponentLibrary.alert(
+            "Acesso restrito a administradores.",
+            alert_type="error"
+        )
+        return
+
+    st.caption(
+        "Contadores desde o início do processo (ou do último reset), "
+        "somados entre todas as sessões."
+    )
+    if st.button("🔄 Zerar contadores", key="reset_cache_stats"):
+        api.reset_cache_stats()
+
+    overview, breakdowns = stats_frames(api.get_cache_stats())
+    percent = st.column_config.NumberColumn(format="%.1f%%")
+    st.dataframe(
+        overview,
+        hide_index=True,
+        use_container_width=True,
+        column_config={COLUMNS["hit_ratio"]: percent},
+    )
+
+    for name, frame in breakdowns.items():
+        with st.expander(f"Detalhamento: {name}"):
+            st.dataframe(
+                frame,
+                hide_index=True,
+                use_container_width=True,
+                column_config={COLUMNS["hit_ratio"]: percent},
+            )
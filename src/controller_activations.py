@@ -3,7 +3,8 @@ from datetime import date, datetime, time, timedelta
 import pandas as pd
 import streamlit as st
 
-from api import api_request
+from api import api_request, paginate
+from src.session_frames import session_frames
 from src.ui_components import (
     ComponentLibrary,
     LoadingStates,
@@ -65,6 +66,38 @@ def fetch_statuses(token, controller_id, page=1, start_date=None, end_date=None)
     return response
 
 
+def status_pages(token, controller_id, start_date=None, end_date=None, start_page=1):
+    """
+    Páginas de GET /api/controllers/{controllerId}/statuses (pageSize=15,
+    sort=desc) via api.paginate: a próxima página é buscada em segundo
+    plano enquanto a atual é exibida.
+    """
+    endpoint = f"/api/controllers/{controller_id}/statuses"
+    params = {"sort": "desc"}
+    if start_date:
+        params["startDate"] = start_date
+    if end_date:
+        params["endDate"] = end_date
+    return paginate(endpoint, params, 15, token=token, start_page=start_page)
+
+
+def close_status_pages():
+    pages = st.session_state.get("act_pages")
+    if pages is not None:
+        pages.close()
+    st.session_state.act_pages = None
+
+
+def open_status_pages(token, controller_id, start_date=None, end_date=None):
+    """
+    Reinicia a paginação da sessão e devolve os itens da 1ª página
+    (None se a requisição falhar).
+    """
+    close_status_pages()
+    st.session_state.act_pages = status_pages(token, controller_id, start_date, end_date)
+    return next(st.session_state.act_pages, None)
+
+
 def fetch_activations(token, controller_id, period=None):
     """
     GET /api/controllers/{controllerId}/activations
@@ -85,29 +118,28 @@ def fetch_activations(token, controller_id, period=None):
 
 def load_more_statuses():
     """
-    Incrementa a página e faz nova requisição, concatenando
-    os dados em st.session_state.act_data
+    Incrementa a página e consome a próxima página da paginação da sessão
+    (normalmente já buscada em segundo plano), acrescentando-a como um
+    bloco ao frame "act_data" da sessão (session_frames)
     """
     st.session_state.act_page += 1
 
-    resp = fetch_statuses(
-        token=st.session_state["token"],
-        controller_id=st.session_state["act_controller_id"],
-        page=st.session_state["act_page"],
-        start_date=st.session_state.get("act_start_date_str"),
-        end_date=st.session_state.get("act_end_date_str"),
-    )
-    if resp and resp.status_code == 200:
-        df_new = pd.DataFrame(resp.json())
-        if not df_new.empty:
-            st.session_state.act_data = pd.concat(
-                [st.session_state.act_data, df_new], ignore_index=True
-            )
-            ComponentLibrary.alert(f"Carregados mais {len(df_new)} registros!", "success")
-        else:
-            ComponentLibrary.alert("Não há mais dados para carregar.", "info")
+    pages = st.session_state.get("act_pages")
+    if pages is None:
+        pages = st.session_state.act_pages = status_pages(
+            token=st.session_state["token"],
+            controller_id=st.session_state["act_controller_id"],
+            start_date=st.session_state.get("act_start_date_str"),
+            end_date=st.session_state.get("act_end_date_str"),
+            start_page=st.session_state["act_page"],
+        )
+    items = next(pages, None)
+    if items:
+        df_new = pd.DataFrame(items)
+        session_frames.append("act_data", df_new)
+        ComponentLibrary.alert(f"Carregados mais {len(df_new)} registros!", "success")
     else:
-        ComponentLibrary.alert("Não foi possível carregar mais dados. Tente novamente.", "error")
+        ComponentLibrary.alert("Não há mais dados para carregar.", "info")
 
 
 def show():
@@ -166,9 +198,6 @@ def show_statuses_tab():
     if "act_page" not in st.session_state:
         st.session_state.act_page = 1
 
-    if "act_data" not in st.session_state:
-        st.session_state.act_data = pd.DataFrame()
-
     if "act_controller_id" not in st.session_state:
         st.session_state.act_controller_id = None
 
@@ -181,6 +210,9 @@ def show_statuses_tab():
     if "act_end_date_str" not in st.session_state:
         st.session_state.act_end_date_str = None
 
+    if "act_pages" not in st.session_state:
+        st.session_state.act_pages = None
+
     # -----------------------------------------------------------------
     # Seleção de controlador e filtros em seções organizadas
     # -----------------------------------------------------------------
@@ -201,7 +233,8 @@ def show_statuses_tab():
     # Se o controlador mudou, resetar paginação/dados
     if controller_id != st.session_state.act_previous_controller_id:
         st.session_state.act_page = 1
-        st.session_state.act_data = pd.DataFrame()
+        session_frames.clear("act_data")
+        close_status_pages()
         st.session_state.act_controller_id = controller_id
         st.session_state.act_previous_controller_id = controller_id
 
@@ -270,7 +303,7 @@ def show_statuses_tab():
 
             # Resetar paginação e dados
             st.session_state.act_page = 1
-            st.session_state.act_data = pd.DataFrame()
+            session_frames.clear("act_data")
 
             # Faz a primeira busca com loading melhorado
             with LoadingStates.progress_with_status("Buscando ativações...", 100) as (progress, status, container):
@@ -280,10 +313,9 @@ def show_statuses_tab():
                 progress.progress(70)
                 status.text("Consultando base de dados...")
                 
-                resp = fetch_statuses(
+                items = open_status_pages(
                     token,
                     controller_id,
-                    st.session_state.act_page,
                     start_date_str,
                     end_date_str,
                 )
@@ -291,9 +323,8 @@ def show_statuses_tab():
                 progress.progress(100)
                 status.text("Processando resultados...")
 
-            if resp and resp.status_code == 200:
-                df = pd.DataFrame(resp.json())
-                st.session_state.act_data = df
+            if items is not None:
+                session_frames.set("act_data", pd.DataFrame(items))
                 ComponentLibrary.alert("Consulta realizada com sucesso!", "success")
             else:
                 ComponentLibrary.alert(
@@ -304,7 +335,7 @@ def show_statuses_tab():
     # -----------------------------------------------------------------
     # Se temos act_data vazio e nenhuma requisição feita, busca inicial
     # -----------------------------------------------------------------
-    if st.session_state.act_page == 1 and st.session_state.act_data.empty:
+    if st.session_state.act_page == 1 and session_frames.get("act_data").empty:
         # Carregamos sem filtros customizados, usando start_date/end_date default
         if start_date > end_date:
             ComponentLibrary.alert("Data de início deve ser anterior à data de fim.", "error")
@@ -314,24 +345,23 @@ def show_statuses_tab():
         st.session_state.act_end_date_str = format_datetime(end_date, end_time)
 
         with LoadingStates.spinner_with_cancel("Carregando dados iniciais..."):
-            resp = fetch_statuses(
+            items = open_status_pages(
                 token,
                 controller_id,
-                st.session_state.act_page,
                 st.session_state.act_start_date_str,
                 st.session_state.act_end_date_str,
             )
             
-        if resp and resp.status_code == 200:
-            df = pd.DataFrame(resp.json())
-            st.session_state.act_data = df
+        if items is not None:
+            session_frames.set("act_data", pd.DataFrame(items))
         else:
             ComponentLibrary.alert("Nenhum dado disponível ou falha na requisição.", "warning")
 
     # -----------------------------------------------------------------
     # Exibição da tabela e botão "Carregar mais"
     # -----------------------------------------------------------------
-    if not st.session_state.act_data.empty:
+    act_data = session_frames.get("act_data")
+    if not act_data.empty:
         st.markdown("### 📊 Resultados da Consulta")
         
         # Card com informações do período
@@ -342,13 +372,13 @@ def show_statuses_tab():
             title="Dados Carregados",
             content=f"""- **Controlador**: {controller_name}
 - **Período**: {start_disp} até {end_disp}
-- **Registros**: {len(st.session_state.act_data)} ativações""",
+- **Registros**: {len(act_data)} ativações""",
             icon="📊",
             color="success"
         )
 
         # Tabela com dados
-        st.dataframe(st.session_state.act_data, use_container_width=True)
+        st.dataframe(act_data, use_container_width=True)
 
         # Botão carregar mais com estilo moderno
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -15,6 +15,7 @@ from src.ui_components import (
     enhanced_empty_state,
     geographic_coordinates_input,
     handle_api_response_v2,
+    invalidate_caches_after_mutation,
     power_input,
     validate_coordinates,
     cast_to_double,
@@ -290,7 +291,7 @@ def show_create_controller(token):
                     f"O controlador **{name}** foi adicionado ao sistema com potência de {pump_power}W.",
                     alert_type="success",
                 )
-                st.rerun()
+                invalidate_caches_after_mutation("controllers")
 
 
 def show_edit_controller(token):
@@ -374,7 +375,9 @@ def show_edit_controller(token):
             )
 
             if handle_api_response_v2(resp, "Controlador atualizado com sucesso!"):
-                st.rerun()
+                invalidate_caches_after_mutation(
+                    "controllers", controller=selected_controller["id"]
+                )
 
 
 def show_delete_controller(token):
@@ -414,7 +417,9 @@ def show_delete_controller(token):
         resp = delete_controller(token, selected_controller["id"])
 
         if handle_api_response_v2(resp, "Controlador excluído com sucesso!"):
-            st.rerun()
+            invalidate_caches_after_mutation(
+                "controllers", deleted=True, controller=selected_controller["id"]
+            )
 
 
 def show():
@@ -579,7 +584,9 @@ def show_edit_controller_modern(token):
                     f"As alterações no controlador **{new_name}** foram salvas.",
                     alert_type="success",
                 )
-                st.rerun()
+                invalidate_caches_after_mutation(
+                    "controllers", controller=selected_controller["id"]
+                )
 
 
 def show_delete_controller_modern(token):
@@ -663,4 +670,6 @@ def show_delete_controller_modern(token):
                     f"O controlador **{selected_controller['name']}** foi removido permanentemente do sistema.",
                     alert_type="success",
                 )
-                st.rerun()
+                invalidate_caches_after_mutation(
+                    "controllers", deleted=True, controller=selected_controller["id"]
+                )
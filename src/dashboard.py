@@ -6,15 +6,14 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
-from api import api_request
+from api import PageFetchError
+from src.measurement_cache import measurement_cache
+from src.stations_repository import list_sensor_ids, list_stations
 
 
 def rename_columns(df):
     if not df.empty:
-        # Formatar datas para o padrão brasileiro
-        if "date" in df.columns:
-            df["date"] = df["date"].dt.strftime("%d/%m/%Y %H:%M:%S")
-
+        # Datas seguem datetime64 (eixo de tempo nos gráficos)
         columns_mapping = {
             "id": "ID",
             "date": "Data",
@@ -35,12 +34,7 @@ def obter_estacoes_cadastradas():
     if not token:
         st.error("Usuário não autenticado.")
         return []
-    response = api_request("GET", "/api/monitoring-stations", token=token)
-    if response and response.status_code == 200:
-        return response.json()
-    else:
-        st.error("Falha ao obter estações cadastradas.")
-        return []
+    return list_stations(token)
 
 
 def obter_sensores_por_estacao(station_id):
@@ -48,15 +42,7 @@ def obter_sensores_por_estacao(station_id):
     if not token:
         st.error("Usuário não autenticado.")
         return []
-    endpoint = f"/api/monitoring-stations/{station_id}/sensors"
-    response = api_request("GET", endpoint, token=token)
-    if response and response.status_code == 200:
-        sensors = response.json()
-        sensor_ids = [sensor["id"] for sensor in sensors]
-        return sensor_ids
-    else:
-        st.error("Falha ao obter sensores da estação selecionada.")
-        return []
+    return list_sensor_ids(token, station_id)
 
 
 def format_datetime(date_value, time_value):
@@ -80,34 +66,22 @@ def fetch_data(start_date=None, end_date=None, station_id=None):
         st.warning("Nenhum sensor encontrado para a estação selecionada.")
         return pd.DataFrame()
 
-    endpoint = "/api/measurements?pageSize=10000"
-    params = {}
-    if start_date:
-        params["startDate"] = start_date
-    if end_date:
-        params["endDate"] = end_date
-    params["sensorIds"] = ",".join(map(str, sensor_ids))
-
     with st.spinner("Carregando dados..."):
-        response = api_request("GET", endpoint, token=token, params=params)
-
-    if not response:
-        return pd.DataFrame()
-
-    if response.status_code == 200:
-        data = response.json()
-        df = pd.DataFrame(data)
-        if not df.empty and "date" in df.columns:
-            df["date"] = (
-                pd.to_datetime(df["date"])
-                .dt.tz_localize("UTC")
-                .dt.tz_convert("America/Sao_Paulo")
-            )
-        rename_columns(df)
-        return df
-    else:
-        st.error("Falha ao buscar dados da API.")
-        return pd.DataFrame()
+        # Dias já vistos vêm do cache por dia; só o que falta vai à API
+        try:
+            df = measurement_cache.query(token, start_date, end_date, station_id=station_id)
+        except PageFetchError as e:
+            st.error(f"Falha ao buscar dados da API: {e}")
+            return pd.DataFrame()
+
+    if not df.empty and "date" in df.columns:
+        df["date"] = (
+            df["date"]
+            .dt.tz_localize("UTC")
+            .dt.tz_convert("America/Sao_Paulo")
+        )
+    rename_columns(df)
+    return df
 
 
 def show():
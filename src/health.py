@@ -1,6 +1,6 @@
 import streamlit as st
 
-from api import api_request
+from api import api_request, get_circuit_states, is_api_degraded
 
 
 def fetch_health_check():
@@ -13,9 +13,30 @@ def fetch_health_check():
     return {}
 
 
-def show_health_in_sidebar():
-    # Obter dados
-    data = fetch_health_check()
+def show_api_degraded_notice():
+    """Aviso imediato (sem chamada à rede) quando algum circuito está aberto."""
+    if not is_api_degraded():
+        return
+    families = [
+        f"/api/{family}"
+        for family, state in get_circuit_states().items()
+        if state["state"] != "closed"
+    ]
+    st.warning("⚠️ API degradada: " + ", ".join(sorted(families)))
+
+
+# Valor padrão de show_health_in_sidebar: a página não buscou o health
+# neste rerun. None/{} significa que buscou e falhou.
+NOT_LOADED = object()
+
+
+def show_health_in_sidebar(data=NOT_LOADED):
+    show_api_degraded_notice()
+
+    # Obter dados (reaproveita o health já carregado pela página, se houver;
+    # se a página já tentou e falhou, não busca de novo no mesmo rerun)
+    if data is NOT_LOADED:
+        data = fetch_health_check()
     if not data:
         st.write("Falha ao obter Health Check.")
         return
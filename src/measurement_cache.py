@@ -0,0 +1,259 @@
+# src/measurement_cache.py
+"""
+Cache de medições (GET /api/measurements) em blocos de um dia UTC por
+(estação, sensor).
+
+Uma consulta por período é montada com os blocos já guardados; só os dias
+que faltam vão ao backend, agrupados em intervalos contíguos e buscados
+em fatias paralelas (src/measurement_loader.py). Blocos que
+terminaram há mais de MEASUREMENT_SETTLE_HOURS não mudam mais e nunca
+expiram; os recentes (o de hoje incluído) são buscados de novo depois de
+MEASUREMENT_REFRESH_SECONDS.
+
+O cache é do processo, limitado em bytes (LRU), e compartilhado entre
+sessões pelo escopo do token (api.token_scope), como o reference_cache
+dos seletores. Token sem escopo conhecido consulta o backend direto.
+Com MEASUREMENT_STORE_PATH os dias assentados também vão para o disco
+(src/measurement_store.py) e sobrevivem a reinícios.
+
+prefetch_in_background carrega um período inteiro numa thread própria,
+para quem exibe uma parte dele já (a primeira página de Medições) e
+consulta o resto depois.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import api
+from src.measurement_loader import load_measurements
+from src.measurement_store import open_default_store
+
+
+def _env_number(name, default, cast=float):
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+BUCKET = timedelta(days=1)
+# Dias encerrados há mais que isso não recebem medições atrasadas
+SETTLE_HOURS = _env_number("MEASUREMENT_SETTLE_HOURS", 48.0)
+# Validade dos blocos ainda não assentados (s)
+REFRESH_SECONDS = _env_number("MEASUREMENT_REFRESH_SECONDS", 60.0)
+# Limite de memória do cache (bytes dos DataFrames)
+CACHE_BYTES = _env_number("MEASUREMENT_CACHE_BYTES", 128 * 1024 * 1024, int)
+
+
+def to_utc(value):
+    """str ISO/datetime/date -> Timestamp UTC sem fuso (como as datas da API)."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts
+
+
+class _Bucket:
+    __slots__ = ("frame", "size", "settled", "fetched_at")
+
+    def __init__(self, frame, settled, fetched_at):
+        self.frame = frame
+        self.size = int(frame.memory_usage(deep=True).sum())
+        self.settled = settled
+        self.fetched_at = fetched_at
+
+
+class MeasurementSegmentCache:
+    def __init__(
+        self,
+        max_bytes=CACHE_BYTES,
+        settle_hours=SETTLE_HOURS,
+        refresh_seconds=REFRESH_SECONDS,
+        store=None,
+    ):
+        self.max_bytes = max_bytes
+        # Segunda camada (disco) só para dias assentados
+        self.store = store
+        self.settle = timedelta(hours=settle_hours)
+        self.refresh_seconds = refresh_seconds
+        self._buckets = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._prefetching = set()
+        self.counters = api.CacheStats()
+
+    def query(self, token, start, end, station_id=None, sensor_id=None):
+        """
+        Medições com start <= date <= end, em ordem decrescente de data e
+        com as colunas de decode_measurements (date em UTC sem fuso).
+
+        Levanta api.PageFetchError se um dia que falta não puder ser
+        buscado; nada é guardado nesse caso.
+        """
+        start, end = to_utc(start), to_utc(end)
+        if start > end:
+            return pd.DataFrame()
+        parts = [frame for frame in self._load(token, start, end, station_id, sensor_id) if not frame.empty]
+        if not parts:
+            return pd.DataFrame()
+        df = pd.concat(parts, ignore_index=True)
+        df = df[(df["date"] >= start) & (df["date"] <= end)]
+        return df.sort_values("date", ascending=False, kind="stable").reset_index(drop=True)
+
+    def prefetch(self, token, start, end, station_id=None, sensor_id=None):
+        """
+        Busca e guarda os dias do período que faltam, sem montar o
+        resultado. Não faz nada para token sem escopo (nada seria guardado).
+        """
+        start, end = to_utc(start), to_utc(end)
+        if start <= end and api.token_scope(token) is not None:
+            self._load(token, start, end, station_id, sensor_id)
+
+    def prefetch_in_background(self, token, start, end, station_id=None, sensor_id=None):
+        """
+        Dispara prefetch numa thread própria e retorna na hora (a thread, ou
+        None). Uma por escopo, período, estação e sensor; falhas só deixam
+        os dias para a consulta sob demanda.
+        """
+        scope = api.token_scope(token)
+        if scope is None:
+            return None
+        key = (scope, to_utc(start), to_utc(end), station_id, sensor_id)
+        with self._lock:
+            if key in self._prefetching:
+                return None
+            self._prefetching.add(key)
+
+        def run():
+            try:
+                self.prefetch(token, start, end, station_id, sensor_id)
+            except api.PageFetchError:
+                pass
+            finally:
+                with self._lock:
+                    self._prefetching.discard(key)
+
+        # Thread própria (não um worker do pool): as fatias usam o
+        # api.get_executor() e esperam por ele
+        thread = threading.Thread(target=run, name="measurement-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self, token, start, end, station_id, sensor_id):
+        """Blocos dos dias de start a end, do cache ou do backend, em ordem."""
+        station_id = int(station_id) if station_id else None
+        sensor_id = int(sensor_id) if sensor_id else None
+        scope = api.token_scope(token)
+        days = list(pd.date_range(start.floor("D"), end.floor("D"), freq="D"))
+
+        frames = {}
+        missing = []
+        settled_until = datetime.utcnow() - self.settle
+        for day in days:
+            frame = self._get((scope, station_id, sensor_id, day)) if scope is not None else None
+            kind = _kind(day + BUCKET <= settled_until)
+            if frame is None:
+                self.counters.record("misses", kind)
+                missing.append(day)
+            else:
+                self.counters.record("hits", kind)
+                frames[day] = frame
+
+        if missing:
+            fetched = load_measurements(
+                token,
+                [(run[0], run[-1] + BUCKET) for run in _contiguous(missing)],
+                station_id=station_id,
+                sensor_id=sensor_id,
+            )
+            by_day = {}
+            if not fetched.empty:
+                by_day = {day: part for day, part in fetched.groupby(fetched["date"].dt.floor("D"))}
+            now = datetime.utcnow()
+            for day in missing:
+                part = by_day[day].reset_index(drop=True) if day in by_day else fetched.iloc[:0]
+                frames[day] = part
+                if scope is not None:
+                    settled = day + BUCKET <= now - self.settle
+                    self._put((scope, station_id, sensor_id, day), part, settled)
+        return [frames[day] for day in days]
+
+    def _get(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None and (
+                bucket.settled or time.monotonic() - bucket.fetched_at <= self.refresh_seconds
+            ):
+                self._buckets.move_to_end(key)
+                return bucket.frame
+        if bucket is None and self.store is not None:
+            frame = self.store.get(key)
+            if frame is not None:
+                self._remember(key, frame, settled=True)
+            return frame
+        return None
+
+    def _put(self, key, frame, settled):
+        self._remember(key, frame, settled)
+        if settled and self.store is not None:
+            self.store.put(key, frame)
+
+    def _remember(self, key, frame, settled):
+        bucket = _Bucket(frame, settled, time.monotonic())
+        if bucket.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._buckets.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._buckets[key] = bucket
+            self._bytes += bucket.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._buckets.popitem(last=False)
+                self._bytes -= evicted.size
+                self.counters.record("evictions", _kind(evicted.settled))
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "settled": sum(1 for b in self._buckets.values() if b.settled),
+                "bytes": self._bytes,
+            }
+
+    def cache_stats(self):
+        with self._lock:
+            sizes = [(_kind(bucket.settled), bucket.size) for bucket in self._buckets.values()]
+        return self.counters.snapshot(sizes)
+
+
+def _kind(settled):
+    """Detalhamento das estatísticas: dias assentados x recentes."""
+    return "dias assentados" if settled else "dias recentes"
+
+
+def _contiguous(days):
+    """Agrupa dias consecutivos: [1, 2, 4] -> [[1, 2], [4]]."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][-1] == BUCKET:
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+measurement_cache = MeasurementSegmentCache(store=open_default_store())
+api.register_cache("Medições por dia (memória)", measurement_cache)
+if measurement_cache.store is not None:
+    api.register_cache("Medições por dia (disco)", measurement_cache.store)
@@ -0,0 +1,133 @@
+# src/measurement_decoder.py
+"""
+Decodificação rápida de listas de Measurement (swagger.yml) para DataFrame.
+
+O caminho padrão (response.json() -> lista de dicts -> pd.DataFrame) cria
+um dict Python por linha. Aqui o corpo JSON é convertido direto em CSV
+(as chaves viram colunas categóricas conferidas depois) e lido pelo
+parser C do pandas, que já monta as colunas tipadas em NumPy. Qualquer
+corpo fora do formato esperado (chaves fora de ordem, campos
+desconhecidos, null em coluna inteira, escapes em strings) cai no caminho
+genérico, com o mesmo resultado.
+"""
+
+import io
+import json
+
+import pandas as pd
+
+# Tipos conforme o schema Measurement do swagger.yml
+MEASUREMENT_DTYPES = {
+    "id": "int64",
+    "stationId": "int32",
+    "sensorId": "int32",
+    "batteryVoltage": "float64",
+    "boardTemperature": "float64",
+    "sensorTemperature": "float64",
+    "sampleTemperature": "float64",
+    "moisture": "float64",
+    "salinity": "float64",
+    "conductivity": "float64",  # nullable: null vira NaN
+}
+DATE_COLUMNS = ("date",)
+KNOWN_COLUMNS = set(MEASUREMENT_DTYPES) | set(DATE_COLUMNS)
+
+
+def _decode_columnar(content):
+    """Retorna o DataFrame ou None se o corpo não serve para o caminho rápido."""
+    body = content.strip()
+    # Sem escapes nenhuma string contém aspas, então '":' só aparece no fim
+    # de uma chave e as strings entre aspas valem igual em CSV
+    if not (body.startswith(b"[") and body.endswith(b"]")) or b"\\" in body:
+        return None
+    start = body.find(b"{")
+    end = body.rfind(b"}")
+    if start < 0:
+        return pd.DataFrame() if not body[1:-1].strip() else None
+    if body[1:start].strip() or body[end + 1 : -1].strip():
+        return None
+
+    # Chaves e separador entre itens (compacto ou com espaço) do 1º objeto
+    first_text = body[start : body.find(b"}", start) + 1]
+    names = list(json.loads(first_text))
+    if not names or not set(names) <= KNOWN_COLUMNS:
+        return None
+    item_sep = b", " if len(names) > 1 and b', "' + names[1].encode() in first_text else b","
+
+    # {"id":1,"date":"..."},{"id":2,...}  ->  "id",1,"date","...",\n "id",2,...
+    # Trocas de mesmo tamanho; só uma cópia do corpo fica viva até o parser
+    rows = body[start + 1 : end].replace(b'":', b'",')
+    rows = rows.replace(b"}" + item_sep + b"{", b",\n" + b" " * len(item_sep))
+
+    # Cada chave vira uma coluna categórica: a ordem é conferida sem criar
+    # um objeto Python por célula
+    key_columns = [f"__key_{name}" for name in names]
+    dtypes = {k: "category" for k in key_columns}
+    # Inteiros lidos em 64 bits: o parser não acusa estouro em int32
+    dtypes.update({
+        c: "int64" if MEASUREMENT_DTYPES[c].startswith("int") else MEASUREMENT_DTYPES[c]
+        for c in names
+        if c in MEASUREMENT_DTYPES
+    })
+    df = pd.read_csv(
+        io.BytesIO(rows),
+        header=None,
+        names=[col for pair in zip(key_columns, names) for col in pair] + ["__trail"],
+        index_col=False,
+        dtype=dtypes,
+        na_values=["null", ""],
+        keep_default_na=False,
+        skipinitialspace=True,
+        engine="c",
+    )
+    if len(df) != rows.count(b"\n") + 1:
+        return None
+    for key_column, name in zip(key_columns, names):
+        column = df[key_column]
+        if list(column.cat.categories) != [name] or (column.cat.codes != 0).any():
+            return None
+    if df["__trail"].notna().any():
+        return None
+
+    return _apply_schema(df.drop(columns=["__trail"] + key_columns))
+
+
+def _decode_generic(content):
+    df = pd.DataFrame(json.loads(content))
+    if df.empty:
+        return df
+    return _apply_schema(df)
+
+
+def _apply_schema(df):
+    """Aplica os tipos do schema onde a conversão não perde valor."""
+    for column, dtype in MEASUREMENT_DTYPES.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        try:
+            converted = df[column].astype(dtype)
+        except (ValueError, TypeError, OverflowError):
+            continue  # null em coluna inteira ou valor fora do schema: mantém
+        if (converted == df[column]).all() or dtype.startswith("float"):
+            df[column] = converted
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def decode_measurements(content):
+    """
+    Converte o corpo (bytes) de GET /api/measurements em DataFrame com
+    colunas tipadas: id int64, date datetime64, stationId/sensorId int32 e
+    leituras float64 (conductivity nula vira NaN).
+
+    Levanta ValueError se o corpo não for JSON válido.
+    """
+    try:
+        df = _decode_columnar(content)
+    except (ValueError, TypeError, OverflowError, pd.errors.ParserError):
+        df = None
+    if df is None:
+        df = _decode_generic(content)
+    return df
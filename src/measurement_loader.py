@@ -0,0 +1,149 @@
+# src/measurement_loader.py
+"""
+Carga em lote de GET /api/measurements para períodos longos.
+
+Cada período pedido é dividido em fatias de tempo
+(MEASUREMENT_BULK_SLICE_HOURS) buscadas em paralelo no pool da API, no
+máximo MEASUREMENT_BULK_WORKERS ao mesmo tempo, com uma página de
+MEASUREMENT_BULK_PAGE_SIZE medições cada. Uma fatia que volta com a
+página cheia pode ter mais medições do que coube: é dividida ao meio e
+as metades voltam para a fila; abaixo de MIN_SLICE ela é paginada.
+
+As fatias não se sobrepõem (início incluído, fim excluído), então as
+medições das bordas não se repetem. O resultado sai em ordem
+decrescente de data, como GET /api/measurements?sort=desc.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import timedelta
+
+import pandas as pd
+
+import api
+from src.measurement_decoder import decode_measurements
+
+
+def _env_number(name, default, cast=float):
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Fatias buscadas ao mesmo tempo (o pool da API, API_MAX_WORKERS, é o teto)
+BULK_WORKERS = max(1, _env_number("MEASUREMENT_BULK_WORKERS", 4, int))
+SLICE = timedelta(hours=_env_number("MEASUREMENT_BULK_SLICE_HOURS", 24.0))
+PAGE_SIZE = _env_number("MEASUREMENT_BULK_PAGE_SIZE", 5000, int)
+# Fatia mínima: abaixo disso uma página cheia é paginada em vez de dividida
+MIN_SLICE = timedelta(minutes=1)
+
+ENDPOINT = "/api/measurements"
+API_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _slices(start, end, span):
+    """[start, end) em fatias consecutivas de até span."""
+    pieces = []
+    while start < end:
+        stop = min(start + span, end)
+        pieces.append((start, stop, 1))
+        start = stop
+    return pieces
+
+
+def _halves(piece):
+    start, end, _ = piece
+    if end - start < 2 * MIN_SLICE:
+        return None
+    middle = start + ((end - start) / 2).floor("s")
+    return [(start, middle, 1), (middle, end, 1)]
+
+
+def _fetch(token, piece, station_id, sensor_id, page_size):
+    """Uma página de uma fatia -> (medições dentro da fatia, página cheia?)."""
+    start, end, page = piece
+    params = {
+        "startDate": start.strftime(API_DATE_FORMAT),
+        "endDate": end.strftime(API_DATE_FORMAT),
+        "sort": "desc",
+        "page": page,
+        "pageSize": page_size,
+    }
+    if station_id:
+        params["stationId"] = station_id
+    if sensor_id:
+        params["sensorId"] = sensor_id
+    response, error = api.api_request_quiet("GET", ENDPOINT, token=token, params=params)
+    if response is None:
+        # Mantém o motivo (erro HTTP/conexão do backend) para o aviso da tela
+        raise api.PageFetchError(
+            f"Medições de {params['startDate']} a {params['endDate']} (página {page}) "
+            f"não puderam ser buscadas: {error or 'prazo da página esgotado'}"
+        )
+    frame = decode_measurements(response.content)
+    full = len(frame) >= page_size
+    if not frame.empty:
+        frame = frame[(frame["date"] >= start) & (frame["date"] < end)]
+    return frame, full
+
+
+def load_measurements(
+    token,
+    ranges,
+    station_id=None,
+    sensor_id=None,
+    max_workers=None,
+    slice_span=None,
+    page_size=None,
+):
+    """
+    Medições dos períodos [(início, fim)] (Timestamps UTC sem fuso, fim
+    excluído), com as colunas de decode_measurements e date decrescente.
+
+    Levanta api.PageFetchError se alguma fatia não puder ser buscada; as
+    fatias ainda pendentes são canceladas.
+    """
+    max_workers = max_workers or BULK_WORKERS
+    page_size = page_size or PAGE_SIZE
+    queue = deque(
+        piece
+        for start, end in ranges
+        for piece in _slices(start, end, slice_span or SLICE)
+    )
+    executor = api.get_executor()
+    running = {}
+    parts = []
+    try:
+        while queue or running:
+            while queue and len(running) < max_workers:
+                piece = queue.popleft()
+                future = executor.submit(
+                    api.task_context().run,
+                    _fetch, token, piece, station_id, sensor_id, page_size,
+                )
+                running[future] = piece
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                piece = running.pop(future)
+                frame, full = future.result()
+                halves = _halves(piece) if full and piece[2] == 1 else None
+                if halves:
+                    # Página cheia: a fatia tem mais medições do que coube
+                    queue.extend(halves)
+                    continue
+                parts.append((piece, frame))
+                if full:
+                    start, end, page = piece
+                    queue.append((start, end, page + 1))
+    finally:
+        for future in running:
+            future.cancel()
+
+    # Fatias disjuntas: mais recentes primeiro, páginas de cada uma em ordem
+    parts.sort(key=lambda item: (-item[0][0].value, item[0][2]))
+    frames = [frame for _, frame in parts if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
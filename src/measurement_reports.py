@@ -4,79 +4,21 @@
 import pandas as pd
 import streamlit as st
 
-from api import api_request
+from api import api_request_many
+from src.stations_repository import list_sensors, list_stations
 
 
-def listar_estacoes():
-    """GET /api/monitoring-stations
-
-    Responses: 200 (Success), 500 (Server Error)
-    Retorna lista de estações para alimentar seletor
-    """
-    token = st.session_state.get("token", None)
-    if not token:
-        st.error("Usuário não autenticado.")
-        return []
-
-    response = api_request("GET", "/api/monitoring-stations", token=token)
-
-    if not response:
-        st.error("Erro ao conectar com a API de estações.")
-        return []
-
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError:
-            st.error("Erro ao processar resposta JSON das estações.")
-            return []
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar estações.")
-        return []
-    else:
-        st.error(f"Erro inesperado ao buscar estações: {response.status_code}")
-        return []
-
-
-def listar_sensores_por_estacao(station_id):
-    """GET /api/monitoring-stations/{stationId}/sensors
+def selecionar_estacao():
+    """Componente de seleção de estação
 
-    Parâmetro: stationId (int64) no path
-    Responses: 200 (Success), 500 (Server Error)
-    Retorna lista de sensores para alimentar seletor
+    Retorna: (estacao_id, estacao_nome) ou (None, None) se nenhuma selecionada
     """
     token = st.session_state.get("token", None)
     if not token:
         st.error("Usuário não autenticado.")
-        return []
-
-    endpoint = f"/api/monitoring-stations/{station_id}/sensors"
-    response = api_request("GET", endpoint, token=token)
-
-    if not response:
-        st.error("Erro ao conectar com a API de sensores.")
-        return []
-
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError:
-            st.error("Erro ao processar resposta JSON dos sensores.")
-            return []
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar sensores.")
-        return []
-    else:
-        st.error(f"Erro inesperado ao buscar sensores: {response.status_code}")
-        return []
-
-
-def selecionar_estacao():
-    """Componente de seleção de estação
+        return None, None
 
-    Retorna: (estacao_id, estacao_nome) ou (None, None) se nenhuma selecionada
-    """
-    estacoes = listar_estacoes()
+    estacoes = list_stations(token)
     if not estacoes:
         st.warning("Nenhuma estação cadastrada.")
         return None, None
@@ -104,7 +46,7 @@ def selecionar_sensores_multiplos(estacao_id):
         st.info("Selecione uma estação primeiro para carregar os sensores.")
         return []
 
-    sensores = listar_sensores_por_estacao(estacao_id)
+    sensores = list_sensors(st.session_state.get("token"), estacao_id)
     if not sensores:
         st.warning("Nenhum sensor encontrado para esta estação.")
         return []
@@ -118,16 +60,26 @@ def selecionar_sensores_multiplos(estacao_id):
     return sensor_ids
 
 
-def post_current_average(token, filter_body):
-    endpoint = "/api/measurements/current-average"
-    resp = api_request("POST", endpoint, token=token, json=filter_body)
-    return resp
-
+def post_reports(token, filter_body):
+    """
+    Envia current-average e report em paralelo.
 
-def post_measurements_report(token, filter_body):
-    endpoint = "/api/measurements/report"
-    resp = api_request("POST", endpoint, token=token, json=filter_body)
-    return resp
+    Retorna (resp_avg, resp_report); falhas vêm como None.
+    """
+    return api_request_many([
+        {
+            "method": "POST",
+            "endpoint": "/api/measurements/current-average",
+            "token": token,
+            "json": filter_body,
+        },
+        {
+            "method": "POST",
+            "endpoint": "/api/measurements/report",
+            "token": token,
+            "json": filter_body,
+        },
+    ])
 
 
 def show():
@@ -168,8 +120,9 @@ def show():
             "period": period,
         }
 
+        resp_avg, resp_report = post_reports(token, filter_body)
+
         st.markdown("### Resultado: current-average")
-        resp_avg = post_current_average(token, filter_body)
         if resp_avg and resp_avg.status_code == 200:
             data_avg = resp_avg.json()
             if isinstance(data_avg, list):
@@ -186,7 +139,6 @@ def show():
             st.error("Falha ao obter 'current-average'.")
 
         st.markdown("### Resultado: report")
-        resp_report = post_measurements_report(token, filter_body)
         if resp_report and resp_report.status_code == 200:
             data_report = resp_report.json()
             if isinstance(data_report, list):
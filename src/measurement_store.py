@@ -0,0 +1,170 @@
+# src/measurement_store.py
+"""
+Armazenamento em disco (SQLite) dos dias de medição já assentados.
+
+Camada abaixo do measurement_cache: dias que não mudam mais sobrevivem a
+reinícios do container (cada deploy) e são lidos do disco em vez de
+baixados de novo. Só o cache em memória decide o que está assentado; aqui
+cada linha é um dia de uma estação/sensor num escopo de token.
+
+Os DataFrames são gravados como arrays NumPy (np.savez, sem pickle);
+dias com colunas object (formato fora do schema Measurement) ficam só
+em memória. O arquivo é limitado por MEASUREMENT_STORE_BYTES e os dias
+usados há mais tempo saem primeiro. Qualquer erro de disco vira
+"não encontrado": o backend continua sendo a fonte.
+
+Desativado por padrão; ligado com MEASUREMENT_STORE_PATH.
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import api
+
+STORE_PATH = os.getenv("MEASUREMENT_STORE_PATH", "")
+try:
+    STORE_BYTES = int(os.getenv("MEASUREMENT_STORE_BYTES", 512 * 1024 * 1024))
+except ValueError:
+    STORE_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    scope TEXT NOT NULL,
+    station INTEGER NOT NULL,
+    sensor INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (scope, station, sensor, day)
+)
+"""
+
+
+def _dump(frame):
+    if any(dtype == object for dtype in frame.dtypes):
+        return None
+    columns = {f"c{i}": frame[name].to_numpy() for i, name in enumerate(frame.columns)}
+    buffer = io.BytesIO()
+    np.savez(buffer, __columns__=np.array(frame.columns, dtype=str), **columns)
+    return buffer.getvalue()
+
+
+def _load(payload):
+    with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+        names = [str(name) for name in data["__columns__"]]
+        if not names:
+            return pd.DataFrame()
+        return pd.DataFrame({name: data[f"c{i}"] for i, name in enumerate(names)})
+
+
+class MeasurementStore:
+    def __init__(self, path, max_bytes=STORE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.counters = api.CacheStats()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+
+    @staticmethod
+    def _row_key(key):
+        """(escopo, estação, sensor, dia) do cache -> colunas da tabela."""
+        scope, station, sensor, day = key
+        digest = hashlib.sha256(repr(scope).encode()).hexdigest()
+        return digest, int(station or 0), int(sensor or 0), day.strftime("%Y-%m-%d")
+
+    def get(self, key):
+        row_key = self._row_key(key)
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT payload FROM segments"
+                    " WHERE scope = ? AND station = ? AND sensor = ? AND day = ?",
+                    row_key,
+                ).fetchone()
+                if row is None:
+                    self.counters.record("misses")
+                    return None
+                self.counters.record("hits")
+                self._db.execute(
+                    "UPDATE segments SET used = ?"
+                    " WHERE scope = ? AND station = ? AND sensor = ? AND day = ?",
+                    (time.time(),) + row_key,
+                )
+            return _load(row[0])
+        except (sqlite3.Error, OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, frame):
+        payload = _dump(frame)
+        if payload is None or len(payload) > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self._row_key(key) + (payload, len(payload), time.time()),
+                )
+                self._evict()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        oldest = self._db.execute("SELECT rowid, size FROM segments ORDER BY used").fetchall()
+        evicted = []
+        for rowid, size in oldest:
+            if total <= self.max_bytes:
+                break
+            evicted.append((rowid,))
+            total -= size
+        self._db.executemany("DELETE FROM segments WHERE rowid = ?", evicted)
+        self.counters.record("evictions", amount=len(evicted))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM segments")
+
+    def stats(self):
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM segments"
+            ).fetchone()
+        return {"segments": count, "bytes": size}
+
+    def cache_stats(self):
+        stats = self.counters.snapshot()
+        try:
+            current = self.stats()
+        except sqlite3.Error:
+            current = {"segments": 0, "bytes": 0}
+        stats["entries"] = current["segments"]
+        stats["bytes"] = current["bytes"]
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_default_store():
+    """Store de MEASUREMENT_STORE_PATH, ou None se desativado/inacessível."""
+    if not STORE_PATH:
+        return None
+    try:
+        return MeasurementStore(STORE_PATH)
+    except (sqlite3.Error, OSError):
+        return None
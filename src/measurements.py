@@ -4,13 +4,20 @@ Medições dos Sensores - Modernizado com UI Foundations v3
 Enhanced empty states, ComponentLibrary e design tokens aplicados.
 """
 
+import hashlib
 import io
+import tempfile
 from datetime import datetime, time
 
 import pandas as pd
 import streamlit as st
+from requests.exceptions import RequestException
 
-from api import api_request
+from api import PageFetchError, api_request, paginate, record_streamed_transfer, token_scope
+from src.measurement_cache import measurement_cache, to_utc
+from src.measurement_decoder import decode_measurements
+from src.session_frames import session_frames
+from src.stations_repository import list_sensors, list_stations
 from src.ui_components import (
     ComponentLibrary,
     LoadingStates,
@@ -18,6 +25,14 @@ from src.ui_components import (
 )
 
 
+# O pipeline guarda "Data" como datetime64 neste fuso; o texto só é
+# gerado na exibição (grid, card, Excel)
+LOCAL_TIMEZONE = "America/Sao_Paulo"
+# Mesmo formato na sintaxe do grid (moment.js) e do Excel
+GRID_DATETIME_FORMAT = "DD/MM/YYYY HH:mm:ss"
+EXCEL_DATETIME_FORMAT = "dd/mm/yyyy hh:mm:ss"
+
+
 def format_datetime(date_value, time_value):
     """Formata data e hora em ISO8601 UTC Z"""
     if date_value:
@@ -29,7 +44,13 @@ def format_datetime(date_value, time_value):
     return None
 
 
-def export_measurements_csv(token, start_date=None, end_date=None, station_id=None, sensor_id=None, sort="desc"):
+# Export CSV: recebido em blocos num arquivo temporário que fica em
+# memória até EXPORT_SPOOL_BYTES e depois passa para o disco
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+EXPORT_CHUNK_BYTES = 256 * 1024
+
+
+def export_measurements_csv(token, start_date=None, end_date=None, station_id=None, sensor_id=None, sort="desc", stream=False):
     """
     GET /api/measurements/export
     Parâmetros conforme Swagger:
@@ -39,7 +60,8 @@ def export_measurements_csv(token, start_date=None, end_date=None, station_id=No
     - sensorId (int32, opcional): ID do sensor
     - sort (string, opcional): Ordenação (default: desc)
     
-    Retorna: Conteúdo CSV para download
+    Retorna: Conteúdo CSV para download (com stream=True, a resposta com o
+    corpo ainda não lido, para spool_export)
     """
     endpoint = "/api/measurements/export"
     params = {"sort": sort}
@@ -53,10 +75,54 @@ def export_measurements_csv(token, start_date=None, end_date=None, station_id=No
     if sensor_id:
         params["sensorId"] = sensor_id
     
-    response = api_request("GET", endpoint, token=token, params=params)
+    response = api_request("GET", endpoint, token=token, params=params, stream=stream)
     return response
 
 
+def spool_export(response, progress=None, max_memory=EXPORT_SPOOL_BYTES, chunk_size=EXPORT_CHUNK_BYTES):
+    """
+    Corpo de uma resposta stream=True -> (SpooledTemporaryFile na posição 0,
+    bytes recebidos). Só um bloco por vez passa pela memória do requests;
+    o arquivo vai para o disco acima de max_memory. progress(recebidos,
+    total ou None) é chamado a cada bloco. Quem chama fecha o arquivo.
+    Os bytes da rede e os recebidos entram em api.get_transfer_stats().
+    """
+    total = None
+    if not response.headers.get("Content-Encoding"):
+        # Com compressão o Content-Length não é o tamanho recebido
+        total = int(response.headers.get("Content-Length") or 0) or None
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    received = 0
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            spool.write(chunk)
+            received += len(chunk)
+            if progress is not None:
+                progress(received, total)
+        record_streamed_transfer(response, received)
+    except BaseException:
+        spool.close()
+        raise
+    finally:
+        response.close()
+    spool.seek(0)
+    return spool, received
+
+
+def _mb(value):
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+def export_progress(placeholder):
+    """Callback de spool_export: bytes recebidos ao vivo no placeholder (st.empty)."""
+    def update(received, total):
+        if total:
+            placeholder.progress(min(received / total, 1.0), text=f"Recebidos {_mb(received)} de {_mb(total)}")
+        else:
+            placeholder.caption(f"⬇️ Recebidos {_mb(received)}")
+    return update
+
+
 def display_datetime(date_value, time_value):
     """Mostra data e hora em formato DD/MM/YYYY HH:MM:SS (ou 'Não especificado')."""
     if date_value:
@@ -85,76 +151,17 @@ def rename_columns(df):
         df.rename(columns=columns_mapping, inplace=True)
 
 
-def listar_estacoes():
-    """GET /api/monitoring-stations
-
-    Responses: 200 (Success), 500 (Server Error)
-    Retorna lista de estações para alimentar seletor
-    """
-    token = st.session_state.get("token", None)
-    if not token:
-        st.error("Usuário não autenticado.")
-        return []
-
-    response = api_request("GET", "/api/monitoring-stations", token=token)
-
-    if not response:
-        st.error("Erro ao conectar com a API de estações.")
-        return []
-
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError:
-            st.error("Erro ao processar resposta JSON das estações.")
-            return []
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar estações.")
-        return []
-    else:
-        st.error(f"Erro inesperado ao buscar estações: {response.status_code}")
-        return []
-
-
-def listar_sensores_por_estacao(station_id):
-    """GET /api/monitoring-stations/{stationId}/sensors
+def selecionar_estacao():
+    """Componente de seleção de estação usando seletor padronizado
 
-    Parâmetro: stationId (int64) no path
-    Responses: 200 (Success), 500 (Server Error)
-    Retorna lista de sensores para alimentar seletor
+    Retorna: (estacao_id, estacao_nome) ou (None, None) se nenhuma selecionada
     """
     token = st.session_state.get("token", None)
     if not token:
         st.error("Usuário não autenticado.")
-        return []
-
-    endpoint = f"/api/monitoring-stations/{station_id}/sensors"
-    response = api_request("GET", endpoint, token=token)
-
-    if not response:
-        st.error("Erro ao conectar com a API de sensores.")
-        return []
-
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError:
-            st.error("Erro ao processar resposta JSON dos sensores.")
-            return []
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar sensores.")
-        return []
-    else:
-        st.error(f"Erro inesperado ao buscar sensores: {response.status_code}")
-        return []
-
-
-def selecionar_estacao():
-    """Componente de seleção de estação usando seletor padronizado
+        return None, None
 
-    Retorna: (estacao_id, estacao_nome) ou (None, None) se nenhuma selecionada
-    """
-    estacoes = listar_estacoes()
+    estacoes = list_stations(token)
     if not estacoes:
         ComponentLibrary.alert("Nenhuma estação cadastrada.", "warning")
         return None, None
@@ -185,7 +192,7 @@ def selecionar_sensor(estacao_id):
         )
         return None
 
-    sensores = listar_sensores_por_estacao(estacao_id)
+    sensores = list_sensors(st.session_state.get("token"), estacao_id)
     if not sensores:
         ComponentLibrary.alert("Nenhum sensor encontrado para esta estação.", "warning")
         return None
@@ -202,150 +209,217 @@ def selecionar_sensor(estacao_id):
     return sensor_id
 
 
-def obter_estacoes_cadastradas():
-    """GET /api/monitoring-stations
+def measurement_params(start_date=None, end_date=None, station_id=None, sensor_id=None, sort="desc"):
+    """Filtros de GET /api/measurements (sem page/pageSize)."""
+    params = {}
 
-    Responses: 200 (Success), 500 (Server Error)
-    """
-    token = st.session_state.get("token", None)
-    if not token:
-        st.error("Usuário não autenticado.")
-        return []
+    if start_date:
+        params["startDate"] = start_date
+    if end_date:
+        params["endDate"] = end_date
+
+    # stationId como int32 conforme Swagger
+    if station_id:
+        params["stationId"] = int(station_id)
 
-    response = api_request("GET", "/api/monitoring-stations", token=token)
+    # sensorId como int32 conforme Swagger
+    if sensor_id:
+        params["sensorId"] = int(sensor_id)
 
-    if not response:
-        st.error("Erro ao conectar com a API de estações.")
-        return []
+    # sort parameter conforme Swagger
+    if sort:
+        params["sort"] = sort
+
+    return params
 
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError:
-            st.error("Erro ao processar resposta JSON das estações.")
-            return []
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar estações.")
-        return []
-    else:
-        st.error(f"Erro inesperado ao buscar estações: {response.status_code}")
-        return []
 
+# Períodos filtrados até este tamanho vêm do cache por dia (measurement_cache),
+# carregados em fatias paralelas (measurement_loader); acima disso, páginas
+# do backend sob demanda
+CACHED_RANGE_DAYS = 92
+# Primeira janela consultada no cache para montar uma página; dobra até
+# encher a página ou chegar ao início do período
+CACHED_PAGE_WINDOW = pd.Timedelta(days=1)
 
-def obter_sensores_por_estacao(station_id):
-    """GET /api/monitoring-stations/{stationId}/sensors
 
-    Parâmetro: stationId (int64) no path
-    Responses: 200 (Success), 500 (Server Error)
+def parse_measurements(response):
+    """Corpo de GET /api/measurements -> DataFrame formatado para exibição."""
+    return format_measurements(decode_measurements(response.content))
+
+
+def format_measurements(df):
     """
-    token = st.session_state.get("token", None)
-    if not token:
-        st.error("Usuário não autenticado.")
-        return []
+    DataFrame de decode_measurements -> datas datetime64 no fuso local e
+    colunas em português. As datas continuam datetime64 (ordenação,
+    filtros e exportação sobre números); o texto é gerado pelo grid
+    (datetime_column_config), só para as linhas visíveis.
+    """
+    if not df.empty and "date" in df.columns:
+        df["date"] = df["date"].dt.tz_localize("UTC").dt.tz_convert(LOCAL_TIMEZONE)
+    rename_columns(df)
+    return df
 
-    endpoint = f"/api/monitoring-stations/{station_id}/sensors"
-    response = api_request("GET", endpoint, token=token)
 
-    if not response:
-        st.error("Erro ao conectar com a API de sensores.")
-        return []
+def datetime_columns(df):
+    return [column for column in df.columns if pd.api.types.is_datetime64_any_dtype(df[column])]
 
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError:
-            st.error("Erro ao processar resposta JSON dos sensores.")
-            return []
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar sensores.")
-        return []
-    else:
-        st.error(f"Erro inesperado ao buscar sensores: {response.status_code}")
-        return []
+
+def datetime_column_config(df):
+    """column_config do st.dataframe: datas formatadas no navegador, linha a linha visível."""
+    return {
+        column: st.column_config.DatetimeColumn(format=GRID_DATETIME_FORMAT, timezone=LOCAL_TIMEZONE)
+        for column in datetime_columns(df)
+    }
 
 
-def fetch_data(
+def measurement_pages(
     start_date=None,
     end_date=None,
     station_id=None,
     sensor_id=None,
-    page=1,
     page_size=15,
     sort="desc",
+    start_page=1,
 ):
     """
-    GET /api/measurements
-
-    Parâmetros conforme Swagger:
-    - startDate (string, date-time)
-    - endDate (string, date-time)
-    - stationId (integer, int32)
-    - sensorId (integer, int32)
-    - page (integer, int32, default: 1)
-    - pageSize (integer, int32, default: 15)
-    - sort (string, default: desc)
-
-    Responses: 200 (Success), 500 (Server Error)
+    GET /api/measurements página a página via api.paginate: gera os mesmos
+    DataFrames de parse_measurements e busca a próxima página em segundo plano.
     """
-    token = st.session_state.get("token", None)
-    if not token:
-        st.error("Usuário não autenticado.")
-        return pd.DataFrame()
-
-    endpoint = "/api/measurements"
-    params = {}
+    params = measurement_params(start_date, end_date, station_id, sensor_id, sort)
+    return paginate(
+        "/api/measurements",
+        params,
+        page_size,
+        token=st.session_state.get("token", None),
+        start_page=start_page,
+        parse=parse_measurements,
+    )
 
-    # Parâmetros conforme nomes exatos do Swagger
-    if page is not None:
-        params["page"] = page
-        params["pageSize"] = page_size
 
-    if start_date:
-        params["startDate"] = start_date
-    if end_date:
-        params["endDate"] = end_date
+class CachedMeasurementPages:
+    """
+    Mesmas páginas de measurement_pages, montadas sob demanda a partir do
+    cache por dia (measurement_cache). Cada página consulta uma janela do
+    período que termina no cursor (CACHED_PAGE_WINDOW, dobrando até encher
+    a página), então a primeira aparece sem esperar o período inteiro.
+
+    A sessão guarda só o cursor: (data, id) da última medição entregue.
+    Cada janela é ordenada por (data, id) decrescentes e só entram as
+    medições estritamente depois do cursor, então um dia recente que
+    voltou do backend com empates em outra ordem (ou outra quantidade)
+    não repete nem pula medições. As medições ficam no cache do processo,
+    com o seu limite de memória. Interface do gerador de api.paginate:
+    next() e close().
+    """
 
-    # stationId como int32 conforme Swagger
-    if station_id:
-        params["stationId"] = int(station_id)
+    def __init__(self, token, start_date, end_date, station_id=None, sensor_id=None, page_size=15):
+        self.token = token
+        self.start = to_utc(start_date)
+        self.upper = to_utc(end_date)
+        self.station_id = station_id
+        self.sensor_id = sensor_id
+        self.page_size = page_size
+        # id da última medição entregue com date == upper (None: nenhuma)
+        self.last_id = None
+        self.done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.done:
+            raise StopIteration
+        window = CACHED_PAGE_WINDOW
+        try:
+            while True:
+                lower = max(self.start, self.upper - window)
+                df = measurement_cache.query(
+                    self.token,
+                    lower,
+                    self.upper,
+                    station_id=self.station_id,
+                    sensor_id=self.sensor_id,
+                ).sort_values(["date", "id"], ascending=False, kind="stable")
+                if self.last_id is not None:
+                    df = df[(df["date"] < self.upper) | (df["id"] < self.last_id)]
+                if len(df) >= self.page_size or lower <= self.start:
+                    break
+                window *= 2
+        except PageFetchError as e:
+            self.done = True
+            st.error(f"Erro ao buscar medições: {e}")
+            raise StopIteration
+
+        page = df.iloc[:self.page_size].reset_index(drop=True)
+        if len(page) < self.page_size:
+            self.done = True
+        if page.empty:
+            raise StopIteration
+        self.upper = page["date"].iloc[-1]
+        self.last_id = page["id"].iloc[-1]
+        return format_measurements(page)
+
+    def close(self):
+        self.done = True
+
+
+def next_measurement_page():
+    """Próxima página da paginação da sessão (DataFrame vazio no fim)."""
+    pages = st.session_state.get("measurement_pages")
+    if pages is None:
+        return pd.DataFrame()
+    try:
+        return next(pages, pd.DataFrame())
+    except ValueError:
+        st.error("Erro ao processar resposta JSON da API.")
+        return pd.DataFrame()
 
-    # sensorId como int32 conforme Swagger
-    if sensor_id:
-        params["sensorId"] = int(sensor_id)
 
-    # sort parameter conforme Swagger
-    if sort:
-        params["sort"] = sort
+def close_measurement_pages():
+    pages = st.session_state.get("measurement_pages")
+    if pages is not None:
+        pages.close()
+    st.session_state.measurement_pages = None
 
-    with st.spinner("Carregando dados..."):
-        response = api_request("GET", endpoint, token=token, params=params)
 
-    if not response:
-        st.error("Erro ao conectar com a API de medições.")
-        return pd.DataFrame()
+def open_measurement_pages(**filters):
+    """
+    Reinicia a paginação da sessão com os filtros e devolve a 1ª página.
+    Os filtros ficam em st.session_state.measurement_filters para refazer
+    a paginação no "Carregar Mais" (load_more).
 
-    if response.status_code == 200:
-        try:
-            data = response.json()
-            df = pd.DataFrame(data)
-            if not df.empty and "date" in df.columns:
-                df["date"] = (
-                    pd.to_datetime(df["date"])
-                    .dt.tz_localize("UTC")
-                    .dt.tz_convert("America/Sao_Paulo")
-                    .dt.strftime("%d/%m/%Y %H:%M:%S")
-                )
-            rename_columns(df)
-            return df
-        except ValueError:
-            st.error("Erro ao processar resposta JSON da API.")
-            return pd.DataFrame()
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar medições.")
-        return pd.DataFrame()
-    else:
-        st.error(f"Erro inesperado ao buscar dados: {response.status_code}")
+    Pelo cache por dia, a 1ª página sai da janela mais recente do período
+    e o resto do período é carregado em segundo plano
+    (prefetch_in_background), para as próximas páginas saírem do cache.
+    """
+    close_measurement_pages()
+    st.session_state.measurement_filters = dict(filters)
+    if not st.session_state.get("token", None):
+        st.error("Usuário não autenticado.")
         return pd.DataFrame()
+    token = st.session_state.get("token", None)
+    start_date, end_date = filters.get("start_date"), filters.get("end_date")
+    if (
+        start_date
+        and end_date
+        and to_utc(end_date) - to_utc(start_date) <= pd.Timedelta(days=CACHED_RANGE_DAYS)
+        # Sem escopo o cache não guarda nada: páginas direto do backend
+        and token_scope(token) is not None
+    ):
+        filters.pop("sort", None)
+        pages = st.session_state.measurement_pages = CachedMeasurementPages(token, **filters)
+        first = next_measurement_page()
+        if not pages.done:
+            measurement_cache.prefetch_in_background(
+                token,
+                start_date,
+                end_date,
+                station_id=filters.get("station_id"),
+                sensor_id=filters.get("sensor_id"),
+            )
+        return first
+    st.session_state.measurement_pages = measurement_pages(**filters)
+    return next_measurement_page()
 
 
 def load_more():
@@ -356,33 +430,103 @@ def load_more():
 
     Side Effects:
         - Incrementa st.session_state.page em 1
-        - Modifica st.session_state.data via pd.concat() com ignore_index=True
-        - Utiliza st.session_state.estacao_id para filtrar dados por estação
-        - Utiliza st.session_state.sensor_id para filtrar por sensor específico
+        - Acrescenta a página ao frame "data" da sessão (session_frames,
+          com limite de memória) como um bloco novo, sem copiar o que já
+          foi carregado; a tabela contígua é montada no próximo rerun
+        - Utiliza st.session_state.measurement_filters (período, estação e
+          sensor aplicados) ou, sem eles, st.session_state.estacao_id e
+          st.session_state.sensor_id
 
     Behavior:
-        - Busca dados da próxima página usando fetch_data()
-        - Concatena resultados aos dados já carregados
-        - Mantém ordem cronológica através de ignore_index=True
+        - Consome a próxima página de st.session_state.measurement_pages
+          (api.paginate), que normalmente já foi buscada em segundo plano
+        - Sem paginação na sessão, refaz a paginação do backend com os
+          mesmos filtros a partir da página atual
+        - Mantém a ordem das páginas (índice contínuo na tabela montada)
     """
     st.session_state.page += 1
-    df_new = fetch_data(
-        page=st.session_state.page,
-        station_id=st.session_state.estacao_id,
-        sensor_id=st.session_state.sensor_id,
-    )
-    st.session_state.data = pd.concat(
-        [st.session_state.data, df_new], ignore_index=True
-    )
+    if st.session_state.get("measurement_pages") is None:
+        filters = st.session_state.get("measurement_filters") or {
+            "station_id": st.session_state.estacao_id,
+            "sensor_id": st.session_state.sensor_id,
+        }
+        st.session_state.measurement_pages = measurement_pages(
+            **filters,
+            start_page=st.session_state.page,
+        )
+    session_frames.append("data", next_measurement_page())
+
+
+# Linhas convertidas para objetos Python de cada vez ao escrever o Excel
+EXCEL_BLOCK_ROWS = 10_000
+# Último workbook gerado na sessão: (chave, bytes)
+EXCEL_STATE_KEY = "excel_export"
 
 
 def export_to_excel(df, selected_columns):
+    """
+    DataFrame -> .xlsx em bytes, escrito linha a linha no modo
+    constant_memory do xlsxwriter: só a linha corrente fica na memória, o
+    resto vai para arquivos temporários. O to_excel do pandas escreve
+    coluna a coluna e perde células nesse modo, por isso a escrita direta.
+    """
+    import xlsxwriter
+
     output = io.BytesIO()
-    writer = pd.ExcelWriter(output, engine="xlsxwriter")
-    df[selected_columns].to_excel(writer, index=False, sheet_name="Amostras")
-    writer.close()
-    processed_data = output.getvalue()
-    return processed_data
+    frame = df[selected_columns]
+    # O Excel não guarda fuso: datas vão como horário local, em células de data
+    local = {
+        column: frame[column].dt.tz_localize(None)
+        for column in datetime_columns(frame)
+        if frame[column].dt.tz is not None
+    }
+    if local:
+        frame = frame.assign(**local)
+
+    workbook = xlsxwriter.Workbook(output, {
+        "constant_memory": True,
+        "default_date_format": EXCEL_DATETIME_FORMAT,
+    })
+    sheet = workbook.add_worksheet("Amostras")
+    sheet.write_row(0, 0, [str(column) for column in frame.columns], workbook.add_format({"bold": True}))
+    row = 1
+    for start in range(0, len(frame), EXCEL_BLOCK_ROWS):
+        block = frame.iloc[start:start + EXCEL_BLOCK_ROWS]
+        for values in zip(*(block[column].tolist() for column in block.columns)):
+            for col, value in enumerate(values):
+                if not pd.isna(value):
+                    sheet.write(row, col, value)
+            row += 1
+    workbook.close()
+    return output.getvalue()
+
+
+def excel_export_key(df, selected_columns):
+    """Impressão digital das colunas escolhidas e dos seus valores."""
+    digest = hashlib.sha1(
+        pd.util.hash_pandas_object(df[selected_columns], index=False).to_numpy().tobytes()
+    ).hexdigest()
+    return tuple(selected_columns), len(df), digest
+
+
+def cached_excel(df, selected_columns, build=False):
+    """
+    Workbook da sessão para estes dados e colunas. Devolve o já gerado se
+    a chave bater; senão gera com build=True ou devolve None. Guarda só o
+    último: um workbook de outros dados é descartado.
+    """
+    memo = st.session_state.get(EXCEL_STATE_KEY)
+    if memo is None and not build:
+        return None
+    key = excel_export_key(df, selected_columns)
+    if memo is not None and memo[0] == key:
+        return memo[1]
+    st.session_state.pop(EXCEL_STATE_KEY, None)
+    if not build:
+        return None
+    excel_data = export_to_excel(df, selected_columns)
+    st.session_state[EXCEL_STATE_KEY] = (key, excel_data)
+    return excel_data
 
 
 def show():
@@ -390,8 +534,6 @@ def show():
 
     if "page" not in st.session_state:
         st.session_state.page = 1
-    if "data" not in st.session_state:
-        st.session_state.data = pd.DataFrame()
     if "filtered" not in st.session_state:
         st.session_state.filtered = False
     if "estacao_id" not in st.session_state:
@@ -400,6 +542,10 @@ def show():
         st.session_state.previous_estacao_id = None
     if "sensor_id" not in st.session_state:
         st.session_state.sensor_id = None
+    if "measurement_pages" not in st.session_state:
+        st.session_state.measurement_pages = None
+    if "measurement_filters" not in st.session_state:
+        st.session_state.measurement_filters = None
 
     # Seleção de estação usando seletor padronizado
     estacao_id, estacao_nome = selecionar_estacao()
@@ -423,8 +569,10 @@ def show():
     # Resetar dados se a estação mudar
     if st.session_state.estacao_id != st.session_state.previous_estacao_id:
         st.session_state.page = 1
-        st.session_state.data = pd.DataFrame()
+        session_frames.clear("data")
         st.session_state.filtered = False
+        close_measurement_pages()
+        st.session_state.measurement_filters = None
         st.session_state.previous_estacao_id = st.session_state.estacao_id
 
     # Filtro de datas
@@ -453,13 +601,13 @@ def show():
                 end_date_str = format_datetime(end_date, end_time)
                 
                 with LoadingStates.spinner_with_cancel("Aplicando filtros..."):
-                    st.session_state.data = fetch_data(
+                    # Reset para primeira página
+                    session_frames.set("data", open_measurement_pages(
                         start_date=start_date_str,
                         end_date=end_date_str,
                         station_id=st.session_state.estacao_id,
                         sensor_id=sensor_id,
-                        page=1,  # Reset para primeira página
-                    )
+                    ))
                     
                 ComponentLibrary.alert("Filtros aplicados com sucesso!", "success")
             else:
@@ -469,17 +617,17 @@ def show():
                 )
 
     # Se o usuário não aplicou filtros e não há dados carregados ainda, carregar a primeira página
-    if st.session_state.page == 1 and st.session_state.data.empty:
+    if st.session_state.page == 1 and session_frames.get("data").empty:
         with st.spinner("Carregando medições iniciais..."):
-            df = fetch_data(
-                page=st.session_state.page,
+            df = open_measurement_pages(
                 station_id=st.session_state.estacao_id,
                 sensor_id=sensor_id,
             )
             
-        st.session_state.data = df
+        session_frames.set("data", df)
 
-    if not st.session_state.data.empty:
+    data = session_frames.get("data")
+    if not data.empty:
         # Cards informativos
         col1, col2, col3 = st.columns(3)
         
@@ -491,7 +639,7 @@ def show():
             )
         
         with col2:
-            total_measurements = len(st.session_state.data)
+            total_measurements = len(data)
             ComponentLibrary.metric_card(
                 title="Medições",
                 value=str(total_measurements),
@@ -501,11 +649,11 @@ def show():
         
         with col3:
             # Verificar se há dados recentes (menos de 24h)
-            if "Data" in st.session_state.data.columns:
-                latest_date = st.session_state.data["Data"].iloc[0] if len(st.session_state.data) > 0 else "N/A"
+            if "Data" in data.columns:
+                latest_date = data["Data"].max()
                 ComponentLibrary.metric_card(
                     title="Última Medição",
-                    value=str(latest_date)[:10] if latest_date != "N/A" else "N/A",
+                    value=latest_date.strftime("%d/%m/%Y") if pd.notna(latest_date) else "N/A",
                     description="mais recente",
                     icon="🕓"
                 )
@@ -531,10 +679,10 @@ def show():
         
         # Exibir dados
         st.markdown("### 📋 Dados das Medições")
-        st.dataframe(st.session_state.data, use_container_width=True)
+        st.dataframe(data, use_container_width=True, column_config=datetime_column_config(data))
 
         # Botão para carregar mais dados com melhor visual
-        if len(st.session_state.data) >= 15:  # Se há pelo menos uma página completa
+        if len(data) >= 15:  # Se há pelo menos uma página completa
             col1, col2, col3 = st.columns([1, 1, 1])
             with col2:  # Centralizar o botão
                 if st.button("🔄 Carregar Mais Dados", type="secondary"):
@@ -543,7 +691,7 @@ def show():
                     st.rerun()
 
         # Seção de exportação com melhor visual
-        if not st.session_state.data.empty:
+        if not data.empty:
             st.markdown("---")
             
             with st.expander("📥 Exportar Dados", expanded=False):
@@ -558,26 +706,31 @@ def show():
                     with col1:
                         selected_columns = st.multiselect(
                             "Colunas para exportação",
-                            st.session_state.data.columns.tolist(),
-                            default=st.session_state.data.columns.tolist(),
+                            data.columns.tolist(),
+                            default=data.columns.tolist(),
                             help="Escolha quais colunas incluir no arquivo Excel",
                             key="excel_columns_multiselect"
                         )
                     
                     with col2:
                         st.markdown("**Resumo da Exportação:**")
-                        st.info(f"📄 {len(st.session_state.data)} registros\n📊 {len(selected_columns) if selected_columns else 0} colunas")
+                        st.info(f"📄 {len(data)} registros\n📊 {len(selected_columns) if selected_columns else 0} colunas")
 
                     if selected_columns:
-                        excel_data = export_to_excel(st.session_state.data, selected_columns)
-                        st.download_button(
-                            label="📥 Download Excel",
-                            data=excel_data,
-                            file_name="medicoes_sensores.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            type="primary",
-                            help="Clique para baixar os dados selecionados em formato Excel"
-                        )
+                        # Gerado só a pedido e reaproveitado enquanto dados e colunas não mudarem
+                        excel_data = cached_excel(data, selected_columns)
+                        if excel_data is None and st.button("⚙️ Gerar Excel", key="build_excel"):
+                            with st.spinner("Gerando Excel..."):
+                                excel_data = cached_excel(data, selected_columns, build=True)
+                        if excel_data is not None:
+                            st.download_button(
+                                label="📥 Download Excel",
+                                data=excel_data,
+                                file_name="medicoes_sensores.xlsx",
+                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                type="primary",
+                                help="Clique para baixar os dados selecionados em formato Excel"
+                            )
                     else:
                         ComponentLibrary.alert("Selecione pelo menos uma coluna para exportar.", "warning")
                 
@@ -620,20 +773,32 @@ def show():
                                     end_date=export_params.get("endDate"),
                                     station_id=export_params.get("stationId"),
                                     sensor_id=export_params.get("sensorId"),
-                                    sort=sort_order
+                                    sort=sort_order,
+                                    stream=True
                                 )
                             
                             if response and response.status_code == 200:
-                                # CSV content - create download button
-                                st.download_button(
-                                    label="📥 Download Arquivo CSV",
-                                    data=response.content,
-                                    file_name=f"measurements_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                                    mime="text/csv",
-                                    type="secondary",
-                                    help="Arquivo CSV gerado pela API"
-                                )
-                                ComponentLibrary.alert("Export CSV gerado com sucesso!", "success")
+                                # Corpo em blocos para o arquivo temporário, com progresso
+                                status = st.empty()
+                                try:
+                                    spool, received = spool_export(response, progress=export_progress(status))
+                                except RequestException as e:
+                                    status.empty()
+                                    ComponentLibrary.alert(f"Falha ao receber o CSV: {e}", "error")
+                                else:
+                                    with spool:
+                                        # O download_button guarda o arquivo na memória do
+                                        # Streamlit: esta é a única cópia inteira
+                                        st.download_button(
+                                            label="📥 Download Arquivo CSV",
+                                            data=spool.read(),
+                                            file_name=f"measurements_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                                            mime="text/csv",
+                                            type="secondary",
+                                            help="Arquivo CSV gerado pela API"
+                                        )
+                                    status.caption(f"📄 {_mb(received)} recebidos")
+                                    ComponentLibrary.alert("Export CSV gerado com sucesso!", "success")
                             elif response and response.status_code == 500:
                                 ComponentLibrary.alert("Erro interno do servidor ao gerar CSV.", "error")
                             else:
@@ -26,6 +26,7 @@ from src.ui_components import (
     validate_id_positive,
     validate_moisture_limits,
 )
+from src.stations_repository import list_sensors, list_stations
 
 
 def get_controllers():
@@ -53,36 +54,7 @@ def fetch_equipments():
         st.error("Usuário não autenticado.")
         return pd.DataFrame()
 
-    response = api_request("GET", "/api/monitoring-stations", token=token)
-
-    if not response:
-        st.error("Erro ao conectar com a API de estações.")
-        return pd.DataFrame()
-
-    if response.status_code == 200:
-        try:
-            return pd.DataFrame(response.json())
-        except ValueError:
-            st.error("Erro ao processar resposta JSON.")
-            return pd.DataFrame()
-    elif response.status_code == 500:
-        st.error("Erro interno do servidor ao buscar estações.")
-        return pd.DataFrame()
-    else:
-        st.error(f"Erro inesperado: {response.status_code}")
-        return pd.DataFrame()
-
-
-def get_monitoring_stations(token: str):
-    """GET /api/monitoring-stations para uso em seletores."""
-    response = api_request("GET", "/api/monitoring-stations", token=token)
-    if response and response.status_code == 200:
-        try:
-            data = response.json()
-            return data if isinstance(data, list) else []
-        except ValueError:
-            return []
-    return []
+    return pd.DataFrame(list_stations(token))
 
 
 def create_monitoring_station(token: str, data: dict):
@@ -183,7 +155,7 @@ def show_create_sensor_tab():
     st.markdown("#### 🆕 Cadastrar Novo Sensor")
     
     token = st.session_state.get("token")
-    stations = get_monitoring_stations(token)
+    stations = list_stations(token)
     if not stations:
         st.warning("⚠️ Nenhuma estação cadastrada. Cadastre uma estação primeiro.")
         return
@@ -228,7 +200,7 @@ def show_create_sensor_tab():
 
             resp = create_sensor(token, station_id, sensor_data)
             if handle_api_response_v2(resp, "Sensor criado com sucesso!"):
-                invalidate_caches_after_mutation("sensors")
+                invalidate_caches_after_mutation("sensors", station=station_id)
                 st.rerun()
 
 
@@ -237,7 +209,7 @@ def show_edit_sensor_tab():
     st.markdown("#### ✏️ Editar Sensor Existente")
     
     token = st.session_state.get("token")
-    stations = get_monitoring_stations(token)
+    stations = list_stations(token)
     if not stations:
         st.warning("⚠️ Nenhuma estação cadastrada. Cadastre uma estação primeiro.")
         return
@@ -259,46 +231,42 @@ def show_edit_sensor_tab():
     station_id = station_options[station_choice]
     
     # Buscar sensores da estação selecionada
-    sensors_response = get_sensors(token, station_id)
-    if sensors_response and sensors_response.status_code == 200:
-        sensors = sensors_response.json()
-        if sensors:
-            sensor_options = {
-                f"Sensor ID: {sensor['id']}": sensor
-                for sensor in sensors
-            }
-            
-            selected_sensor_key = st.selectbox(
-                "Sensor para Editar",
-                sensor_options.keys(),
-                key="edit_sensor_selector"
+    sensors = list_sensors(token, station_id)
+    if sensors:
+        sensor_options = {
+            f"Sensor ID: {sensor['id']}": sensor
+            for sensor in sensors
+        }
+        
+        selected_sensor_key = st.selectbox(
+            "Sensor para Editar",
+            sensor_options.keys(),
+            key="edit_sensor_selector"
+        )
+        selected_sensor = sensor_options[selected_sensor_key]
+        
+        with st.form("EditarSensor"):
+            new_sensor_id = st.number_input(
+                "Novo ID do Sensor *",
+                min_value=1,
+                value=selected_sensor['id'],
+                help="Novo ID para o sensor (int32)"
             )
-            selected_sensor = sensor_options[selected_sensor_key]
             
-            with st.form("EditarSensor"):
-                new_sensor_id = st.number_input(
-                    "Novo ID do Sensor *",
-                    min_value=1,
-                    value=selected_sensor['id'],
-                    help="Novo ID para o sensor (int32)"
-                )
-                
-                submitted = st.form_submit_button("💾 Salvar Alterações")
+            submitted = st.form_submit_button("💾 Salvar Alterações")
+            
+            if submitted:
+                sensor_data = {
+                    "id": cast_to_int32(new_sensor_id),
+                    "monitoringStationId": cast_to_int64(station_id)
+                }
                 
-                if submitted:
-                    sensor_data = {
-                        "id": cast_to_int32(new_sensor_id),
-                        "monitoringStationId": cast_to_int64(station_id)
-                    }
-                    
-                    resp = update_sensor(token, station_id, selected_sensor['id'], sensor_data)
-                    if handle_api_response_v2(resp, "Sensor atualizado com sucesso!"):
-                        invalidate_caches_after_mutation("sensors")
-                        st.rerun()
-        else:
-            st.info("Esta estação não possui sensores cadastrados.")
+                resp = update_sensor(token, station_id, selected_sensor['id'], sensor_data)
+                if handle_api_response_v2(resp, "Sensor atualizado com sucesso!"):
+                    invalidate_caches_after_mutation("sensors", station=station_id)
+                    st.rerun()
     else:
-        st.error("Erro ao carregar sensores da estação.")
+        st.info("Esta estação não possui sensores cadastrados.")
 
 
 def show_delete_sensor_tab():
@@ -306,7 +274,7 @@ def show_delete_sensor_tab():
     st.markdown("#### 🗑️ Deletar Sensor")
     
     token = st.session_state.get("token")
-    stations = get_monitoring_stations(token)
+    stations = list_stations(token)
     if not stations:
         st.warning("⚠️ Nenhuma estação cadastrada. Cadastre uma estação primeiro.")
         return
@@ -326,35 +294,31 @@ def show_delete_sensor_tab():
     station_id = station_options[station_choice]
     
     # Buscar sensores da estação selecionada
-    sensors_response = get_sensors(token, station_id)
-    if sensors_response and sensors_response.status_code == 200:
-        sensors = sensors_response.json()
-        if sensors:
-            sensor_options = {
-                f"Sensor ID: {sensor['id']}": sensor
-                for sensor in sensors
-            }
-            
-            selected_sensor_key = st.selectbox(
-                "Sensor para Deletar",
-                sensor_options.keys(),
-                help="⚠️ Esta ação não pode ser desfeita",
-                key="delete_sensor_selector"
-            )
-            selected_sensor = sensor_options[selected_sensor_key]
-            
-            st.warning("⚠️ **ATENÇÃO**: Você está prestes a deletar o sensor:")
-            st.info(f"**ID:** {selected_sensor['id']}\n**Estação:** {station_choice}")
-            
-            if st.button("🗑️ Confirmar Exclusão", type="primary", key="delete_sensor_confirm"):
-                resp = delete_sensor(token, station_id, selected_sensor['id'])
-                if handle_api_response_v2(resp, "Sensor deletado com sucesso!"):
-                    invalidate_caches_after_mutation("sensors")
-                    st.rerun()
-        else:
-            st.info("Esta estação não possui sensores cadastrados.")
+    sensors = list_sensors(token, station_id)
+    if sensors:
+        sensor_options = {
+            f"Sensor ID: {sensor['id']}": sensor
+            for sensor in sensors
+        }
+        
+        selected_sensor_key = st.selectbox(
+            "Sensor para Deletar",
+            sensor_options.keys(),
+            help="⚠️ Esta ação não pode ser desfeita",
+            key="delete_sensor_selector"
+        )
+        selected_sensor = sensor_options[selected_sensor_key]
+        
+        st.warning("⚠️ **ATENÇÃO**: Você está prestes a deletar o sensor:")
+        st.info(f"**ID:** {selected_sensor['id']}\n**Estação:** {station_choice}")
+        
+        if st.button("🗑️ Confirmar Exclusão", type="primary", key="delete_sensor_confirm"):
+            resp = delete_sensor(token, station_id, selected_sensor['id'])
+            if handle_api_response_v2(resp, "Sensor deletado com sucesso!"):
+                invalidate_caches_after_mutation("sensors", station=station_id)
+                st.rerun()
     else:
-        st.error("Erro ao carregar sensores da estação.")
+        st.info("Esta estação não possui sensores cadastrados.")
 
 
 def show_list_stations_tab():
@@ -554,7 +518,7 @@ def show_edit_station_tab():
     st.markdown("### ✏️ Editar Estação de Monitoramento")
     
     token = st.session_state.get("token")
-    stations = get_monitoring_stations(token)
+    stations = list_stations(token)
     if not stations:
         st.warning("⚠️ Nenhuma estação cadastrada para editar.")
         return
@@ -660,7 +624,7 @@ def show_edit_station_tab():
             
             resp = update_monitoring_station(token, selected_station['id'], data)
             if handle_api_response_v2(resp, "Estação atualizada com sucesso!"):
-                invalidate_caches_after_mutation("stations")
+                invalidate_caches_after_mutation("stations", station=selected_station['id'])
                 st.rerun()
 
 
@@ -669,7 +633,7 @@ def show_delete_station_tab():
     st.markdown("### 🗑️ Deletar Estação de Monitoramento")
     
     token = st.session_state.get("token")
-    stations = get_monitoring_stations(token)
+    stations = list_stations(token)
     if not stations:
         st.warning("⚠️ Nenhuma estação cadastrada para deletar.")
         return
@@ -706,7 +670,9 @@ def show_delete_station_tab():
                 resp = delete_monitoring_station(token, selected_station['id'])
                 
             if handle_api_response_v2(resp, "Estação deletada com sucesso!"):
-                invalidate_caches_after_mutation("stations")
+                invalidate_caches_after_mutation(
+                    "stations", deleted=True, station=selected_station['id']
+                )
                 st.rerun()
 
 
@@ -715,7 +681,7 @@ def show_manage_sensors_tab():
     st.markdown("### 📡 Gerenciar Sensores")
     
     token = st.session_state.get("token")
-    stations = get_monitoring_stations(token)
+    stations = list_stations(token)
     if not stations:
         st.warning("⚠️ Nenhuma estação cadastrada. Cadastre uma estação primeiro.")
         return
@@ -768,7 +734,7 @@ def show_manage_sensors_tab():
 
                 resp = create_sensor(token, station_id, sensor_data)
                 if handle_api_response_v2(resp, "Sensor criado com sucesso!"):
-                    invalidate_caches_after_mutation("sensors")
+                    invalidate_caches_after_mutation("sensors", station=station_id)
                     st.rerun()
     
     with sensor_tab2:
@@ -790,46 +756,42 @@ def show_manage_sensors_tab():
         station_id = station_options[station_choice]
         
         # Buscar sensores da estação selecionada
-        sensors_response = get_sensors(token, station_id)
-        if sensors_response and sensors_response.status_code == 200:
-            sensors = sensors_response.json()
-            if sensors:
-                sensor_options = {
-                    f"Sensor ID: {sensor['id']}": sensor
-                    for sensor in sensors
-                }
-                
-                selected_sensor_key = st.selectbox(
-                    "Sensor para Editar",
-                    sensor_options.keys(),
-                    key="edit_sensor_selector"
+        sensors = list_sensors(token, station_id)
+        if sensors:
+            sensor_options = {
+                f"Sensor ID: {sensor['id']}": sensor
+                for sensor in sensors
+            }
+            
+            selected_sensor_key = st.selectbox(
+                "Sensor para Editar",
+                sensor_options.keys(),
+                key="edit_sensor_selector"
+            )
+            selected_sensor = sensor_options[selected_sensor_key]
+            
+            with st.form("EditarSensor"):
+                new_sensor_id = st.number_input(
+                    "Novo ID do Sensor *",
+                    min_value=1,
+                    value=selected_sensor['id'],
+                    help="Novo ID para o sensor (int32)"
                 )
-                selected_sensor = sensor_options[selected_sensor_key]
                 
-                with st.form("EditarSensor"):
-                    new_sensor_id = st.number_input(
-                        "Novo ID do Sensor *",
-                        min_value=1,
-                        value=selected_sensor['id'],
-                        help="Novo ID para o sensor (int32)"
-                    )
-                    
-                    submitted = st.form_submit_button("💾 Salvar Alterações")
+                submitted = st.form_submit_button("💾 Salvar Alterações")
+                
+                if submitted:
+                    sensor_data = {
+                        "id": cast_to_int32(new_sensor_id),
+                        "monitoringStationId": cast_to_int64(station_id)
+                    }
                     
-                    if submitted:
-                        sensor_data = {
-                            "id": cast_to_int32(new_sensor_id),
-                            "monitoringStationId": cast_to_int64(station_id)
-                        }
-                        
-                        resp = update_sensor(token, station_id, selected_sensor['id'], sensor_data)
-                        if handle_api_response_v2(resp, "Sensor atualizado com sucesso!"):
-                            invalidate_caches_after_mutation("sensors")
-                            st.rerun()
-            else:
-                st.info("Esta estação não possui sensores cadastrados.")
+                    resp = update_sensor(token, station_id, selected_sensor['id'], sensor_data)
+                    if handle_api_response_v2(resp, "Sensor atualizado com sucesso!"):
+                        invalidate_caches_after_mutation("sensors", station=station_id)
+                        st.rerun()
         else:
-            st.error("Erro ao carregar sensores da estação.")
+            st.info("Esta estação não possui sensores cadastrados.")
     
     with sensor_tab3:
         st.markdown("#### Deletar Sensor")
@@ -844,35 +806,31 @@ def show_manage_sensors_tab():
         station_id = station_options[station_choice]
         
         # Buscar sensores da estação selecionada
-        sensors_response = get_sensors(token, station_id)
-        if sensors_response and sensors_response.status_code == 200:
-            sensors = sensors_response.json()
-            if sensors:
-                sensor_options = {
-                    f"Sensor ID: {sensor['id']}": sensor
-                    for sensor in sensors
-                }
-                
-                selected_sensor_key = st.selectbox(
-                    "Sensor para Deletar",
-                    sensor_options.keys(),
-                    help="⚠️ Esta ação não pode ser desfeita",
-                    key="delete_sensor_selector"
-                )
-                selected_sensor = sensor_options[selected_sensor_key]
-                
-                st.warning("⚠️ **ATENÇÃO**: Você está prestes a deletar o sensor:")
-                st.info(f"**ID:** {selected_sensor['id']}\n**Estação:** {station_choice}")
-                
-                if st.button("🗑️ Confirmar Exclusão", type="primary", key="delete_sensor_confirm"):
-                    resp = delete_sensor(token, station_id, selected_sensor['id'])
-                    if handle_api_response_v2(resp, "Sensor deletado com sucesso!"):
-                        invalidate_caches_after_mutation("sensors")
-                        st.rerun()
-            else:
-                st.info("Esta estação não possui sensores cadastrados.")
+        sensors = list_sensors(token, station_id)
+        if sensors:
+            sensor_options = {
+                f"Sensor ID: {sensor['id']}": sensor
+                for sensor in sensors
+            }
+            
+            selected_sensor_key = st.selectbox(
+                "Sensor para Deletar",
+                sensor_options.keys(),
+                help="⚠️ Esta ação não pode ser desfeita",
+                key="delete_sensor_selector"
+            )
+            selected_sensor = sensor_options[selected_sensor_key]
+            
+            st.warning("⚠️ **ATENÇÃO**: Você está prestes a deletar o sensor:")
+            st.info(f"**ID:** {selected_sensor['id']}\n**Estação:** {station_choice}")
+            
+            if st.button("🗑️ Confirmar Exclusão", type="primary", key="delete_sensor_confirm"):
+                resp = delete_sensor(token, station_id, selected_sensor['id'])
+                if handle_api_response_v2(resp, "Sensor deletado com sucesso!"):
+                    invalidate_caches_after_mutation("sensors", station=station_id)
+                    st.rerun()
         else:
-            st.error("Erro ao carregar sensores da estação.")
+            st.info("Esta estação não possui sensores cadastrados.")
 
 
 def show_list_sensors_tab():
@@ -880,7 +838,7 @@ def show_list_sensors_tab():
     st.markdown("### 📋 Listar Sensores por Estação")
     
     token = st.session_state.get("token")
-    stations = get_monitoring_stations(token)
+    stations = list_stations(token)
     if not stations:
         st.warning("⚠️ Nenhuma estação cadastrada.")
         return
@@ -900,54 +858,45 @@ def show_list_sensors_tab():
     station_id = station_options[station_choice]
     
     # Buscar e exibir sensores
-    with LoadingStates.spinner_with_cancel("Carregando sensores..."):
-        sensors_response = get_sensors(token, station_id)
+    sensors = list_sensors(token, station_id)
     
-    if sensors_response and sensors_response.status_code == 200:
-        sensors = sensors_response.json()
+    if sensors:
+        st.markdown(f"#### 📡 Sensores da Estação: {station_choice}")
         
-        if sensors:
-            st.markdown(f"#### 📡 Sensores da Estação: {station_choice}")
-            
-            # Cards de métricas
-            col1, col2 = st.columns(2)
-            with col1:
-                ComponentLibrary.metric_card(
-                    title="Total de Sensores",
-                    value=str(len(sensors)),
-                    icon="📡"
-                )
-            
-            with col2:
-                ComponentLibrary.metric_card(
-                    title="Estação",
-                    value=station_choice.split(" (ID:")[0],
-                    icon="🏭"
-                )
-            
-            # Tabela de sensores
-            df_sensors = pd.DataFrame(sensors)
-            if not df_sensors.empty:
-                # Renomear colunas para português
-                column_mapping = {
-                    "id": "ID do Sensor",
-                    "monitoringStationId": "ID da Estação"
-                }
-                display_df = df_sensors.rename(columns=column_mapping)
-                st.dataframe(display_df, use_container_width=True)
-            else:
-                st.info("Nenhum sensor encontrado.")
-        else:
-            enhanced_empty_state(
-                title="Nenhum Sensor Cadastrado",
-                description="Esta estação não possui sensores cadastrados. Use a aba 'Gerenciar Sensores' para adicionar sensores.",
+        # Cards de métricas
+        col1, col2 = st.columns(2)
+        with col1:
+            ComponentLibrary.metric_card(
+                title="Total de Sensores",
+                value=str(len(sensors)),
                 icon="📡"
             )
+        
+        with col2:
+            ComponentLibrary.metric_card(
+                title="Estação",
+                value=station_choice.split(" (ID:")[0],
+                icon="🏭"
+            )
+        
+        # Tabela de sensores
+        df_sensors = pd.DataFrame(sensors)
+        if not df_sensors.empty:
+            # Renomear colunas para português
+            column_mapping = {
+                "id": "ID do Sensor",
+                "monitoringStationId": "ID da Estação"
+            }
+            display_df = df_sensors.rename(columns=column_mapping)
+            st.dataframe(display_df, use_container_width=True)
+        else:
+            st.info("Nenhum sensor encontrado.")
     else:
-        error_msg = "Erro ao carregar sensores da estação."
-        if sensors_response:
-            error_msg += f" Status: {sensors_response.status_code}"
-        ComponentLibrary.alert(error_msg, "error")
+        enhanced_empty_state(
+            title="Nenhum Sensor Cadastrado",
+            description="Esta estação não possui sensores cadastrados. Use a aba 'Gerenciar Sensores' para adicionar sensores.",
+            icon="📡"
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,312 @@
+# src/session_frames.py
+"""
+DataFrames por sessão ("Carregar Mais" de Medições e Ativações) com
+limite de memória.
+
+Cada sessão tem um SessionFrames guardado no próprio st.session_state:
+some junto com a sessão. O SessionFrameStore do processo enxerga todas
+as sessões vivas (WeakSet) e mantém dois orçamentos em bytes:
+
+- SESSION_FRAME_BYTES por sessão
+- SESSION_FRAMES_TOTAL_BYTES para o processo inteiro
+
+Cada frame é guardado em blocos (um DataFrame por página): append só
+acrescenta o bloco, em tempo proporcional à página, e a visão contígua
+é montada uma vez, no próximo get (exibição ou exportação), e reusada
+até o próximo append.
+
+Acima dos orçamentos, os frames usados há mais tempo (de qualquer sessão) vão
+para o disco (pickle num diretório temporário privado do processo) e
+voltam para a memória na próxima leitura. O frame que acabou de ser
+gravado ou lido nunca é o escolhido. Se a gravação falhar, o frame
+continua em memória; se o arquivo se perder, a leitura devolve um
+DataFrame vazio e a tela busca de novo.
+"""
+
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+import api
+
+
+def _env_bytes(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+SESSION_FRAME_BYTES = _env_bytes("SESSION_FRAME_BYTES", 64 * 1024 * 1024)
+SESSION_FRAMES_TOTAL_BYTES = _env_bytes("SESSION_FRAMES_TOTAL_BYTES", 256 * 1024 * 1024)
+SESSION_SPILL_DIR = os.getenv("SESSION_SPILL_DIR") or None
+
+# Chave do SessionFrames dentro do st.session_state
+STATE_KEY = "_session_frames"
+
+
+def _size(frame):
+    return int(frame.memory_usage(deep=True).sum()) if not frame.empty else 0
+
+
+class _Frame:
+    """
+    Blocos de um frame e a visão contígua deles. Com a visão montada,
+    chunks == [view]; chunks None = frame no disco.
+    """
+
+    __slots__ = ("chunks", "view", "size", "used", "path")
+
+    def __init__(self, frame, size, used):
+        self.chunks = [frame]
+        self.view = frame
+        self.size = size
+        self.used = used
+        self.path = None
+
+    def materialize(self):
+        if self.view is None:
+            self.view = pd.concat(self.chunks, ignore_index=True)
+            self.chunks = [self.view]
+        return self.view
+
+
+def _remove_spilled(entries):
+    for entry in list(entries.values()):
+        if entry.path:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class SessionFrames:
+    """Frames de uma sessão; criado e registrado por SessionFrameStore."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        # Arquivos em disco saem quando a sessão é coletada
+        weakref.finalize(self, _remove_spilled, self._entries)
+
+    def resident_bytes(self):
+        return sum(e.size for e in self._entries.values() if e.chunks is not None)
+
+    def spilled_bytes(self):
+        return sum(e.size for e in self._entries.values() if e.chunks is None)
+
+
+class SessionFrameStore:
+    def __init__(
+        self,
+        session_bytes=SESSION_FRAME_BYTES,
+        total_bytes=SESSION_FRAMES_TOTAL_BYTES,
+        spill_dir=SESSION_SPILL_DIR,
+    ):
+        self.session_bytes = session_bytes
+        self.total_bytes = total_bytes
+        self._spill_root = spill_dir
+        self._spill_dir = None
+        self._sessions = weakref.WeakSet()
+        self._clock = itertools.count()
+        self._lock = threading.RLock()
+        self.spills = 0
+        self.reloads = 0
+        self.counters = api.CacheStats()
+
+    def frames(self, state=None):
+        """SessionFrames da sessão (st.session_state por padrão)."""
+        state = st.session_state if state is None else state
+        session = state.get(STATE_KEY)
+        if session is None:
+            session = SessionFrames()
+            state[STATE_KEY] = session
+            with self._lock:
+                self._sessions.add(session)
+        return session
+
+    def get(self, name, state=None):
+        """
+        Frame da sessão (relido do disco se preciso), montado em um único
+        DataFrame contíguo; DataFrame vazio se não houver.
+        """
+        session = self.frames(state)
+        with self._lock:
+            entry = self._touch(session, name)
+            if entry is None:
+                return pd.DataFrame()
+            return entry.materialize()
+
+    def _touch(self, session, name):
+        """Entrada em memória (relida do disco se preciso) ou None."""
+        entry = session._entries.get(name)
+        if entry is None:
+            return None
+        entry.used = next(self._clock)
+        self.counters.record("hits" if entry.chunks is not None else "misses", name)
+        if entry.chunks is None:
+            try:
+                entry.chunks = pd.read_pickle(entry.path)
+            except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+                # Arquivo perdido: a tela recarrega do backend
+                self._discard_file(entry)
+                del session._entries[name]
+                return None
+            self._discard_file(entry)
+            entry.view = entry.chunks[0] if len(entry.chunks) == 1 else None
+            self.reloads += 1
+            self._enforce(session, entry)
+        return entry
+
+    def set(self, name, frame, state=None):
+        session = self.frames(state)
+        size = _size(frame)
+        with self._lock:
+            old = session._entries.pop(name, None)
+            if old is not None:
+                self._discard_file(old)
+            entry = _Frame(frame, size, next(self._clock))
+            session._entries[name] = entry
+            self._enforce(session, entry)
+        return frame
+
+    def append(self, name, frame, state=None):
+        """
+        Acrescenta frame (uma página) ao já guardado em name como um novo
+        bloco, sem copiar o que já estava carregado.
+        """
+        session = self.frames(state)
+        size = _size(frame)
+        with self._lock:
+            entry = self._touch(session, name)
+            if entry is None:
+                self.set(name, frame, state)
+                return
+            if frame.empty:
+                return
+            if entry.view is not None and entry.view.empty:
+                entry.chunks = []
+            entry.chunks.append(frame)
+            entry.view = None
+            entry.size += size
+            self._enforce(session, entry)
+
+    def clear(self, name, state=None):
+        self.set(name, pd.DataFrame(), state)
+
+    # -- orçamentos --------------------------------------------------------
+
+    def _resident(self, sessions=None):
+        """(nome, entrada) dos frames em memória das sessões (todas por padrão)."""
+        for session in list(self._sessions if sessions is None else sessions):
+            for name, entry in session._entries.items():
+                if entry.chunks is not None:
+                    yield name, entry
+
+    def _enforce(self, session, keep):
+        while session.resident_bytes() > self.session_bytes:
+            if not self._spill_coldest(list(self._resident([session])), keep):
+                break
+        while self.resident_bytes() > self.total_bytes:
+            if not self._spill_coldest(list(self._resident()), keep):
+                break
+
+    def _spill_coldest(self, candidates, keep):
+        candidates = [
+            (entry.used, name, entry)
+            for name, entry in candidates
+            if entry is not keep and entry.size > 0
+        ]
+        for _, name, entry in sorted(candidates, key=lambda item: item[0]):
+            if self._spill(entry):
+                self.counters.record("evictions", name)
+                return True
+        return False
+
+    def _spill(self, entry):
+        try:
+            path = os.path.join(self._ensure_spill_dir(), f"{uuid.uuid4().hex}.pkl")
+            pd.to_pickle(entry.chunks, path)
+        except OSError:
+            return False
+        entry.path = path
+        entry.chunks = None
+        entry.view = None
+        self.spills += 1
+        return True
+
+    def _ensure_spill_dir(self):
+        if self._spill_dir is None:
+            if self._spill_root:
+                os.makedirs(self._spill_root, exist_ok=True)
+            # mkdtemp cria com permissão 0700: só este processo lê os pickles
+            self._spill_dir = tempfile.mkdtemp(prefix="session-frames-", dir=self._spill_root)
+            weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+        return self._spill_dir
+
+    @staticmethod
+    def _discard_file(entry):
+        if entry.path:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+            entry.path = None
+
+    # -- medidor ------------------------------------------------------------
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(entry.size for _, entry in self._resident())
+
+    def cache_stats(self):
+        with self._lock:
+            sizes = [(name, entry.size) for name, entry in self._resident()]
+        return self.counters.snapshot(sizes)
+
+    def stats(self, state=None):
+        session = self.frames(state)
+        with self._lock:
+            sessions = list(self._sessions)
+            return {
+                "session_bytes": session.resident_bytes(),
+                "session_spilled_bytes": session.spilled_bytes(),
+                "total_bytes": sum(s.resident_bytes() for s in sessions),
+                "spilled_bytes": sum(s.spilled_bytes() for s in sessions),
+                "sessions": len(sessions),
+                "spills": self.spills,
+                "reloads": self.reloads,
+            }
+
+
+session_frames = SessionFrameStore()
+api.register_cache("Tabelas por sessão (Carregar Mais)", session_frames)
+
+
+def _mb(value):
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+def show_memory_meter():
+    """Medidor no sidebar: memória desta sessão e do processo."""
+    stats = session_frames.stats()
+    session_share = min(stats["session_bytes"] / session_frames.session_bytes, 1.0)
+    total_share = min(stats["total_bytes"] / session_frames.total_bytes, 1.0)
+    st.progress(
+        session_share,
+        text=f"Dados desta sessão: {_mb(stats['session_bytes'])} de {_mb(session_frames.session_bytes)}",
+    )
+    st.progress(
+        total_share,
+        text=f"Todas as sessões ({stats['sessions']}): {_mb(stats['total_bytes'])} de {_mb(session_frames.total_bytes)}",
+    )
+    if stats["spilled_bytes"]:
+        st.caption(f"💾 {_mb(stats['spilled_bytes'])} em disco (dados menos usados)")
@@ -0,0 +1,113 @@
+# src/stations_repository.py
+"""
+Repositório único de estações de monitoramento e sensores.
+
+Todas as telas (Dashboard, Medições, Relatórios, Cadastro e seletores)
+leem estações e sensores daqui. As listas ficam no reference_cache com
+as tags "stations" e "sensors:station=N", as mesmas da pré-carga após o
+login e das invalidações após create/update/delete. Assim, um rerun busca
+cada lista no máximo uma vez e sessões do mesmo escopo reaproveitam.
+
+Acesso indexado, montado uma vez por lista guardada:
+- get_station(token, station_id)
+- stations_by_controller(token, controller_id)
+- list_sensors(token, station_id) / list_sensor_ids(...)
+
+As listas e dicionários devolvidos são compartilhados: somente leitura.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+from api import api_request
+from src.ui_components import cache_tag, cast_to_int64, reference_cache
+
+STATIONS_ENDPOINT = "/api/monitoring-stations"
+
+# Índices guardados (um por lista de estações em cache)
+INDEX_MAX_ENTRIES = 32
+
+
+def _get_list(token: str, endpoint: str) -> List[Dict[str, Any]]:
+    """GET de uma lista; [] em falha (api_request já exibiu o erro)."""
+    response = api_request("GET", endpoint, token=token)
+    if response and response.status_code == 200:
+        try:
+            data = response.json()
+        except ValueError:
+            return []
+        return data if isinstance(data, list) else []
+    return []
+
+
+def sensors_endpoint(station_id: int) -> str:
+    return f"{STATIONS_ENDPOINT}/{cast_to_int64(station_id)}/sensors"
+
+
+def list_stations(token: str, refresh: bool = False) -> List[Dict[str, Any]]:
+    """GET /api/monitoring-stations (cacheado por escopo do token)."""
+    return reference_cache.get(
+        token,
+        cache_tag("stations"),
+        lambda t: _get_list(t, STATIONS_ENDPOINT),
+        spinner="Carregando estações...",
+        refresh=refresh,
+    )
+
+
+def list_sensors(token: str, station_id: int, refresh: bool = False) -> List[Dict[str, Any]]:
+    """GET /api/monitoring-stations/{stationId}/sensors (cacheado por escopo)."""
+    return reference_cache.get(
+        token,
+        cache_tag("sensors", station=station_id),
+        lambda t: _get_list(t, sensors_endpoint(station_id)),
+        spinner="Carregando sensores...",
+        refresh=refresh,
+    )
+
+
+def list_sensor_ids(token: str, station_id: int) -> List[int]:
+    return [sensor["id"] for sensor in list_sensors(token, station_id) if "id" in sensor]
+
+
+class StationIndex:
+    """Estações por id e por controlador (controllerId)."""
+
+    def __init__(self, stations: List[Dict[str, Any]]):
+        self.by_id = {}
+        self.by_controller = {}
+        for station in stations:
+            if station.get("id") is None:
+                continue
+            self.by_id[cast_to_int64(station["id"])] = station
+            controller_id = station.get("controllerId")
+            if controller_id is not None:
+                self.by_controller.setdefault(cast_to_int64(controller_id), []).append(station)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def station_index(token: str) -> StationIndex:
+    """Índice da lista em cache; refeito só quando a lista muda."""
+    stations = list_stations(token)
+    with _indexes_lock:
+        entry = _indexes.get(id(stations))
+        # A lista fica guardada junto: o id não é reaproveitado enquanto vale
+        if entry is not None and entry[0] is stations:
+            return entry[1]
+    index = StationIndex(stations)
+    with _indexes_lock:
+        if len(_indexes) >= INDEX_MAX_ENTRIES:
+            _indexes.clear()
+        _indexes[id(stations)] = (stations, index)
+    return index
+
+
+def get_station(token: str, station_id: int) -> Optional[Dict[str, Any]]:
+    return station_index(token).by_id.get(cast_to_int64(station_id))
+
+
+def stations_by_controller(token: str, controller_id: int) -> List[Dict[str, Any]]:
+    return station_index(token).by_controller.get(cast_to_int64(controller_id), [])
@@ -15,7 +15,9 @@ from src.ui_components import (
     LoadingStates,
     enhanced_empty_state,
     format_datetime_for_api,
+    get_current_tariff_cached,
     handle_api_response_v2,
+    invalidate_caches_after_mutation,
     monetary_input,
     percentage_input
 )
@@ -181,7 +183,7 @@ def show_current_tariff(token):
     st.markdown("### 🏷️ Tarifa Vigente")
 
     with LoadingStates.spinner_with_cancel("Carregando tarifa atual..."):
-        current_data = get_current_tariff(token)
+        current_data = get_current_tariff_cached(token)
 
     if current_data and "id" in current_data:
         # Cards de métricas com ComponentLibrary
@@ -345,7 +347,7 @@ def show_create_tariff(token):
 
             resp = create_tariff(token, data)
             if handle_api_response_v2(resp, "Tarifa criada com sucesso!"):
-                st.rerun()
+                invalidate_caches_after_mutation("tariffs")
 
 
 def show_edit_tariff(token):
@@ -472,7 +474,7 @@ def show_edit_tariff(token):
 
             resp = update_tariff(token, selected_id, data_edit)
             if handle_api_response_v2(resp, "Tarifa atualizada com sucesso!"):
-                st.rerun()
+                invalidate_caches_after_mutation("tariffs")
 
 
 def show_delete_tariff(token):
@@ -512,7 +514,7 @@ def show_delete_tariff(token):
                 resp = delete_tariff(token, selected_id)
                 
             if handle_api_response_v2(resp, "Tarifa excluída com sucesso!"):
-                st.rerun()
+                invalidate_caches_after_mutation("tariffs")
 
 
 def simulate_future_costs(tariffs, projected_consumption_diurno, projected_consumption_noturno):
@@ -617,7 +619,7 @@ def show_simulation(token):
 
         if submitted:
             with LoadingStates.spinner_with_cancel("Calculando simulação..."):
-                tariffs = get_current_tariff(token)
+                tariffs = get_current_tariff_cached(token)
 
             if tariffs and "daytimeTariff" in tariffs:
                 simulate_future_costs(
@@ -5,14 +5,18 @@ Sistema completo de componentes padronizados com Design Tokens,
 FormBuilder, ComponentLibrary e estados avançados de UI/UX.
 """
 
+import contextvars
+import json
 import re
-import time as time_module
-from contextlib import contextmanager
+import threading
+from contextlib import contextmanager, nullcontext
 from datetime import date, datetime, time, timedelta
+from time import monotonic
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import streamlit as st
 
+from api import CacheStats, register_cache
 from src.design_tokens import DesignTokens, get_color, get_spacing, get_shadow, generate_button_styles
 
 
@@ -43,13 +47,13 @@ def controller_selector(
     # Import here to avoid circular dependency
     from src.controllers import get_controllers
 
-    @st.cache_data(ttl=120)  # 2 minutos
-    def get_controllers_cached(token):
-        return get_controllers(token)
-
-    controllers = get_controllers_cached(token)
+    controllers = reference_cache.get(token, cache_tag("controllers"), get_controllers)
     if not controllers:
         st.warning("Nenhum controlador cadastrado.")
+        _reload_button(
+            f"controller_reload_{context}_{hash(label)}",
+            lambda: reference_cache.get(token, cache_tag("controllers"), get_controllers, refresh=True),
+        )
         return None, None
 
     options = {}
@@ -225,43 +229,304 @@ def show_error_state(message="Erro ao conectar com a API."):
     st.error(f"⚠️ {message}")
 
 
+def show_degraded_state(deadline):
+    """Aviso de dados não carregados dentro do prazo da página (api.page_deadline)."""
+    if deadline is None or not deadline.degraded:
+        return
+    st.info(
+        "⏱️ Alguns dados não foram carregados a tempo e podem estar "
+        "incompletos ou desatualizados: " + ", ".join(deadline.degraded)
+    )
+
+
 # =============================================================================
 # SISTEMA DE CACHE COM INVALIDAÇÃO
 # =============================================================================
 
 
+# Validade das listas de referência (estações, sensores, controladores,
+# válvulas). Longa porque as mutations do app invalidam por tag; o TTL só
+# cobre alterações feitas fora deste processo.
+REFERENCE_CACHE_TTL = 30 * 60  # 30 minutos
+# Listas vazias (sem cadastro ou busca que falhou) valem bem menos: o
+# seletor não volta ao backend a cada rerun, mas logo tenta de novo
+REFERENCE_CACHE_NEGATIVE_TTL = 60
+
+
+def cache_tag(entity_type: str, **ids) -> str:
+    """Tag de uma lista cacheada: cache_tag("sensors", station=7) -> "sensors:station=7"."""
+    if not ids:
+        return entity_type
+    return entity_type + ":" + ",".join(
+        f"{name}={cast_to_int64(value)}" for name, value in sorted(ids.items())
+    )
+
+
+class ReferenceCache:
+    """
+    Cache de dados de referência compartilhado por todas as sessões do
+    processo. A chave é o escopo do token (api.token_scope: backend +
+    tenant/perfil), não o token: novo login, refresh de token ou outro
+    operador com o mesmo perfil reaproveitam a mesma cópia. O token da
+    sessão continua sendo usado para autorizar as buscas ao backend.
+
+    Cada entrada tem a própria tag (ex.: "sensors:station=7") e a família
+    ("sensors"); invalidate() remove por tag em todos os escopos. Resultados
+    vazios ficam só negative_ttl segundos.
+
+    As listas devolvidas são compartilhadas entre sessões: somente leitura.
+    """
+
+    def __init__(self, ttl=REFERENCE_CACHE_TTL, negative_ttl=REFERENCE_CACHE_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.counters = CacheStats()
+
+    def get(self, token, tag, loader, spinner=None, refresh=False):
+        """
+        Devolve a entrada (escopo do token, tag) ou chama loader(token).
+        Token sem escopo conhecido (ainda não aceito pelo backend, expirado)
+        sempre busca com o próprio token. refresh=True ignora a entrada e o
+        cache negativo do cliente HTTP (api.bypass_cache) e a substitui.
+        """
+        from api import bypass_cache, token_scope
+
+        scope = token_scope(token)
+        if scope is not None and not refresh:
+            with self._lock:
+                entry = self._entries.get((scope, tag))
+            if entry is not None and entry[0] > monotonic():
+                self.counters.record("hits", _family(tag))
+                return entry[1]
+
+        self.counters.record("misses", _family(tag))
+        with bypass_cache() if refresh else nullcontext():
+            if spinner:
+                with st.spinner(spinner):
+                    value = loader(token)
+            else:
+                value = loader(token)
+
+        self.put(token, tag, value)
+        return value
+
+    def put(self, token, tag, value):
+        """
+        Guarda value para o escopo do token (ex.: pré-carga após o login).
+        Sem escopo conhecido ou sem valor (None: a busca não aconteceu),
+        nada é guardado; vazio ([] ou {}) vale negative_ttl.
+        """
+        from api import token_scope
+
+        # A busca pode ter acabado de validar o token junto ao backend
+        scope = token_scope(token)
+        if scope is not None and value is not None:
+            now = monotonic()
+            ttl = self.ttl if value else self.negative_ttl
+            with self._lock:
+                for stale in [k for k, (exp, _) in self._entries.items() if exp <= now]:
+                    del self._entries[stale]
+                    self.counters.record("evictions", _family(stale[1]))
+                if ttl > 0:
+                    self._entries[(scope, tag)] = (now + ttl, value)
+                else:
+                    self._entries.pop((scope, tag), None)
+
+    def invalidate(self, tag: str) -> int:
+        """
+        Remove as entradas com a tag exata ou da família: "sensors" remove
+        todas as listas de sensores, "sensors:station=7" só a da estação 7.
+        Retorna quantas entradas saíram.
+        """
+        with self._lock:
+            evicted = [
+                key
+                for key in self._entries
+                if key[1] == tag or key[1].startswith(tag + ":")
+            ]
+            for key in evicted:
+                del self._entries[key]
+                self.counters.record("evictions", _family(key[1]))
+        return len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def cache_stats(self):
+        with self._lock:
+            sizes = [(_family(tag), _approx_bytes(value)) for (_, tag), (_, value) in self._entries.items()]
+        return self.counters.snapshot(sizes)
+
+
+def _family(tag):
+    """"sensors:station=7" -> "sensors" (detalhamento das estatísticas)."""
+    return tag.split(":", 1)[0]
+
+
+def _approx_bytes(value):
+    """Tamanho aproximado de um valor JSON guardado (o corpo que o gerou)."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+reference_cache = ReferenceCache()
+register_cache("Listas de referência (seletores)", reference_cache)
+
+
+# Snapshots do Dashboard (/api/home, /api/health): até SNAPSHOT_MAX_AGE o
+# guardado é exibido na hora; passado SNAPSHOT_FRESH_FOR, cada leitura
+# dispara uma atualização em segundo plano para o próximo rerun.
+SNAPSHOT_FRESH_FOR = 15  # segundos
+SNAPSHOT_MAX_AGE = 5 * 60  # 5 minutos
+
+
+class SnapshotCache:
+    """
+    Stale-while-revalidate de leituras pequenas e frequentes, por escopo
+    do token (como o ReferenceCache). Só bloqueia quem não tem snapshot
+    utilizável; os demais recebem o guardado e uma única atualização por
+    (escopo, nome) roda no pool de api.get_executor().
+
+    Os loaders de refresh() rodam fora da thread do script: não podem
+    chamar st.* e devolvem None em caso de falha (o snapshot é mantido).
+    """
+
+    def __init__(self, fresh_for=SNAPSHOT_FRESH_FOR, max_age=SNAPSHOT_MAX_AGE):
+        self.fresh_for = fresh_for
+        self.max_age = max_age
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.counters = CacheStats()
+
+    def _key(self, token, name):
+        from api import token_scope
+
+        scope = token_scope(token)
+        return None if scope is None else (scope, name)
+
+    def get(self, token, name):
+        """(valor, idade em s) se houver snapshot com menos de max_age, senão None."""
+        key = self._key(token, name)
+        if key is None:
+            self.counters.record("misses", name)
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        age = None if entry is None else monotonic() - entry[0]
+        if age is None or age > self.max_age:
+            self.counters.record("misses", name)
+            return None
+        self.counters.record("stale" if self.is_stale(age) else "hits", name)
+        return entry[1], age
+
+    def put(self, token, name, value):
+        key = self._key(token, name)
+        if key is None or value is None:
+            return
+        with self._lock:
+            self._entries[key] = (monotonic(), value)
+
+    def age(self, token, name):
+        key = self._key(token, name)
+        with self._lock:
+            entry = None if key is None else self._entries.get(key)
+        if entry is None:
+            return None
+        age = monotonic() - entry[0]
+        return None if age > self.max_age else age
+
+    def is_stale(self, age):
+        return age >= self.fresh_for
+
+    def refresh(self, token, name, loader):
+        """Agenda loader(token) em segundo plano, no máximo um por (escopo, nome)."""
+        from api import get_executor
+
+        key = self._key(token, name)
+        if key is None:
+            return
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.put(token, name, loader(token))
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        try:
+            # Contexto vazio: sem o prazo da página que disparou
+            get_executor().submit(contextvars.Context().run, run)
+        except RuntimeError:  # pool encerrado
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def cache_stats(self):
+        with self._lock:
+            sizes = [(name, _approx_bytes(value)) for (_, name), (_, value) in self._entries.items()]
+        return self.counters.snapshot(sizes)
+
+
+snapshot_cache = SnapshotCache()
+register_cache("Snapshots do Dashboard (/api/home, /api/health)", snapshot_cache)
+
+
+def format_age(seconds: float) -> str:
+    """Idade de um snapshot para exibição: "agora", "há 12 s", "há 3 min"."""
+    if seconds < 1:
+        return "agora"
+    if seconds < 60:
+        return f"há {int(seconds)} s"
+    return f"há {int(seconds // 60)} min"
+
+
 class CacheManager:
-    """Gerencia cache com TTL e invalidação automática após mutations."""
-
-    def __init__(self):
-        self._cache_keys = {
-            "controllers": "cache_controllers",
-            "stations": "cache_stations",
-            "sensors": "cache_sensors",
-            "valves": "cache_valves",
-            "tariffs": "cache_tariffs",
-        }
+    """Invalida por tag as listas do reference_cache após mutations."""
 
-    def invalidate_cache(self, entity_type: str):
-        """Invalida cache de uma entidade específica."""
-        if entity_type in self._cache_keys:
-            cache_key = self._cache_keys[entity_type]
-            if hasattr(st, "cache_data"):
-                # Clear specific cache for entity
-                st.session_state[f"{cache_key}_invalidated"] = (
-                    datetime.now().timestamp()
-                )
+    # Listas filhas: o id do pai entra na tag (sensores por estação, ...)
+    PARENTS = {"sensors": "station", "valves": "controller"}
+    # Listas que ficam órfãs quando o pai é excluído
+    DEPENDENCIES = {"stations": ["sensors"], "controllers": ["valves"]}
 
-    def invalidate_dependent_caches(self, parent_entity: str):
-        """Invalida caches dependentes (ex: ao alterar estação, invalidar sensores)."""
-        dependencies = {"stations": ["sensors"], "controllers": ["valves"]}
+    def __init__(self, cache: ReferenceCache):
+        self._cache = cache
 
-        if parent_entity in dependencies:
-            for dep in dependencies[parent_entity]:
-                self.invalidate_cache(dep)
+    def invalidate_cache(self, entity_type: str, **ids) -> int:
+        """
+        Invalida a lista afetada: ("sensors", station=7) remove só
+        "sensors:station=7"; sem o id do pai, remove a família inteira.
+        """
+        parent = self.PARENTS.get(entity_type)
+        if parent in ids:
+            return self._cache.invalidate(cache_tag(entity_type, **{parent: ids[parent]}))
+        return self._cache.invalidate(entity_type)
+
+    def invalidate_dependent_caches(self, parent_entity: str, **ids) -> int:
+        """Invalida caches dependentes (ex: ao excluir a estação 7, os sensores dela)."""
+        return sum(
+            self.invalidate_cache(dep, **ids)
+            for dep in self.DEPENDENCIES.get(parent_entity, [])
+        )
 
 
-cache_manager = CacheManager()
+cache_manager = CacheManager(reference_cache)
 
 
 # =============================================================================
@@ -318,28 +583,14 @@ def handle_api_response_v2(
         500: "Erro interno do servidor. Tente novamente em alguns minutos.",
     }
 
-    # Tratamento especial para 429 com Retry-After
+    # 429 que sobrou após as novas tentativas do cliente (api.py): apenas
+    # informa o tempo pedido pelo servidor, sem bloquear o script
     if response.status_code == 429:
         retry_after = response.headers.get("Retry-After")
-        if retry_after:
-            try:
-                wait_seconds = int(retry_after)
-                st.warning(
-                    f"⏱️ Limite de requisições atingido. Aguarde {wait_seconds} segundos."
-                )
-
-                # Adicionar countdown visual
-                if "retry_countdown" not in st.session_state:
-                    st.session_state.retry_countdown = wait_seconds
-
-                progress_bar = st.progress(0)
-                for i in range(wait_seconds):
-                    progress_bar.progress((i + 1) / wait_seconds)
-                    time_module.sleep(1)
-                progress_bar.empty()
-
-            except (ValueError, TypeError):
-                st.error(status_messages[429])
+        if retry_after and retry_after.strip().isdigit():
+            st.warning(
+                f"⏱️ Limite de requisições atingido. Tente novamente em {int(retry_after)} segundos."
+            )
         else:
             st.error(status_messages[429])
         return False
@@ -480,36 +731,56 @@ def temperature_input(
 # =============================================================================
 
 
-@st.cache_data(ttl=120, show_spinner="Carregando estações...")
-def get_monitoring_stations_cached(token: str) -> List[Dict[str, Any]]:
-    """Cache para estações de monitoramento."""
-    from src.monitoring_stations import get_monitoring_stations
-
-    return get_monitoring_stations(token)
-
-
-@st.cache_data(ttl=120, show_spinner="Carregando sensores...")
-def get_sensors_cached(token: str, station_id: int) -> List[Dict[str, Any]]:
-    """Cache para sensores de uma estação específica."""
+def _fetch_list(token: str, endpoint: str) -> List[Dict[str, Any]]:
     from api import api_request
 
-    endpoint = f"/api/monitoring-stations/{station_id}/sensors"
     response = api_request("GET", endpoint, token=token)
     if response and response.status_code == 200:
         return response.json() if isinstance(response.json(), list) else []
     return []
 
 
-@st.cache_data(ttl=120, show_spinner="Carregando válvulas...")
-def get_valves_cached(token: str, controller_id: int) -> List[Dict[str, Any]]:
-    """Cache para válvulas de um controlador específico."""
-    from api import api_request
+def get_monitoring_stations_cached(token: str, refresh: bool = False) -> List[Dict[str, Any]]:
+    """Cache para estações de monitoramento (src/stations_repository.py)."""
+    from src.stations_repository import list_stations
+
+    return list_stations(token, refresh=refresh)
+
+
+def get_sensors_cached(token: str, station_id: int, refresh: bool = False) -> List[Dict[str, Any]]:
+    """Cache para sensores de uma estação específica (src/stations_repository.py)."""
+    from src.stations_repository import list_sensors
 
+    return list_sensors(token, station_id, refresh=refresh)
+
+
+def get_current_tariff_cached(token: str, refresh: bool = False) -> Dict[str, Any]:
+    """Cache para a tarifa vigente (compartilhado por escopo)."""
+    from src.tariff_schedules import get_current_tariff
+
+    return reference_cache.get(token, cache_tag("tariffs"), get_current_tariff, refresh=refresh)
+
+
+def get_valves_cached(token: str, controller_id: int, refresh: bool = False) -> List[Dict[str, Any]]:
+    """Cache para válvulas de um controlador específico (compartilhado por escopo)."""
     endpoint = f"/api/controllers/{controller_id}/valves"
-    response = api_request("GET", endpoint, token=token)
-    if response and response.status_code == 200:
-        return response.json() if isinstance(response.json(), list) else []
-    return []
+    return reference_cache.get(
+        token,
+        cache_tag("valves", controller=controller_id),
+        lambda t: _fetch_list(t, endpoint),
+        spinner="Carregando válvulas...",
+        refresh=refresh,
+    )
+
+
+def _reload_button(key: str, reload) -> None:
+    """
+    "Recarregar" sob um seletor vazio: a lista vazia fica guardada por
+    REFERENCE_CACHE_NEGATIVE_TTL; o botão busca de novo na hora.
+    """
+    if st.button("🔄 Recarregar", key=key):
+        reload()
+        st.rerun()
 
 
 def station_selector(
@@ -522,6 +793,10 @@ def station_selector(
     stations = get_monitoring_stations_cached(token)
     if not stations:
         st.warning("Nenhuma estação de monitoramento cadastrada.")
+        _reload_button(
+            f"station_reload_{hash(label)}",
+            lambda: get_monitoring_stations_cached(token, refresh=True),
+        )
         return None, None
 
     options = {}
@@ -559,6 +834,10 @@ def sensor_selector(
     sensors = get_sensors_cached(token, cast_to_int64(station_id))
     if not sensors:
         st.warning(f"Nenhum sensor cadastrado para a estação ID {station_id}.")
+        _reload_button(
+            f"sensor_reload_{station_id}_{hash(label)}",
+            lambda: get_sensors_cached(token, cast_to_int64(station_id), refresh=True),
+        )
         return None, None
 
     options = {}
@@ -597,6 +876,10 @@ def valve_selector(
     valves = get_valves_cached(token, cast_to_int64(controller_id))
     if not valves:
         st.warning(f"Nenhuma válvula cadastrada para o controlador ID {controller_id}.")
+        _reload_button(
+            f"valve_reload_{controller_id}_{context}_{hash(label)}",
+            lambda: get_valves_cached(token, cast_to_int64(controller_id), refresh=True),
+        )
         return None, None
 
     options = {}
@@ -754,10 +1037,18 @@ def secure_password_input(
 # =============================================================================
 
 
-def invalidate_caches_after_mutation(entity_type: str):
-    """Invalida caches relevantes após create/update/delete."""
-    cache_manager.invalidate_cache(entity_type)
-    cache_manager.invalidate_dependent_caches(entity_type)
+def invalidate_caches_after_mutation(entity_type: str, deleted: bool = False, **ids):
+    """
+    Invalida caches relevantes após create/update/delete.
+
+    ids identifica o pai ou a própria entidade, ex.:
+        invalidate_caches_after_mutation("sensors", station=7)
+        invalidate_caches_after_mutation("stations", deleted=True, station=7)
+    Com deleted=True as listas filhas do registro excluído também saem.
+    """
+    cache_manager.invalidate_cache(entity_type, **ids)
+    if deleted:
+        cache_manager.invalidate_dependent_caches(entity_type, **ids)
 
     # Force rerun para refletir mudanças
     st.rerun()
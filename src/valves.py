@@ -180,7 +180,7 @@ def show_create_valve(token):
 
             resp = create_valve(token, controller_id_cast, valve_id_cast, flow_rate)
             if handle_api_response_v2(resp, "Válvula criada com sucesso!"):
-                invalidate_caches_after_mutation("valves")
+                invalidate_caches_after_mutation("valves", controller=controller_id_cast)
                 st.rerun()
 
 
@@ -249,7 +249,7 @@ def show_edit_valve(token):
 
             resp = update_valve(token, controller_id_cast, valve_id_cast, new_flow)
             if handle_api_response_v2(resp, "Válvula atualizada com sucesso!"):
-                invalidate_caches_after_mutation("valves")
+                invalidate_caches_after_mutation("valves", controller=controller_id_cast)
                 st.rerun()
 
 
@@ -289,7 +289,7 @@ def show_delete_valve(token):
         if st.button("🗑️ Confirmar Exclusão", type="primary"):
             resp = delete_valve(token, controller_id, valve_id)
             if handle_api_response_v2(resp, "Válvula excluída com sucesso!"):
-                invalidate_caches_after_mutation("valves")
+                invalidate_caches_after_mutation("valves", controller=controller_id)
                 st.rerun()
 
 
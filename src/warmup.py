@@ -0,0 +1,102 @@
+# src/warmup.py
+"""
+Pré-carga da topologia logo após o login.
+
+Sem ela, a primeira visita a cada aba busca estações, sensores de cada
+estação, controladores, válvulas de cada controlador e a tarifa vigente
+sob demanda, uma lista de cada vez. start_warm_up(token) faz essas buscas
+numa thread própria, em duas rodadas paralelas (listas de topo, depois as
+filhas de cada estação/controlador), e preenche o reference_cache.
+
+Roda fora da thread do script: nada de st.*; falhas só deixam a entrada
+para a busca sob demanda de sempre. Uma pré-carga por escopo de token.
+"""
+
+import threading
+
+import api
+from src.stations_repository import STATIONS_ENDPOINT, sensors_endpoint
+from src.ui_components import cache_tag, reference_cache
+
+_running = set()
+_lock = threading.Lock()
+
+
+def _json(response, expected):
+    if response is None or response.status_code != 200:
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, expected) else None
+
+
+def _get_many(token, calls):
+    """[(endpoint, tipo esperado)] em paralelo -> JSON de cada um ou None."""
+    responses = api.api_request_many(
+        [{"method": "GET", "endpoint": endpoint, "token": token} for endpoint, _ in calls],
+        show_errors=False,
+    )
+    return [_json(response, expected) for response, (_, expected) in zip(responses, calls)]
+
+
+def warm_up_topology(token):
+    """
+    Busca a topologia inteira e guarda no reference_cache com as mesmas
+    tags dos getters (stations_repository, controller_selector,
+    get_valves_cached, get_current_tariff_cached).
+    Retorna quantas listas foram buscadas com sucesso.
+    """
+    stations, controllers, tariff = _get_many(token, [
+        (STATIONS_ENDPOINT, list),
+        ("/api/controllers", list),
+        ("/api/tariff-schedules/current", dict),
+    ])
+    reference_cache.put(token, cache_tag("stations"), stations)
+    reference_cache.put(token, cache_tag("controllers"), controllers)
+    reference_cache.put(token, cache_tag("tariffs"), tariff)
+
+    children = [
+        (cache_tag("sensors", station=s["id"]), sensors_endpoint(s["id"]))
+        for s in stations or []
+        if s.get("id") is not None
+    ] + [
+        (cache_tag("valves", controller=c["id"]), f"/api/controllers/{c['id']}/valves")
+        for c in controllers or []
+        if c.get("id") is not None
+    ]
+    lists = _get_many(token, [(endpoint, list) for _, endpoint in children])
+    for (tag, _), value in zip(children, lists):
+        reference_cache.put(token, tag, value)
+
+    loaded = [stations, controllers, tariff] + lists
+    return sum(1 for value in loaded if value is not None)
+
+
+def start_warm_up(token):
+    """
+    Dispara warm_up_topology em segundo plano e retorna na hora. Não faz
+    nada se o token ainda não tem escopo (não foi aceito pelo backend) ou
+    se já há uma pré-carga em andamento para o mesmo escopo.
+    """
+    scope = api.token_scope(token)
+    if scope is None:
+        return None
+    with _lock:
+        if scope in _running:
+            return None
+        _running.add(scope)
+
+    def run():
+        try:
+            warm_up_topology(token)
+        finally:
+            with _lock:
+                _running.discard(scope)
+
+    # Thread própria (não um worker do pool): as rodadas paralelas usam o
+    # api.get_executor() e esperam por ele
+    thread = threading.Thread(target=run, name="topology-warm-up", daemon=True)
+    thread.start()
+    return thread
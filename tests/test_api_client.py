@@ -0,0 +1,1162 @@
+"""
+Testes unitários para o cliente HTTP centralizado (api.py)
+- Pool de conexões keep-alive compartilhado
+- Coalescência (single-flight) de GETs idênticos em andamento
+- Revalidação condicional (ETag / Last-Modified)
+"""
+import base64
+import gzip
+import io
+import json
+import threading
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import api
+
+api.base_url = "http://api.test"
+
+
+def make_http_response(status_code=200, body=b"", headers=None):
+    """Resposta requests real (necessária onde o cliente lê content/headers)."""
+    response = api.requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.raw = io.BytesIO(body)
+    response.headers.update(headers or {})
+    response.encoding = "utf-8"
+    return response
+
+
+def make_response(status_code=200, json_data=None, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = json_data
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestConnectionPool:
+    """Testes do pool de conexões compartilhado"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+
+    def teardown_method(self):
+        api.configure_pool(enabled=True)
+
+    def test_session_is_shared(self):
+        """Teste: a mesma Session é reutilizada entre chamadas"""
+        assert api.get_session() is api.get_session()
+
+    def test_pool_config_applied_to_adapter(self):
+        """Teste: tamanho do pool por host vem da configuração"""
+        api.configure_pool(pool_maxsize=7, pool_connections=2)
+        adapter = api.get_session().get_adapter("https://example.com")
+        assert adapter._pool_maxsize == 7
+        assert adapter._pool_connections == 2
+
+    def test_configure_pool_rebuilds_session(self):
+        """Teste: alterar a configuração descarta a Session anterior"""
+        first = api.get_session()
+        api.configure_pool(pool_maxsize=5)
+        assert api.get_session() is not first
+
+    def test_configure_pool_unknown_option(self):
+        """Teste: opção desconhecida é rejeitada"""
+        with pytest.raises(ValueError):
+            api.configure_pool(max_connections=3)
+
+    def test_api_request_uses_pooled_session(self):
+        """Teste: api_request usa a Session do pool"""
+        session = api.get_session()
+        with patch.object(session, 'request', return_value=make_response()) as mock_request:
+            response = api.api_request('GET', '/api/controllers', token='tok')
+
+        assert response.status_code == 200
+        mock_request.assert_called_once()
+        assert mock_request.call_args[1]['headers']['Authorization'] == 'Bearer tok'
+
+    @patch('api.requests.request')
+    def test_api_request_without_pool(self, mock_request):
+        """Teste: com pool desativado cada chamada abre sua própria conexão"""
+        api.configure_pool(enabled=False)
+        mock_request.return_value = make_response()
+
+        response = api.api_request('GET', '/api/controllers', token='tok')
+
+        assert response.status_code == 200
+        mock_request.assert_called_once()
+
+
+class TestSingleFlight:
+    """Testes da coalescência de requisições idênticas em andamento"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_client_stats()
+        api.reset_circuits()
+        self.saved_retry = dict(api.RETRY_CONFIG)
+        api.configure_retry(max_retries=0)
+        self.release = threading.Event()
+        self.session = api.get_session()
+
+    def teardown_method(self):
+        api.configure_retry(**self.saved_retry)
+
+    def slow_request(self, *args, **kwargs):
+        self.release.wait(timeout=5)
+        return make_response(json_data=[{"id": 1}])
+
+    def wait_for_waiters(self, count):
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            calls = list(api._singleflight._calls.values())
+            if calls and calls[0].waiters >= count:
+                return
+            time.sleep(0.005)
+        raise AssertionError("chamadas não coalesceram a tempo")
+
+    def run_concurrently(self, n, target):
+        results = [None] * n
+
+        def worker(i):
+            results[i] = target()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for t in threads:
+            t.start()
+        return threads, results
+
+    def test_identical_gets_share_one_backend_call(self):
+        """Teste: N GETs idênticos simultâneos geram uma única chamada"""
+        with patch.object(self.session, 'request', side_effect=self.slow_request) as mock_request:
+            threads, results = self.run_concurrently(
+                5, lambda: api.api_request('GET', '/api/monitoring-stations', token='tok')
+            )
+            self.wait_for_waiters(4)
+            self.release.set()
+            for t in threads:
+                t.join()
+
+        assert mock_request.call_count == 1
+        assert all(r is results[0] for r in results)
+        stats = api.get_client_stats()
+        assert stats["backend_calls"] == 1
+        assert stats["singleflight_saved"] == 4
+
+    def test_different_tokens_are_not_coalesced(self):
+        """Teste: tokens diferentes nunca compartilham resposta"""
+        key_a = api._request_key('GET', 'http://x/api/home', {"Authorization": "Bearer a"}, {})
+        key_b = api._request_key('GET', 'http://x/api/home', {"Authorization": "Bearer b"}, {})
+        assert key_a != key_b
+
+    def test_same_scope_tokens_are_coalesced(self):
+        """Teste: operadores com o mesmo escopo compartilham a chamada; outro escopo não"""
+        scopes = {"ana": "admin", "bia": "admin", "caio": "operator"}
+        with patch('api.token_scope', side_effect=scopes.get):
+            key_ana, key_bia, key_caio = (
+                api._request_key('GET', 'http://x/api/home', {"Authorization": f"Bearer {name}"}, {})
+                for name in scopes
+            )
+
+        assert key_ana == key_bia
+        assert key_ana != key_caio
+        assert "Bearer ana" not in str(key_ana)
+
+    def test_params_are_part_of_the_key(self):
+        """Teste: parâmetros de query diferenciam as requisições"""
+        key_1 = api._request_key('GET', 'http://x/api/measurements', {}, {"params": {"page": 1}})
+        key_2 = api._request_key('GET', 'http://x/api/measurements', {}, {"params": {"page": 2}})
+        assert key_1 != key_2
+
+    def test_mutations_are_never_coalesced(self):
+        """Teste: POST/PUT/DELETE e GET em streaming não são coalescidos"""
+        assert api._request_key('POST', 'http://x/api/controllers', {}, {"json": {}}) is None
+        assert api._request_key('DELETE', 'http://x/api/controllers/1', {}, {}) is None
+        assert api._request_key('GET', 'http://x/api/measurements/export', {}, {"stream": True}) is None
+
+    def test_error_is_shared_with_waiters(self):
+        """Teste: falha da chamada líder é repassada a quem aguardava"""
+        def failing_request(*args, **kwargs):
+            self.release.wait(timeout=5)
+            raise api.requests.exceptions.ConnectionError("down")
+
+        with patch.object(self.session, 'request', side_effect=failing_request) as mock_request:
+            threads, results = self.run_concurrently(
+                3, lambda: api.api_request('GET', '/api/health', token='tok')
+            )
+            self.wait_for_waiters(2)
+            self.release.set()
+            for t in threads:
+                t.join()
+
+        assert mock_request.call_count == 1
+        assert results == [None, None, None]
+
+
+class TestConditionalRevalidation:
+    """Testes do cache de validadores (If-None-Match / If-Modified-Since)"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_client_stats()
+        api.reset_circuits()
+        api._validator_cache.clear()
+        self.session = api.get_session()
+
+    def test_revalidation_serves_stored_body_on_304(self):
+        """Teste: 304 devolve o corpo guardado como resposta 200"""
+        first = make_http_response(200, b'[{"id": 1, "name": "C1"}]', {"ETag": '"v1"'})
+        not_modified = make_http_response(304, b"")
+
+        with patch.object(self.session, 'request', side_effect=[first, not_modified]) as mock_request:
+            r1 = api.api_request('GET', '/api/controllers', token='tok')
+            r2 = api.api_request('GET', '/api/controllers', token='tok')
+
+        assert r1.json() == [{"id": 1, "name": "C1"}]
+        assert r2.status_code == 200
+        assert r2.from_cache is True
+        assert r2.json() == [{"id": 1, "name": "C1"}]
+        sent_headers = mock_request.call_args_list[1][1]['headers']
+        assert sent_headers['If-None-Match'] == '"v1"'
+        assert api.get_client_stats()["revalidated_304"] == 1
+
+    def test_json_is_parsed_once_per_entry(self):
+        """Teste: revalidação não decodifica o JSON novamente"""
+        first = make_http_response(200, b'[{"id": 7}]', {"ETag": '"a"'})
+        not_modified = make_http_response(304, b"")
+
+        with patch.object(self.session, 'request', side_effect=[first, not_modified]):
+            r1 = api.api_request('GET', '/api/monitoring-stations', token='tok')
+            data1 = r1.json()
+            r2 = api.api_request('GET', '/api/monitoring-stations', token='tok')
+
+        assert r2.json() is data1
+
+    def test_last_modified_sends_if_modified_since(self):
+        """Teste: Last-Modified gera If-Modified-Since na próxima chamada"""
+        stamp = "Wed, 21 Oct 2026 07:28:00 GMT"
+        first = make_http_response(200, b'{"id": 1}', {"Last-Modified": stamp})
+        second = make_http_response(200, b'{"id": 1}', {"Last-Modified": stamp})
+
+        with patch.object(self.session, 'request', side_effect=[first, second]) as mock_request:
+            api.api_request('GET', '/api/tariff-schedules', token='tok')
+            api.api_request('GET', '/api/tariff-schedules', token='tok')
+
+        assert mock_request.call_args_list[1][1]['headers']['If-Modified-Since'] == stamp
+
+    def test_responses_without_validators_are_not_stored(self):
+        """Teste: sem ETag/Last-Modified não há requisição condicional"""
+        plain = make_http_response(200, b'[]')
+
+        with patch.object(self.session, 'request', side_effect=[plain, plain]) as mock_request:
+            api.api_request('GET', '/api/controllers/3/valves', token='tok')
+            api.api_request('GET', '/api/controllers/3/valves', token='tok')
+
+        assert 'If-None-Match' not in mock_request.call_args_list[1][1]['headers']
+
+    def test_tokens_never_share_entries(self):
+        """Teste: corpo e validadores de um token não chegam a outro token"""
+        tenant_a = make_http_response(200, b'[{"secret": "tenantA"}]', {"ETag": '"a1"'})
+        tenant_b = make_http_response(200, b'[{"secret": "tenantB"}]', {"ETag": '"b1"'})
+
+        with patch.object(self.session, 'request', side_effect=[tenant_a, tenant_b]) as mock_request:
+            r_a = api.api_request('GET', '/api/controllers', token='tok-a')
+            r_b = api.api_request('GET', '/api/controllers', token='tok-b')
+
+        assert 'If-None-Match' not in mock_request.call_args_list[1][1]['headers']
+        assert r_a.json() == [{"secret": "tenantA"}]
+        assert r_b.json() == [{"secret": "tenantB"}]
+        key_a = api._validator_key('GET', 'http://api.test/api/controllers', {"Authorization": "Bearer tok-a"}, None)
+        key_b = api._validator_key('GET', 'http://api.test/api/controllers', {"Authorization": "Bearer tok-b"}, None)
+        anonymous = api._validator_key('GET', 'http://api.test/api/controllers', {}, None)
+        assert len({key_a, key_b, anonymous}) == 3
+        assert api._validator_cache.get(anonymous) is None
+
+    def test_scoped_tokens_key_by_scope(self):
+        """Teste: escopos diferentes têm entradas separadas; o mesmo escopo compartilha"""
+        scopes = {"Bearer ana": "admin", "Bearer bia": "admin", "Bearer caio": "operator"}
+        with patch('api.token_scope', side_effect=lambda token: scopes["Bearer " + token]):
+            keys = {
+                name: api._validator_key('GET', 'http://x/api/home', {"Authorization": name}, None)
+                for name in scopes
+            }
+
+        assert keys["Bearer ana"] == keys["Bearer bia"]
+        assert keys["Bearer ana"] != keys["Bearer caio"]
+
+    def test_cache_respects_byte_budget(self):
+        """Teste: entradas mais antigas são descartadas ao exceder o orçamento"""
+        cache = api.ValidatorCache(max_bytes=800)
+        for i in range(10):
+            response = make_http_response(200, b"x" * 100, {"ETag": str(i)})
+            cache.store((None, f"http://x/api/k{i}"), api._ValidatedEntry(response))
+
+        assert cache.get((None, "http://x/api/k0")) is None
+        assert cache.get((None, "http://x/api/k9")) is not None
+        assert cache._bytes <= 800
+
+
+class TestCacheStats:
+    """Testes das estatísticas dos caches (painel de observabilidade)"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_client_stats()
+        api.reset_circuits()
+        api._validator_cache.clear()
+        api.reset_cache_stats()
+        self.session = api.get_session()
+
+    def test_revalidation_counts_miss_then_hit(self):
+        """Teste: 200 conta como falta, 304 como acerto, por família de endpoint"""
+        first = make_http_response(200, b'[{"id": 1}]', {"ETag": '"v1"'})
+        not_modified = make_http_response(304, b"")
+
+        with patch.object(self.session, 'request', side_effect=[first, not_modified]):
+            api.api_request('GET', '/api/controllers', token='tok')
+            api.api_request('GET', '/api/controllers', token='tok')
+
+        stats = api.get_cache_stats()["Revalidação ETag/Last-Modified (api)"]
+        family = stats["by_key"][api.endpoint_family('/api/controllers')]
+        assert (family["hits"], family["misses"]) == (1, 1)
+        assert family["entries"] == 1 and family["bytes"] > 0
+        assert stats["hit_ratio"] == 0.5
+
+    def test_evictions_are_counted(self):
+        """Teste: descarte por orçamento entra em evictions"""
+        cache = api.ValidatorCache(max_bytes=800)
+        for i in range(10):
+            response = make_http_response(200, b"x" * 100, {"ETag": str(i)})
+            cache.store((None, f"/api/controllers/{i}"), api._ValidatedEntry(response))
+
+        stats = cache.cache_stats()
+        assert stats["by_key"]["controllers"]["evictions"] == stats["evictions"]
+        assert stats["evictions"] == 10 - stats["entries"]
+
+    def test_snapshot_with_sizes(self):
+        """Teste: sizes acrescenta entries/bytes por chave e no total"""
+        counters = api.CacheStats()
+        counters.record("hits", "stations")
+        counters.record("stale", "stations", amount=2)
+        counters.record("misses", "sensors")
+
+        stats = counters.snapshot([("stations", 10), ("stations", 5), ("valves", 3)])
+
+        assert (stats["hits"], stats["stale"], stats["misses"]) == (1, 2, 1)
+        assert stats["by_key"]["stations"]["bytes"] == 15
+        assert stats["by_key"]["valves"] == {
+            "hits": 0, "misses": 0, "stale": 0, "evictions": 0, "entries": 1, "bytes": 3,
+        }
+        assert (stats["entries"], stats["bytes"]) == (3, 18)
+
+    def test_registered_cache_gets_hit_ratio_and_reset(self):
+        """Teste: get_cache_stats calcula hit_ratio; reset zera os contadores"""
+        cache = Mock()
+        cache.counters = api.CacheStats()
+        cache.cache_stats = lambda: cache.counters.snapshot([])
+        cache.counters.record("hits", "a", amount=3)
+        cache.counters.record("misses", "a")
+        cache.counters.record("evictions", "b")
+
+        with patch.dict(api._caches, {"teste": cache}):
+            stats = api.get_cache_stats()["teste"]
+            assert stats["hit_ratio"] == 0.75
+            assert stats["by_key"]["b"]["hit_ratio"] is None
+            api.reset_cache_stats()
+            assert api.get_cache_stats()["teste"]["hits"] == 0
+
+    def test_cache_panel_is_admin_only(self):
+        """Teste: só tokens com perfil admin veem o painel"""
+        from src.cache_panel import is_admin
+
+        def token(claims):
+            payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+            return f"eyJhbGciOiJIUzI1NiJ9.{payload}.x"
+
+        assert is_admin(token({"role": "Admin"}))
+        assert is_admin(token({"roles": ["user", "admin"]}))
+        assert not is_admin(token({"role": "user"}))
+        assert not is_admin("nao-e-jwt")
+        assert not is_admin(None)
+
+
+class TestNegativeCache:
+    """Testes do cache negativo (404/5xx) do cliente HTTP"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_client_stats()
+        api.reset_circuits()
+        api._validator_cache.clear()
+        api._negative_cache.clear()
+        self.session = api.get_session()
+        self.saved_retry = dict(api.RETRY_CONFIG)
+        api.configure_retry(max_retries=0)
+
+    def teardown_method(self):
+        api.configure_retry(**self.saved_retry)
+        api._negative_cache.clear()
+        api.reset_circuits()
+
+    @patch('api.st')
+    @patch('api.token_scope', return_value="admin")
+    def test_missing_endpoint_is_not_requested_again(self, mock_scope, mock_st):
+        """Teste: 404 repetido não vai à rede e mostra o mesmo erro"""
+        with patch.object(self.session, 'request', return_value=make_http_response(404)) as mock_request:
+            first = api.api_request('GET', '/api/consumptions/energy', token='tok')
+            second = api.api_request('GET', '/api/consumptions/energy', token='tok')
+
+        assert first is None and second is None
+        assert mock_request.call_count == 1
+        assert api.get_client_stats()["negative_served"] == 1
+        assert "404" in mock_st.error.call_args[0][0]
+
+    @patch('api.st')
+    @patch('api.token_scope', return_value="admin")
+    def test_bypass_goes_to_backend(self, mock_scope, mock_st):
+        """Teste: bypass_cache ignora a resposta negativa e a renova"""
+        side_effect = [make_http_response(404), make_http_response(200, b'[]'), make_response()]
+        with patch.object(self.session, 'request', side_effect=side_effect) as mock_request:
+            api.api_request('GET', '/api/consumptions/water', token='tok')
+            with api.bypass_cache():
+                response = api.api_request('GET', '/api/consumptions/water', token='tok')
+            api.api_request('GET', '/api/consumptions/water', token='tok')
+
+        assert response.status_code == 200
+        assert mock_request.call_count == 3
+        assert len(api._negative_cache) == 0
+
+    def test_server_errors_expire_sooner(self):
+        """Teste: 5xx vale error_ttl; 404 vale ttl; 400 não é guardado"""
+        clock = FakeClock()
+        cache = api.NegativeCache(ttl=60, error_ttl=10, clock=clock)
+        key = ("admin", "http://api.test/api/home")
+        missing = ("admin", "http://api.test/api/consumptions/energy")
+        cache.store(key, make_http_response(503))
+        cache.store(missing, make_http_response(404))
+
+        assert not cache.store(("admin", "http://api.test/api/x"), make_http_response(400))
+        clock.now += 10
+        assert cache.get(key) is None
+        assert cache.get(missing).status_code == 404
+        assert cache.cache_stats()["evictions"] == 1
+
+    @patch('api.st')
+    @patch('api.token_scope', return_value="admin")
+    def test_mutation_clears_resource(self, mock_scope, mock_st):
+        """Teste: POST bem-sucedido apaga as respostas negativas do recurso alterado"""
+        side_effect = [make_http_response(404), make_response(), make_response(json_data=[])]
+        with patch.object(self.session, 'request', side_effect=side_effect) as mock_request:
+            api.api_request('GET', '/api/monitoring-stations/7/sensors', token='tok')
+            api.api_request('POST', '/api/monitoring-stations/7/sensors', token='tok', json={})
+            api.api_request('GET', '/api/monitoring-stations/7/sensors', token='tok')
+
+        assert mock_request.call_count == 3
+
+    @patch('api.st')
+    @patch('api.token_scope', return_value="admin")
+    def test_query_post_keeps_other_entries(self, mock_scope, mock_st):
+        """Teste: POST de consulta (relatório) não apaga os erros guardados de GETs da família"""
+        side_effect = [make_http_response(503), make_response(json_data=[])]
+        with patch.object(self.session, 'request', side_effect=side_effect) as mock_request:
+            api.api_request('GET', '/api/measurements', token='tok', params={"stationId": 1})
+            api.api_request('POST', '/api/measurements/report', token='tok', json={})
+            api.api_request('GET', '/api/measurements', token='tok', params={"stationId": 1})
+
+        assert mock_request.call_count == 2
+        assert api.get_client_stats()["negative_served"] == 1
+
+    @patch('api.st')
+    def test_unscoped_token_is_not_cached(self, mock_st):
+        """Teste: token sem escopo (não aceito) sempre vai à rede"""
+        with patch.object(self.session, 'request', return_value=make_http_response(404)) as mock_request:
+            api.api_request('GET', '/api/consumptions/energy', token='tok')
+            api.api_request('GET', '/api/consumptions/energy', token='tok')
+
+        assert mock_request.call_count == 2
+
+    @patch('api.st')
+    @patch('api.token_scope', return_value="admin")
+    def test_server_error_with_stored_body_is_not_cached(self, mock_scope, mock_st):
+        """Teste: 5xx de URL com corpo guardado fica com o circuit breaker"""
+        first = make_http_response(200, b'{"gateway": true}', {"ETag": '"h1"'})
+        with patch.object(self.session, 'request', side_effect=[first, make_http_response(503)]):
+            api.api_request('GET', '/api/home', token='tok')
+            api.api_request('GET', '/api/home', token='tok')
+
+        assert len(api._negative_cache) == 0
+
+
+class TestRequestMany:
+    """Testes do lote de requisições em paralelo (api_request_many)"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_circuits()
+        api._validator_cache.clear()
+        self.session = api.get_session()
+
+    def test_results_follow_input_order(self):
+        """Teste: respostas na mesma ordem das chamadas, mesmo fora de ordem na rede"""
+        delays = {"/api/home": 0.05, "/api/health": 0.0, "/api/controllers": 0.02}
+
+        def fake_request(method, url, **kwargs):
+            path = url.replace(api.base_url, "")
+            time.sleep(delays[path])
+            return make_response(json_data={"path": path})
+
+        calls = [{"method": "GET", "endpoint": p, "token": "tok"} for p in delays]
+        with patch.object(self.session, 'request', side_effect=fake_request):
+            responses = api.api_request_many(calls)
+
+        assert [r.json()["path"] for r in responses] == list(delays)
+
+    @patch('api.st')
+    def test_failed_item_is_none(self, mock_st):
+        """Teste: falha de um item vira None sem afetar os demais"""
+        def fake_request(method, url, **kwargs):
+            if url.endswith("/api/health"):
+                raise api.requests.exceptions.ConnectionError("down")
+            return make_response(json_data={"ok": True})
+
+        calls = [
+            {"method": "GET", "endpoint": "/api/home", "token": "tok"},
+            {"method": "GET", "endpoint": "/api/health", "token": "tok"},
+        ]
+        with patch.object(self.session, 'request', side_effect=fake_request):
+            home, health = api.api_request_many(calls)
+
+        assert home.json() == {"ok": True}
+        assert health is None
+        mock_st.error.assert_called_once()
+
+    def test_takes_time_of_slowest_call(self):
+        """Teste: duração total é a da chamada mais lenta, não a soma"""
+        def fake_request(method, url, **kwargs):
+            time.sleep(0.2)
+            return make_response()
+
+        calls = [
+            {"method": "POST", "endpoint": f"/api/measurements/{name}", "token": "tok", "json": {}}
+            for name in ("current-average", "report", "export")
+        ]
+        with patch.object(self.session, 'request', side_effect=fake_request):
+            start = time.perf_counter()
+            responses = api.api_request_many(calls)
+            elapsed = time.perf_counter() - start
+
+        assert all(r is not None for r in responses)
+        assert elapsed < 0.45
+
+    def test_empty_batch(self):
+        """Teste: lote vazio não dispara requisições"""
+        assert api.api_request_many([]) == []
+
+
+class TestRetry:
+    """Testes das novas tentativas com backoff, jitter e Retry-After"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_client_stats()
+        api.reset_circuits()
+        api._validator_cache.clear()
+        self.session = api.get_session()
+        self.saved_config = dict(api.RETRY_CONFIG)
+        api.configure_retry(max_retries=3, backoff_base=0.01, backoff_max=0.05, budget=5.0)
+
+    def teardown_method(self):
+        api.configure_retry(**self.saved_config)
+
+    @patch('api.time.sleep')
+    def test_transient_5xx_is_retried(self, mock_sleep):
+        """Teste: 503 seguido de 200 devolve a resposta de sucesso"""
+        responses = [make_http_response(503), make_http_response(200, b'{"ok": true}')]
+        with patch.object(self.session, 'request', side_effect=responses) as mock_request:
+            response = api.api_request('GET', '/api/home', token='tok')
+
+        assert response.json() == {"ok": True}
+        assert mock_request.call_count == 2
+        assert api.get_client_stats()["retries"] == 1
+        assert 0 <= mock_sleep.call_args[0][0] <= 0.01
+
+    @patch('api.time.sleep')
+    def test_connection_error_is_retried(self, mock_sleep):
+        """Teste: falha de conexão em GET gera nova tentativa"""
+        side_effect = [api.requests.exceptions.ConnectionError("reset"), make_response()]
+        with patch.object(self.session, 'request', side_effect=side_effect) as mock_request:
+            response = api.api_request('GET', '/api/controllers', token='tok')
+
+        assert response.status_code == 200
+        assert mock_request.call_count == 2
+
+    @patch('api.st')
+    @patch('api.time.sleep')
+    def test_post_is_not_retried(self, mock_sleep, mock_st):
+        """Teste: métodos não idempotentes não são repetidos"""
+        with patch.object(self.session, 'request', return_value=make_http_response(503)) as mock_request:
+            response = api.api_request('POST', '/api/controllers', token='tok', json={})
+
+        assert response is None
+        assert mock_request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch('api.time.sleep')
+    def test_retry_after_is_honoured(self, mock_sleep):
+        """Teste: 429 espera o tempo pedido em Retry-After"""
+        responses = [
+            make_http_response(429, b"", {"Retry-After": "2"}),
+            make_http_response(200, b"[]"),
+        ]
+        with patch.object(self.session, 'request', side_effect=responses):
+            response = api.api_request('GET', '/api/measurements', token='tok')
+
+        assert response.status_code == 200
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch('api.st')
+    @patch('api.time.sleep')
+    def test_retry_after_beyond_budget_gives_up_immediately(self, mock_sleep, mock_st):
+        """Teste: Retry-After maior que o orçamento não bloqueia o script"""
+        throttled = make_http_response(429, b"", {"Retry-After": "30"})
+        with patch.object(self.session, 'request', return_value=throttled) as mock_request:
+            response = api.api_request('GET', '/api/measurements', token='tok')
+
+        assert response is None
+        assert mock_request.call_count == 1
+        mock_sleep.assert_not_called()
+        assert api.get_client_stats()["retry_giveups"] == 1
+        assert "30 segundos" in mock_st.error.call_args[0][0]
+
+    @patch('api.st')
+    @patch('api.time.sleep')
+    def test_gives_up_after_max_retries(self, mock_sleep, mock_st):
+        """Teste: número de tentativas é limitado"""
+        with patch.object(self.session, 'request', return_value=make_http_response(502)) as mock_request:
+            response = api.api_request('GET', '/api/health', token='tok')
+
+        assert response is None
+        assert mock_request.call_count == 4
+        assert api.get_client_stats()["retries"] == 3
+
+    @patch('api.st')
+    @patch('api.time.sleep')
+    def test_script_thread_uses_smaller_budget(self, mock_sleep, mock_st):
+        """Teste: na thread do script a espera respeita script_budget"""
+        api.configure_retry(script_budget=1.0)
+        throttled = make_http_response(429, b"", {"Retry-After": "2"})
+        with patch('api.get_script_run_ctx', return_value=Mock()):
+            with patch.object(self.session, 'request', return_value=throttled) as mock_request:
+                response = api.api_request('GET', '/api/measurements', token='tok')
+
+        assert response is None
+        assert mock_request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_script_budget_follows_pool_tasks(self):
+        """Teste: tarefas do pool criadas pela thread do script também seguram a renderização"""
+        executor = api.get_executor()
+        with patch('api.get_script_run_ctx', return_value=Mock()):
+            context = api.task_context()
+        assert executor.submit(context.run, api.blocks_script).result() is True
+        assert executor.submit(api.task_context().run, api.blocks_script).result() is False
+
+    def test_retry_after_http_date(self):
+        """Teste: Retry-After também aceita data HTTP"""
+        response = make_http_response(503, b"", {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert api.retry_after_seconds(response) == 0.0
+        assert api.retry_after_seconds(make_http_response(503)) is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Testes do circuit breaker por família de endpoints"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_client_stats()
+        api.reset_circuits()
+        api._validator_cache.clear()
+        self.session = api.get_session()
+        self.saved_retry = dict(api.RETRY_CONFIG)
+        self.saved_breaker = dict(api.BREAKER_CONFIG)
+        api.configure_retry(max_retries=0)
+        api.BREAKER_CONFIG.update(failure_threshold=2, open_seconds=30.0)
+
+    def teardown_method(self):
+        api.configure_retry(**self.saved_retry)
+        api.BREAKER_CONFIG.update(self.saved_breaker)
+        api.reset_circuits()
+
+    def test_state_transitions(self):
+        """Teste: closed -> open -> half_open (uma chamada de teste) -> closed"""
+        clock = FakeClock()
+        breaker = api.CircuitBreaker("home", failure_threshold=3, open_seconds=10, clock=clock)
+
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert breaker.state == api.CIRCUIT_OPEN
+        assert not breaker.allow()
+
+        clock.now += 10
+        assert breaker.allow()
+        assert breaker.state == api.CIRCUIT_HALF_OPEN
+        assert not breaker.allow()  # só uma chamada de teste por vez
+
+        breaker.record_success()
+        assert breaker.state == api.CIRCUIT_CLOSED
+        assert breaker.failures == 0
+
+    def test_failed_probe_reopens(self):
+        """Teste: falha na chamada de teste reabre o circuito"""
+        clock = FakeClock()
+        breaker = api.CircuitBreaker("home", failure_threshold=1, open_seconds=5, clock=clock)
+        breaker.record_failure()
+        clock.now += 5
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == api.CIRCUIT_OPEN
+        assert breaker.retry_in() == 5
+
+    def test_endpoint_family(self):
+        """Teste: família é o primeiro segmento após /api"""
+        assert api.endpoint_family("http://x/api/monitoring-stations/3/sensors") == "monitoring-stations"
+        assert api.endpoint_family("http://x/api/home") == "home"
+
+    @patch('api.st')
+    def test_open_circuit_fails_fast(self, mock_st):
+        """Teste: com o circuito aberto a chamada não vai à rede"""
+        down = api.requests.exceptions.ConnectionError("down")
+        with patch.object(self.session, 'request', side_effect=down) as mock_request:
+            api.api_request('GET', '/api/home', token='tok')
+            api.api_request('GET', '/api/home', token='tok')
+            response = api.api_request('GET', '/api/home', token='tok')
+
+        assert response is None
+        assert mock_request.call_count == 2
+        assert api.is_api_degraded()
+        assert api.get_circuit_states()["home"]["state"] == api.CIRCUIT_OPEN
+        assert "indisponível" in mock_st.error.call_args[0][0]
+
+    @patch('api.st')
+    def test_open_circuit_serves_stored_body(self, mock_st):
+        """Teste: GET com corpo guardado recebe o corpo em vez do erro"""
+        first = make_http_response(200, b'{"gateway": true}', {"ETag": '"h1"'})
+        side_effect = [first, make_http_response(503), make_http_response(503)]
+        with patch.object(self.session, 'request', side_effect=side_effect):
+            api.api_request('GET', '/api/home', token='tok')
+            api.api_request('GET', '/api/home', token='tok')
+            api.api_request('GET', '/api/home', token='tok')
+            response = api.api_request('GET', '/api/home', token='tok')
+
+        assert response.from_cache is True
+        assert response.json() == {"gateway": True}
+        assert api.get_client_stats()["circuit_stale_served"] == 1
+
+    @patch('api.st')
+    def test_open_circuit_never_serves_other_token(self, mock_st):
+        """Teste: corpo guardado de um token não é servido a outro token nem sem token"""
+        tenant_a = make_http_response(200, b'[{"secret": "tenantA"}]', {"ETag": '"a1"'})
+        side_effect = [tenant_a, make_http_response(503), make_http_response(503)]
+        with patch.object(self.session, 'request', side_effect=side_effect) as mock_request:
+            api.api_request('GET', '/api/controllers', token='tok-a')
+            api.api_request('GET', '/api/controllers', token='tok-b')
+            api.api_request('GET', '/api/controllers', token='tok-b')
+            other = api.api_request('GET', '/api/controllers', token='tok-b')
+            anonymous = api.api_request('GET', '/api/controllers')
+
+        assert mock_request.call_count == 3
+        assert other is None and anonymous is None
+        assert "indisponível" in mock_st.error.call_args[0][0]
+        assert api.get_client_stats().get("circuit_stale_served", 0) == 0
+
+    def test_fallback_identity_is_checked(self):
+        """Teste: entrada de outra identidade vira CircuitOpenError"""
+        entry = api._ValidatedEntry(make_http_response(200, b'[]', {"ETag": '"x"'}), identity="tenant-a")
+        breaker = api.get_breaker('http://api.test/api/controllers')
+        for _ in range(2):
+            breaker.record_failure()
+
+        with pytest.raises(api.CircuitOpenError):
+            api._send_guarded('GET', 'http://api.test/api/controllers',
+                              {"Authorization": "Bearer tok-b"}, fallback=entry)
+
+    @patch('api.st')
+    def test_families_are_independent(self, mock_st):
+        """Teste: circuito aberto em /api/home não afeta /api/health"""
+        def fake_request(method, url, **kwargs):
+            if "/api/home" in url:
+                raise api.requests.exceptions.ConnectionError("down")
+            return make_response()
+
+        with patch.object(self.session, 'request', side_effect=fake_request):
+            api.api_request('GET', '/api/home', token='tok')
+            api.api_request('GET', '/api/home', token='tok')
+            response = api.api_request('GET', '/api/health', token='tok')
+
+        assert response.status_code == 200
+        assert api.get_circuit_states()["health"]["state"] == api.CIRCUIT_CLOSED
+
+
+class TestPageDeadline:
+    """Testes do prazo da página propagado às chamadas"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_client_stats()
+        api.reset_circuits()
+        api._validator_cache.clear()
+        self.session = api.get_session()
+
+    def test_timeout_is_remaining_budget(self):
+        """Teste: timeout da chamada é o tempo restante do prazo"""
+        with patch.object(self.session, 'request', return_value=make_response()) as mock_request:
+            with api.page_deadline(2.0):
+                api.api_request('GET', '/api/consumptions/water', token='tok')
+
+        assert mock_request.call_args[1]['timeout'] <= 2.0
+
+    @patch('api.st')
+    def test_expired_deadline_skips_call(self, mock_st):
+        """Teste: chamada que não cabe no prazo é pulada e marcada como degradada"""
+        with patch.object(self.session, 'request') as mock_request:
+            with api.page_deadline(0.0) as deadline:
+                response = api.api_request('GET', '/api/consumptions/energy', token='tok')
+
+        assert response is None
+        mock_request.assert_not_called()
+        mock_st.error.assert_not_called()
+        assert deadline.degraded == ['/api/consumptions/energy']
+        assert deadline.is_degraded('/api/consumptions')
+
+    def test_skipped_get_serves_stored_body(self):
+        """Teste: GET pulado devolve o último corpo guardado"""
+        first = make_http_response(200, b'[{"value": 1}]', {"ETag": '"w1"'})
+        with patch.object(self.session, 'request', return_value=first):
+            api.api_request('GET', '/api/consumptions/water', token='tok')
+
+        with api.page_deadline(0.0) as deadline:
+            response = api.api_request('GET', '/api/consumptions/water', token='tok')
+
+        assert response.from_cache is True
+        assert response.json() == [{"value": 1}]
+        assert deadline.degraded == ['/api/consumptions/water']
+
+    @patch('api.st')
+    def test_skipped_get_never_serves_other_token(self, mock_st):
+        """Teste: GET pulado não recebe o corpo guardado de outro token nem sem token"""
+        tenant_a = make_http_response(200, b'[{"secret": "tenantA"}]', {"ETag": '"a1"'})
+        with patch.object(self.session, 'request', return_value=tenant_a):
+            api.api_request('GET', '/api/controllers', token='tok-a')
+
+        with api.page_deadline(0.0) as deadline:
+            other = api.api_request('GET', '/api/controllers', token='tok-c')
+            anonymous = api.api_request('GET', '/api/controllers')
+            own = api.api_request('GET', '/api/controllers', token='tok-a')
+
+        assert other is None and anonymous is None
+        assert own.json() == [{"secret": "tenantA"}]
+        assert deadline.degraded == ['/api/controllers']
+        mock_st.error.assert_not_called()
+
+    @patch('api.st')
+    def test_timeout_inside_deadline_is_degraded(self, mock_st):
+        """Teste: timeout dentro do prazo vira dado degradado, não erro"""
+        saved = api.RETRY_CONFIG["max_retries"]
+        api.configure_retry(max_retries=0)
+        try:
+            timeout = api.requests.exceptions.ReadTimeout("slow")
+            with patch.object(self.session, 'request', side_effect=timeout):
+                with api.page_deadline(1.0) as deadline:
+                    response = api.api_request('GET', '/api/tariff-schedules', token='tok')
+        finally:
+            api.configure_retry(max_retries=saved)
+
+        assert response is None
+        mock_st.error.assert_not_called()
+        assert deadline.degraded == ['/api/tariff-schedules']
+
+    @patch('api.st')
+    def test_deadline_timeouts_leave_circuit_closed(self, mock_st):
+        """Teste: timeouts cortados pelo prazo da página não abrem o circuito da família"""
+        saved = api.RETRY_CONFIG["max_retries"]
+        api.configure_retry(max_retries=0)
+
+        def slow(method, url, timeout=None, **kwargs):
+            if timeout < 10:
+                raise api.requests.exceptions.ReadTimeout("slow")
+            return make_response()
+
+        try:
+            with patch.object(self.session, 'request', side_effect=slow):
+                for _ in range(api.BREAKER_CONFIG["failure_threshold"] + 1):
+                    with api.page_deadline(0.5) as deadline:
+                        assert api.api_request('GET', '/api/consumptions', token='tok') is None
+                    assert deadline.degraded == ['/api/consumptions']
+                response = api.api_request('GET', '/api/consumptions', token='tok')
+        finally:
+            api.configure_retry(max_retries=saved)
+
+        assert api.get_circuit_states()["consumptions"] == {"state": api.CIRCUIT_CLOSED, "failures": 0, "retry_in": 0.0}
+        assert response.status_code == 200
+        mock_st.error.assert_not_called()
+
+    @patch('api.st')
+    def test_retries_share_the_page_budget(self, mock_st):
+        """Teste: cada nova tentativa recebe só o que resta do prazo, sem estourá-lo"""
+        saved = dict(api.RETRY_CONFIG)
+        api.configure_retry(max_retries=3, backoff_base=0.01, backoff_max=0.01)
+        timeouts = []
+
+        def slow(method, url, timeout=None, **kwargs):
+            timeouts.append(timeout)
+            time.sleep(0.3)
+            raise api.requests.exceptions.ConnectionError("reset")
+
+        try:
+            with patch.object(self.session, 'request', side_effect=slow):
+                started = time.monotonic()
+                with api.page_deadline(1.0):
+                    response = api.api_request('GET', '/api/tariff-schedules', token='tok')
+                elapsed = time.monotonic() - started
+        finally:
+            api.configure_retry(**saved)
+
+        assert response is None
+        assert len(timeouts) == 3
+        assert all(later < earlier for earlier, later in zip(timeouts, timeouts[1:]))
+        assert timeouts[-1] >= api.DEADLINE_MIN_CALL_SECONDS
+        assert elapsed < 1.2
+
+    def test_deadline_propagates_to_batch_threads(self):
+        """Teste: chamadas em paralelo herdam o prazo da página"""
+        with patch.object(self.session, 'request', return_value=make_response()) as mock_request:
+            with api.page_deadline(1.5):
+                api.api_request_many([
+                    {"method": "GET", "endpoint": "/api/home", "token": "tok"},
+                    {"method": "GET", "endpoint": "/api/health", "token": "tok"},
+                ])
+
+        assert all(c[1]['timeout'] <= 1.5 for c in mock_request.call_args_list)
+
+    def test_nested_deadline_never_extends_outer(self):
+        """Teste: prazo interno não ultrapassa o externo"""
+        with api.page_deadline(1.0) as outer:
+            with api.page_deadline(10.0) as inner:
+                assert inner.expires_at <= outer.expires_at
+
+
+def make_stream_response(body, url="http://api.test/api/measurements", gzipped=False):
+    """Resposta em streaming como a de api_request(..., stream=True)."""
+    response = api.requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = "utf-8"
+    if gzipped:
+        response.raw = api.requests.packages.urllib3.response.HTTPResponse(
+            body=io.BytesIO(gzip.compress(body)),
+            headers={"Content-Encoding": "gzip"},
+            preload_content=False,
+            decode_content=True,
+        )
+    else:
+        response.raw = io.BytesIO(body)
+    return response
+
+
+class TestCompressedTransfer:
+    """Testes da compressão negociada e da contagem de bytes"""
+
+    def setup_method(self):
+        api.reset_client_stats()
+
+    def test_gzip_wire_and_decoded_bytes(self):
+        """Teste: bytes da rede (comprimidos) e decodificados por endpoint"""
+        body = json.dumps([{"id": i, "salinity": 12.5, "sensorId": 10} for i in range(800)]).encode()
+        response = make_stream_response(body, gzipped=True)
+
+        assert response.content == body
+        api._record_transfer(response.url, response)
+
+        stats = api.get_transfer_stats()["measurements"]
+        assert stats["decoded_bytes"] == len(body)
+        assert stats["wire_bytes"] == len(gzip.compress(body))
+        assert stats["ratio"] > 5
+
+    def test_accept_encoding_is_negotiated(self):
+        """Teste: gzip/deflate pedidos explicitamente"""
+        session = api.get_session()
+        with patch.object(session, 'request', return_value=make_response()) as mock_request:
+            api.api_request('GET', '/api/home', token='tok')
+
+        assert mock_request.call_args[1]['headers']['Accept-Encoding'] == "gzip, deflate"
+
+
+class TestPaginate:
+    """Testes do paginador com pré-busca (api.paginate)"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_circuits()
+        api._validator_cache.clear()
+        self.session = api.get_session()
+        self.requested = []
+
+    def fake_pages(self, total, page_size=2, delay=0.0):
+        def fake_request(method, url, params=None, **kwargs):
+            page = params["page"]
+            self.requested.append(page)
+            time.sleep(delay)
+            start = (page - 1) * page_size
+            return make_response(json_data=list(range(start, min(start + page_size, total))))
+        return fake_request
+
+    def test_pages_in_order_until_short_page(self):
+        """Teste: páginas em ordem, parando na primeira página incompleta"""
+        with patch.object(self.session, 'request', side_effect=self.fake_pages(5)):
+            pages = list(api.paginate('/api/measurements', {"sort": "desc"}, 2, token='tok'))
+
+        assert pages == [[0, 1], [2, 3], [4]]
+        assert self.requested == [1, 2, 3]
+
+    def test_page_params(self):
+        """Teste: page/pageSize somados aos filtros sem alterá-los"""
+        params = {"sensorId": 10}
+        with patch.object(self.session, 'request', side_effect=self.fake_pages(1)) as mock_request:
+            list(api.paginate('/api/measurements', params, 2, token='tok', start_page=3))
+
+        assert mock_request.call_args[1]['params'] == {"sensorId": 10, "page": 3, "pageSize": 2}
+        assert params == {"sensorId": 10}
+
+    def test_next_page_is_prefetched(self):
+        """Teste: a página seguinte é buscada enquanto a atual é consumida"""
+        with patch.object(self.session, 'request', side_effect=self.fake_pages(100, delay=0.1)):
+            pages = api.paginate('/api/measurements', None, 2, token='tok')
+            next(pages)
+            time.sleep(0.15)  # "consumo" da página 1
+            start = time.perf_counter()
+            assert next(pages) == [2, 3]
+            waited = time.perf_counter() - start
+            pages.close()
+
+        assert waited < 0.05
+
+    def test_close_cancels_prefetch(self):
+        """Teste: fechar o gerador não busca mais páginas"""
+        with patch.object(self.session, 'request', side_effect=self.fake_pages(100, delay=0.05)):
+            pages = api.paginate('/api/measurements', None, 2, token='tok')
+            next(pages)
+            pages.close()
+            time.sleep(0.1)
+
+        assert self.requested in ([1], [1, 2])
+        assert list(pages) == []
+
+    @patch('api.st')
+    def test_failure_ends_iteration(self, mock_st):
+        """Teste: falha numa página encerra a iteração e exibe o erro"""
+        def fake_request(method, url, params=None, **kwargs):
+            if params["page"] == 2:
+                raise api.requests.exceptions.ConnectionError("down")
+            return make_response(json_data=[1, 2])
+
+        saved = api.RETRY_CONFIG["max_retries"]
+        api.configure_retry(max_retries=0)
+        try:
+            with patch.object(self.session, 'request', side_effect=fake_request):
+                pages = list(api.paginate('/api/measurements', None, 2, token='tok'))
+        finally:
+            api.configure_retry(max_retries=saved)
+
+        assert pages == [[1, 2]]
+        mock_st.error.assert_called_once()
+
+    @patch('api.st')
+    def test_raise_errors(self, mock_st):
+        """Teste: com raise_errors a falha vira PageFetchError, sem st.error"""
+        saved = api.RETRY_CONFIG["max_retries"]
+        api.configure_retry(max_retries=0)
+        try:
+            with patch.object(self.session, 'request',
+                              side_effect=api.requests.exceptions.ConnectionError("down")):
+                with pytest.raises(api.PageFetchError):
+                    list(api.paginate('/api/measurements', None, 2, token='tok', raise_errors=True))
+        finally:
+            api.configure_retry(max_retries=saved)
+
+        mock_st.error.assert_not_called()
+
+
+def make_jwt(**claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload}.assinatura"
+
+
+class TestTokenScope:
+    """Testes do escopo do token usado como chave de caches compartilhados"""
+
+    def setup_method(self):
+        api.configure_pool(enabled=True)
+        api.reset_circuits()
+        self.session = api.get_session()
+
+    def accept(self, token):
+        with patch.object(self.session, 'request', return_value=make_response(json_data=[])):
+            api.api_request('GET', '/api/controllers', token=token)
+
+    def test_same_role_shares_scope(self):
+        """Teste: tokens diferentes com o mesmo perfil têm o mesmo escopo"""
+        first = make_jwt(sub="ana", role="Admin", exp=time.time() + 60)
+        second = make_jwt(sub="bia", role="Admin", exp=time.time() + 120)
+        other = make_jwt(sub="caio", role="Operator", exp=time.time() + 60)
+        for token in (first, second, other):
+            self.accept(token)
+
+        assert api.token_scope(first) == api.token_scope(second)
+        assert api.token_scope(first) != api.token_scope(other)
+
+    def test_no_scope_until_backend_accepts(self):
+        """Teste: token nunca aceito pelo backend não tem escopo"""
+        token = make_jwt(sub="ana", role="Admin", nonce="nunca-usado")
+        assert api.token_scope(token) is None
+
+        self.accept(token)
+        assert api.token_scope(token) is not None
+
+    def test_rejected_token_loses_scope(self):
+        """Teste: 401 faz o cliente esquecer o token"""
+        token = make_jwt(sub="ana", role="Admin", nonce="revogado")
+        self.accept(token)
+        with patch.object(self.session, 'request', return_value=make_http_response(401)):
+            with patch('api.st'):
+                api.api_request('GET', '/api/controllers', token=token)
+
+        assert api.token_scope(token) is None
+
+    def test_expired_or_opaque_token(self):
+        """Teste: token expirado ou que não é JWT não compartilha cache"""
+        expired = make_jwt(sub="ana", role="Admin", exp=time.time() - 1)
+        self.accept(expired)
+        self.accept("opaco")
+
+        assert api.token_scope(expired) is None
+        assert api.token_scope("opaco") is None
@@ -0,0 +1,254 @@
+"""
+Testes unitários para o cache de medições por dia (src/measurement_cache.py)
+- Só os dias que faltam vão ao backend
+- Dias assentados não expiram; recentes são buscados de novo
+- Falhas não ficam guardadas
+- Dias assentados persistidos em disco (MeasurementStore)
+- Carga do período em segundo plano (prefetch_in_background)
+"""
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+import threading
+
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import api
+from src.measurement_cache import MeasurementSegmentCache
+from src.measurement_decoder import decode_measurements
+from src.measurement_store import MeasurementStore
+
+# Uma medição a cada 6 h em janeiro de 2025
+HISTORY = pd.DataFrame({
+    "id": range(124),
+    "date": pd.date_range("2025-01-01", periods=124, freq="6h"),
+    "stationId": 1,
+    "sensorId": 10,
+    "moisture": 30.0,
+})
+
+
+def as_body(history):
+    return history.to_json(orient="records", date_format="iso").encode()
+
+
+class FakeBackend:
+    """api_request_quiet falso: devolve HISTORY filtrado e registra os períodos pedidos."""
+
+    def __init__(self, history=HISTORY, fail=False):
+        self.history = history
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, method, endpoint, token=None, params=None, **kwargs):
+        self.calls.append((params["startDate"], params["endDate"]))
+        if self.fail:
+            return None, "Erro de conexão com a API: reset"
+        start = pd.Timestamp(params["startDate"]).tz_localize(None)
+        end = pd.Timestamp(params["endDate"]).tz_localize(None)
+        dates = self.history["date"]
+        return Mock(content=as_body(self.history[(dates >= start) & (dates <= end)])), None
+
+
+def run_query(cache, backend, start, end, scope="admin"):
+    with patch('api.api_request_quiet', side_effect=backend), \
+            patch('api.token_scope', return_value=scope):
+        return cache.query("tok", start, end, station_id=1)
+
+
+class TestMeasurementSegmentCache:
+    """Testes do MeasurementSegmentCache"""
+
+    def test_query_filters_and_sorts(self):
+        """Teste: só o período pedido, em ordem decrescente"""
+        df = run_query(MeasurementSegmentCache(), FakeBackend(), "2025-01-02T06:00:00Z", "2025-01-03T00:00:00Z")
+
+        assert df["date"].tolist() == list(pd.date_range("2025-01-02 06:00", "2025-01-03", freq="6h"))[::-1]
+
+    def test_only_missing_days_are_fetched(self):
+        """Teste: dias já guardados não voltam ao backend"""
+        cache = MeasurementSegmentCache()
+        backend = FakeBackend()
+        run_query(cache, backend, "2025-01-03", "2025-01-04T23:00:00")
+        backend.calls.clear()
+
+        df = run_query(cache, backend, "2025-01-01", "2025-01-06T23:00:00")
+
+        assert sorted(backend.calls) == [
+            ("2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z"),
+            ("2025-01-02T00:00:00Z", "2025-01-03T00:00:00Z"),
+            ("2025-01-05T00:00:00Z", "2025-01-06T00:00:00Z"),
+            ("2025-01-06T00:00:00Z", "2025-01-07T00:00:00Z"),
+        ]
+        assert len(df) == 24
+        assert df["id"].is_unique
+        settled = cache.cache_stats()["by_key"]["dias assentados"]
+        assert (settled["hits"], settled["misses"], settled["entries"]) == (2, 6, 6)
+
+    def test_settled_days_never_expire(self):
+        """Teste: dia antigo segue valendo mesmo com refresh zerado"""
+        cache = MeasurementSegmentCache(refresh_seconds=0)
+        backend = FakeBackend()
+        run_query(cache, backend, "2025-01-01", "2025-01-01T23:00:00")
+        run_query(cache, backend, "2025-01-01", "2025-01-01T23:00:00")
+
+        assert len(backend.calls) == 1
+        assert cache.stats()["settled"] == 1
+
+    def test_recent_day_is_refreshed(self):
+        """Teste: o dia corrente é buscado de novo depois do refresh"""
+        today = pd.Timestamp(datetime.utcnow()).floor("D")
+        recent = pd.DataFrame({"id": [1], "date": [today], "stationId": 1, "sensorId": 10, "moisture": 30.0})
+        backend = FakeBackend(recent)
+
+        fresh = MeasurementSegmentCache(refresh_seconds=60)
+        run_query(fresh, backend, today, today + timedelta(hours=1))
+        run_query(fresh, backend, today, today + timedelta(hours=1))
+        assert len(backend.calls) == 1
+
+        stale = MeasurementSegmentCache(refresh_seconds=0)
+        run_query(stale, backend, today, today + timedelta(hours=1))
+        run_query(stale, backend, today, today + timedelta(hours=1))
+        assert len(backend.calls) == 3
+        assert stale.stats()["settled"] == 0
+
+    def test_failure_is_not_cached(self):
+        """Teste: falha propaga PageFetchError e nada é guardado"""
+        cache = MeasurementSegmentCache()
+
+        with pytest.raises(api.PageFetchError):
+            run_query(cache, FakeBackend(fail=True), "2025-01-01", "2025-01-02")
+
+        assert cache.stats()["buckets"] == 0
+
+    def test_unscoped_token_is_not_cached(self):
+        """Teste: token sem escopo consulta o backend direto"""
+        cache = MeasurementSegmentCache()
+        backend = FakeBackend()
+        run_query(cache, backend, "2025-01-01", "2025-01-01T23:00:00", scope=None)
+        run_query(cache, backend, "2025-01-01", "2025-01-01T23:00:00", scope=None)
+
+        assert len(backend.calls) == 2
+        assert cache.stats()["buckets"] == 0
+
+    def test_byte_limit_evicts_least_recent(self):
+        """Teste: acima do limite de bytes sai o dia menos usado"""
+        day_size = int(decode_measurements(as_body(HISTORY.iloc[:4])).memory_usage(deep=True).sum())
+        cache = MeasurementSegmentCache(max_bytes=day_size * 2)
+        backend = FakeBackend()
+        for day in ("01", "02", "03"):
+            run_query(cache, backend, f"2025-01-{day}", f"2025-01-{day}T23:00:00")
+
+        assert cache.stats()["buckets"] == 2
+        assert cache.cache_stats()["evictions"] == 1
+        backend.calls.clear()
+        run_query(cache, backend, "2025-01-01", "2025-01-01T23:00:00")
+        assert len(backend.calls) == 1
+
+
+class TestPrefetch:
+    """Testes da carga antecipada do período"""
+
+    def test_prefetch_fills_cache(self):
+        """Teste: prefetch guarda os dias que faltam; a consulta seguinte não vai ao backend"""
+        cache = MeasurementSegmentCache()
+        backend = FakeBackend()
+        with patch('api.api_request_quiet', side_effect=backend), \
+                patch('api.token_scope', return_value="admin"):
+            assert cache.prefetch("tok", "2025-01-01", "2025-01-05T23:00:00", station_id=1) is None
+        backend.calls.clear()
+
+        df = run_query(cache, backend, "2025-01-02", "2025-01-04T23:00:00")
+        assert backend.calls == []
+        assert len(df) == 12
+
+    def test_background_prefetch_runs_once_per_range(self):
+        """Teste: uma carga por período em andamento; falha não escapa da thread"""
+        cache = MeasurementSegmentCache()
+        release = threading.Event()
+
+        def slow_failure(method, endpoint, **kwargs):
+            release.wait(timeout=5)
+            return None, "Erro de conexão com a API: reset"
+
+        with patch('api.api_request_quiet', side_effect=slow_failure), \
+                patch('api.token_scope', return_value="admin"):
+            thread = cache.prefetch_in_background("tok", "2025-01-01", "2025-01-02", station_id=1)
+            assert cache.prefetch_in_background("tok", "2025-01-01", "2025-01-02", station_id=1) is None
+            release.set()
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert cache.stats()["buckets"] == 0
+        assert cache._prefetching == set()
+
+    def test_background_prefetch_needs_scope(self):
+        """Teste: token sem escopo não dispara carga (nada seria guardado)"""
+        with patch('api.token_scope', return_value=None):
+            assert MeasurementSegmentCache().prefetch_in_background("tok", "2025-01-01", "2025-01-02") is None
+
+
+class TestMeasurementStore:
+    """Testes da camada em disco (src/measurement_store.py)"""
+
+    def test_roundtrip_keeps_dtypes(self, tmp_path):
+        """Teste: colunas e tipos iguais após gravar e ler"""
+        store = MeasurementStore(str(tmp_path / "m.db"))
+        key = (("url", ()), 1, None, pd.Timestamp("2025-01-01"))
+        day = HISTORY.iloc[:4].astype({"stationId": "int32"})
+        store.put(key, day)
+
+        pd.testing.assert_frame_equal(store.get(key), day.reset_index(drop=True))
+
+    def test_settled_days_survive_restart(self, tmp_path):
+        """Teste: novo processo (cache vazio) lê os dias do disco, sem backend"""
+        path = str(tmp_path / "m.db")
+        backend = FakeBackend()
+        first = run_query(MeasurementSegmentCache(store=MeasurementStore(path)), backend,
+                          "2025-01-01", "2025-01-05T23:00:00")
+        backend.calls.clear()
+
+        again = run_query(MeasurementSegmentCache(store=MeasurementStore(path)), backend,
+                          "2025-01-01", "2025-01-05T23:00:00")
+
+        assert backend.calls == []
+        pd.testing.assert_frame_equal(again, first)
+
+    def test_recent_days_stay_in_memory(self, tmp_path):
+        """Teste: dias ainda não assentados não vão para o disco"""
+        today = pd.Timestamp(datetime.utcnow()).floor("D")
+        recent = pd.DataFrame({"id": [1], "date": [today], "stationId": 1, "sensorId": 10, "moisture": 30.0})
+        store = MeasurementStore(str(tmp_path / "m.db"))
+        run_query(MeasurementSegmentCache(store=store), FakeBackend(recent), today, today + timedelta(hours=1))
+
+        assert store.stats()["segments"] == 0
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        """Teste: acima do limite sai o dia usado há mais tempo"""
+        store = MeasurementStore(str(tmp_path / "m.db"))
+        keys = [(("url", ()), 1, None, pd.Timestamp(f"2025-01-0{d}")) for d in (1, 2, 3)]
+        store.put(keys[0], HISTORY.iloc[:4])
+        store.max_bytes = store.stats()["bytes"] * 2
+        store.put(keys[1], HISTORY.iloc[4:8])
+        store.get(keys[0])
+        store.put(keys[2], HISTORY.iloc[8:12])
+
+        assert store.get(keys[1]) is None
+        assert store.get(keys[0]) is not None
+        assert store.stats()["segments"] == 2
+        stats = store.cache_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1, 2)
+
+    def test_object_columns_are_not_stored(self, tmp_path):
+        """Teste: formato fora do schema fica só em memória (sem pickle)"""
+        store = MeasurementStore(str(tmp_path / "m.db"))
+        key = (("url", ()), 1, None, pd.Timestamp("2025-01-01"))
+        store.put(key, HISTORY.iloc[:4].assign(extra="x"))
+
+        assert store.get(key) is None
@@ -0,0 +1,116 @@
+"""
+Testes unitários para src/measurement_decoder.py
+- Caminho colunar (JSON -> colunas tipadas sem dict por linha)
+- Queda para o caminho genérico com o mesmo resultado
+- Datas datetime64 no fuso local até a exibição (measurements.format_measurements)
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import measurement_decoder
+from src.measurement_decoder import decode_measurements
+
+
+def make_record(i, conductivity=1.25):
+    return {
+        "id": i,
+        "date": f"2025-01-01T00:00:{i % 60:02d}",
+        "stationId": 1,
+        "sensorId": 10 + i % 3,
+        "batteryVoltage": 3.7,
+        "boardTemperature": 25.5,
+        "sensorTemperature": 21.0,
+        "sampleTemperature": 20.5,
+        "moisture": 31.2,
+        "salinity": 0.45,
+        "conductivity": conductivity,
+    }
+
+
+RECORDS = [make_record(1), make_record(2, None), make_record(3, 0.1)]
+
+
+class TestMeasurementDecoder:
+    """Testes do decodificador de listas de Measurement"""
+
+    def test_schema_dtypes(self):
+        """Teste: colunas tipadas conforme o schema Measurement"""
+        df = decode_measurements(json.dumps(RECORDS).encode())
+
+        assert list(df.columns) == list(RECORDS[0])
+        assert df["id"].dtype == np.int64
+        assert df["date"].dtype == "datetime64[ns]"
+        assert df["stationId"].dtype == np.int32
+        assert df["sensorId"].dtype == np.int32
+        assert df["moisture"].dtype == np.float64
+        assert df["conductivity"].isna().tolist() == [False, True, False]
+
+    @pytest.mark.parametrize("separators", [(", ", ": "), (",", ":")])
+    def test_columnar_path_matches_generic(self, separators):
+        """Teste: corpo compacto ou com espaços passa pelo caminho rápido"""
+        body = json.dumps(RECORDS, separators=separators).encode()
+
+        columnar = measurement_decoder._decode_columnar(body)
+
+        assert columnar is not None
+        pd.testing.assert_frame_equal(columnar, measurement_decoder._decode_generic(body))
+
+    @pytest.mark.parametrize("body", [
+        json.dumps(RECORDS, indent=2),
+        json.dumps([RECORDS[0], dict(reversed(list(RECORDS[1].items())))]),
+        json.dumps(RECORDS + [{**make_record(4), "extra": "}, {"}]),
+        json.dumps([make_record(1), {**make_record(2), "stationId": None}]),
+        json.dumps([{**make_record(1), "sensorId": 2 ** 40}]),
+        json.dumps([make_record(1)]).replace("T00:", "\\u005400:", 1),
+    ])
+    def test_unusual_bodies_fall_back(self, body):
+        """Teste: formato fora do esperado tem o mesmo resultado do json()"""
+        df = decode_measurements(body.encode())
+        expected = pd.DataFrame(json.loads(body))
+
+        assert len(df) == len(expected)
+        assert list(df.columns) == list(expected.columns)
+        assert df["id"].tolist() == expected["id"].tolist()
+        assert df["sensorId"].tolist() == expected["sensorId"].tolist()
+
+    def test_empty_list(self):
+        """Teste: lista vazia vira DataFrame vazio"""
+        assert decode_measurements(b"[]").empty
+
+    def test_invalid_json_raises(self):
+        """Teste: corpo inválido gera ValueError, como response.json()"""
+        with pytest.raises(ValueError):
+            decode_measurements(b'[{"id": 1,')
+
+
+class TestFormatMeasurements:
+    """Testes da preparação para exibição (src/measurements.py)"""
+
+    def test_dates_stay_datetime_in_local_timezone(self):
+        """Teste: Data continua datetime64 com fuso, convertida de UTC"""
+        from src.measurements import format_measurements
+
+        df = format_measurements(decode_measurements(json.dumps(RECORDS).encode()))
+
+        assert str(df["Data"].dtype) == "datetime64[ns, America/Sao_Paulo]"
+        assert df["Data"].iloc[0] == pd.Timestamp("2025-01-01T00:00:01Z")
+        assert df["Data"].iloc[0].hour == 21
+        assert "Umidade" in df.columns
+
+    def test_grid_formats_only_datetime_columns(self):
+        """Teste: column_config de data só para colunas datetime64"""
+        from src.measurements import GRID_DATETIME_FORMAT, datetime_column_config, format_measurements
+
+        df = format_measurements(decode_measurements(json.dumps(RECORDS).encode()))
+        config = datetime_column_config(df)
+
+        assert list(config) == ["Data"]
+        assert config["Data"]["type_config"]["format"] == GRID_DATETIME_FORMAT
@@ -0,0 +1,126 @@
+"""
+Testes unitários para a carga em lote de medições (src/measurement_loader.py)
+- Fatias de tempo em paralelo, com limite de simultaneidade
+- Fatias com a página cheia divididas de novo (ou paginadas)
+- Resultado completo, sem repetições e em ordem decrescente
+"""
+from datetime import timedelta
+from unittest.mock import Mock, patch
+import threading
+import time
+
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import api
+from src.measurement_loader import load_measurements
+
+# Uma medição por hora em janeiro de 2025, com um pico de 30 no dia 10 às 12h
+HISTORY = pd.concat([
+    pd.DataFrame({"date": pd.date_range("2025-01-01", "2025-01-31 23:00", freq="h")}),
+    pd.DataFrame({"date": [pd.Timestamp("2025-01-10 12:00")] * 30}),
+], ignore_index=True).sort_values("date", kind="stable").reset_index(drop=True)
+HISTORY.insert(0, "id", range(len(HISTORY)))
+HISTORY["stationId"] = 1
+HISTORY["sensorId"] = 10
+HISTORY["moisture"] = 30.0
+
+
+class FakeBackend:
+    """api_request_quiet falso: período inclusivo, sort desc e page/pageSize."""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, method, endpoint, token=None, params=None, **kwargs):
+        with self.lock:
+            self.calls.append((params["startDate"], params["endDate"], params["page"]))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if params["startDate"] == self.fail_on:
+                return None, "Erro HTTP ao chamar a API: 503 Server Error"
+            start = pd.Timestamp(params["startDate"]).tz_localize(None)
+            end = pd.Timestamp(params["endDate"]).tz_localize(None)
+            dates = HISTORY["date"]
+            rows = HISTORY[(dates >= start) & (dates <= end)].iloc[::-1]
+            size = params["pageSize"]
+            page = rows.iloc[(params["page"] - 1) * size:params["page"] * size]
+            return Mock(content=page.to_json(orient="records", date_format="iso").encode()), None
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def load(backend, start, end, **kwargs):
+    with patch('api.api_request_quiet', side_effect=backend):
+        return load_measurements("tok", [(pd.Timestamp(start), pd.Timestamp(end))], station_id=1, **kwargs)
+
+
+def expected(start, end):
+    dates = HISTORY["date"]
+    rows = HISTORY[(dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end))]
+    return sorted(rows["id"])
+
+
+class TestMeasurementLoader:
+    """Testes do load_measurements"""
+
+    def test_slices_cover_range_without_duplicates(self):
+        """Teste: uma fatia por dia, bordas sem repetição, ordem decrescente"""
+        backend = FakeBackend()
+        df = load(backend, "2025-01-01", "2025-01-05", slice_span=timedelta(days=1), page_size=1000)
+
+        assert [call[:2] for call in sorted(backend.calls)] == [
+            (f"2025-01-0{d}T00:00:00Z", f"2025-01-0{d + 1}T00:00:00Z") for d in range(1, 5)
+        ]
+        assert sorted(df["id"]) == expected("2025-01-01", "2025-01-05")
+        assert df["id"].is_unique
+        assert df["date"].is_monotonic_decreasing
+
+    def test_concurrency_cap(self):
+        """Teste: no máximo max_workers fatias ao mesmo tempo"""
+        backend = FakeBackend(delay=0.02)
+        load(backend, "2025-01-01", "2025-01-11", slice_span=timedelta(days=1), max_workers=3)
+
+        assert len(backend.calls) == 10
+        assert backend.peak == 3
+
+    def test_full_page_is_split(self):
+        """Teste: fatia que enche a página é dividida até caber"""
+        backend = FakeBackend()
+        df = load(backend, "2025-01-01", "2025-01-03", slice_span=timedelta(days=2), page_size=20)
+
+        assert sorted(df["id"]) == expected("2025-01-01", "2025-01-03")
+        assert df["date"].is_monotonic_decreasing
+        assert ("2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z", 1) in backend.calls
+
+    def test_minimum_slice_is_paginated(self):
+        """Teste: abaixo da fatia mínima a página cheia é paginada"""
+        backend = FakeBackend()
+        df = load(backend, "2025-01-10 12:00", "2025-01-10 12:01", page_size=8)
+
+        assert sorted(df["id"]) == expected("2025-01-10 12:00", "2025-01-10 12:01")
+        assert [call[2] for call in sorted(backend.calls)] == [1, 2, 3, 4]  # 31 medições
+
+    def test_failure_raises(self):
+        """Teste: fatia que falha levanta PageFetchError com o motivo do backend"""
+        backend = FakeBackend(fail_on="2025-01-02T00:00:00Z")
+
+        with pytest.raises(api.PageFetchError, match="503 Server Error"):
+            load(backend, "2025-01-01", "2025-01-04", slice_span=timedelta(days=1))
+
+    def test_empty_range(self):
+        """Teste: período sem medições vira DataFrame vazio"""
+        assert load(FakeBackend(), "2024-01-01", "2024-01-03").empty
@@ -0,0 +1,219 @@
+"""
+Testes unitários para a paginação de medições da sessão (src/measurements.py)
+- "Carregar Mais" sem paginação na sessão refaz a paginação com os filtros aplicados
+- Páginas do cache por dia montadas sob demanda, com só o cursor na sessão
+"""
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import api
+from src import measurements
+
+# Três medições (sensores 10, 11 e 12) a cada hora de 1 a 3 de janeiro de 2025
+HOURS = pd.date_range("2025-01-01", "2025-01-03 23:00", freq="h")
+HISTORY = pd.DataFrame({
+    "id": range(3 * len(HOURS)),
+    "date": HOURS.repeat(3),
+    "stationId": 1,
+    "sensorId": [10, 11, 12] * len(HOURS),
+    "moisture": 30.0,
+}).iloc[::-1].reset_index(drop=True)
+
+
+class SessionState(dict):
+    """st.session_state falso: acesso por chave e por atributo."""
+
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+def session(**values):
+    return SessionState({"token": "tok", "page": 1, "measurement_pages": None, **values})
+
+
+class FakeCache:
+    """measurement_cache falso: HISTORY no período, decrescente; registra as janelas."""
+
+    def __init__(self, history=HISTORY, fail=False):
+        self.history = history
+        self.fail = fail
+        self.windows = []
+        self.prefetched = []
+
+    def prefetch_in_background(self, token, start, end, station_id=None, sensor_id=None):
+        self.prefetched.append((start, end, station_id, sensor_id))
+
+    def query(self, token, start, end, station_id=None, sensor_id=None):
+        start, end = measurements.to_utc(start), measurements.to_utc(end)
+        self.windows.append((start, end))
+        if self.fail:
+            raise api.PageFetchError("fora do ar")
+        dates = self.history["date"]
+        return self.history[(dates >= start) & (dates <= end)].reset_index(drop=True)
+
+
+class ReshuffledCache(FakeCache):
+    """Cada consulta devolve os empates de data em outra ordem; opcionalmente some com ids."""
+
+    def __init__(self, history=HISTORY, drop_after_first=()):
+        super().__init__(history)
+        self.drop_after_first = set(drop_after_first)
+
+    def query(self, token, start, end, station_id=None, sensor_id=None):
+        df = super().query(token, start, end, station_id, sensor_id)
+        if len(self.windows) > 1:
+            df = df[~df["id"].isin(self.drop_after_first)]
+        return df.sample(frac=1, random_state=len(self.windows)).reset_index(drop=True)
+
+
+def cached_pages(cache, start="2025-01-01", end="2025-01-03 23:00", page_size=15):
+    pages = measurements.CachedMeasurementPages("tok", start, end, station_id=1, page_size=page_size)
+    with patch.object(measurements, 'measurement_cache', cache):
+        return pages, list(pages)
+
+
+class TestCachedMeasurementPages:
+    """Testes do CachedMeasurementPages"""
+
+    def test_pages_cover_range_once(self):
+        """Teste: páginas em ordem decrescente, sem repetir nem pular medições com a mesma data"""
+        _, pages = cached_pages(FakeCache(), page_size=7)
+
+        ids = pd.concat(pages)["ID"].tolist()
+        assert ids == HISTORY["id"].tolist()
+        assert all(len(page) == 7 for page in pages[:-1])
+        assert str(pages[0]["Data"].dt.tz) == measurements.LOCAL_TIMEZONE
+
+    def test_refetched_ties_neither_repeat_nor_skip(self):
+        """Teste: empates de data que voltam em outra ordem não repetem nem pulam medições"""
+        _, pages = cached_pages(ReshuffledCache(), page_size=7)
+
+        assert pd.concat(pages)["ID"].tolist() == HISTORY["id"].tolist()
+
+    def test_refetched_ties_with_fewer_rows(self):
+        """Teste: empate que volta com menos medições não faz pular as seguintes"""
+        # 1ª página (7) termina no meio da hora 2025-01-03 21:00; some um id já entregue
+        delivered = HISTORY["id"].iloc[0]
+        _, pages = cached_pages(ReshuffledCache(drop_after_first=[delivered]), page_size=7)
+
+        assert pd.concat(pages)["ID"].tolist() == HISTORY["id"].tolist()
+
+    def test_first_page_reads_one_window(self):
+        """Teste: a primeira página consulta só a janela mais recente, não o período"""
+        cache = FakeCache()
+        pages = measurements.CachedMeasurementPages("tok", "2024-10-04", "2025-01-03 23:00", station_id=1)
+        with patch.object(measurements, 'measurement_cache', cache):
+            first = next(pages)
+
+        assert len(first) == 15
+        assert cache.windows == [(pd.Timestamp("2025-01-02 23:00"), pd.Timestamp("2025-01-03 23:00"))]
+
+    def test_sparse_range_widens_window(self):
+        """Teste: janela dobra até encher a página ou chegar ao início"""
+        cache = FakeCache(HISTORY[HISTORY["date"] < "2025-01-01 02:00"])
+        _, pages = cached_pages(cache, end="2025-01-08")
+
+        assert [len(page) for page in pages] == [6]
+        assert [end - start for start, end in cache.windows] == [
+            pd.Timedelta(days=1), pd.Timedelta(days=2), pd.Timedelta(days=4), pd.Timedelta(days=7),
+        ]
+
+    def test_session_keeps_only_the_cursor(self):
+        """Teste: nenhum DataFrame fica no objeto guardado na sessão"""
+        pages, _ = cached_pages(FakeCache())
+
+        assert not any(isinstance(value, pd.DataFrame) for value in vars(pages).values())
+        assert pages.done
+
+    def test_failure_shows_error_and_ends(self):
+        """Teste: dia que não pôde ser buscado exibe o erro e encerra as páginas"""
+        with patch.object(measurements, 'st') as mock_st:
+            _, pages = cached_pages(FakeCache(fail=True))
+
+        assert pages == []
+        mock_st.error.assert_called_once()
+
+
+class TestLoadMore:
+    """Testes do load_more"""
+
+    def test_fallback_keeps_applied_filters(self):
+        """Teste: sem paginação na sessão, o período filtrado continua valendo"""
+        state = session(
+            page=3,
+            estacao_id=1,
+            sensor_id=None,
+            measurement_filters={
+                "start_date": "2025-01-01T00:00:00Z",
+                "end_date": "2025-01-02T00:00:00Z",
+                "station_id": 1,
+                "sensor_id": 10,
+            },
+        )
+        page = pd.DataFrame({"Umidade": [30.0]})
+        with patch.object(measurements, 'st', Mock(session_state=state)), \
+                patch.object(measurements, 'paginate', return_value=iter([page])) as mock_paginate, \
+                patch.object(measurements, 'session_frames') as frames:
+            measurements.load_more()
+
+        params = mock_paginate.call_args[0][1]
+        assert params["startDate"] == "2025-01-01T00:00:00Z"
+        assert params["endDate"] == "2025-01-02T00:00:00Z"
+        assert (params["stationId"], params["sensorId"]) == (1, 10)
+        assert mock_paginate.call_args[1]["start_page"] == 4
+        frames.append.assert_called_once_with("data", page)
+
+    def test_fallback_without_filters_uses_station(self):
+        """Teste: sem filtros aplicados, estação e sensor da tela"""
+        state = session(estacao_id=2, sensor_id=20, measurement_filters=None)
+        with patch.object(measurements, 'st', Mock(session_state=state)), \
+                patch.object(measurements, 'paginate', return_value=iter([])) as mock_paginate, \
+                patch.object(measurements, 'session_frames'):
+            measurements.load_more()
+
+        params = mock_paginate.call_args[0][1]
+        assert (params["stationId"], params["sensorId"]) == (2, 20)
+        assert "startDate" not in params
+
+    def test_open_uses_cache_only_with_scope(self):
+        """Teste: período curto com token com escopo pagina pelo cache; sem escopo, pelo backend"""
+        filters = {"start_date": "2025-01-01T00:00:00Z", "end_date": "2025-01-03T00:00:00Z", "station_id": 1}
+        for scope, expected in (("admin", measurements.CachedMeasurementPages), (None, type(iter([])))):
+            state = session()
+            with patch.object(measurements, 'st', Mock(session_state=state)), \
+                    patch.object(measurements, 'token_scope', return_value=scope), \
+                    patch.object(measurements, 'measurement_cache', FakeCache()), \
+                    patch.object(measurements, 'paginate', return_value=iter([])):
+                measurements.open_measurement_pages(**filters)
+
+            assert type(state.measurement_pages) is expected
+
+    def test_open_prefetches_rest_of_range(self):
+        """Teste: a 1ª página sai da janela mais recente e o resto do período carrega em segundo plano"""
+        cache = FakeCache()
+        state = session()
+        with patch.object(measurements, 'st', Mock(session_state=state)), \
+                patch.object(measurements, 'token_scope', return_value="admin"), \
+                patch.object(measurements, 'measurement_cache', cache):
+            first = measurements.open_measurement_pages(
+                start_date="2024-10-04T00:00:00Z", end_date="2025-01-03T23:00:00Z", station_id=1,
+            )
+
+        assert len(first) == 15
+        assert len(cache.windows) == 1
+        assert cache.prefetched == [("2024-10-04T00:00:00Z", "2025-01-03T23:00:00Z", 1, None)]
+
+    def test_open_saves_filters(self):
+        """Teste: open_measurement_pages guarda os filtros na sessão"""
+        state = session()
+        with patch.object(measurements, 'st', Mock(session_state=state)), \
+                patch.object(measurements, 'paginate', return_value=iter([])):
+            measurements.open_measurement_pages(station_id=1, sensor_id=None)
+
+        assert state.measurement_filters == {"station_id": 1, "sensor_id": None}
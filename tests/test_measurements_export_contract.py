@@ -1,6 +1,8 @@
 """
 Testes unitários/contratuais para o endpoint GET /api/measurements/export
 Seguindo especificação Swagger com parâmetros exatos e tipos corretos
+- Recebimento em streaming para arquivo temporário (spool_export)
+- Excel local gerado a pedido e memoizado (cached_excel)
 """
 import pytest
 from unittest.mock import Mock, patch
@@ -8,11 +10,19 @@ import pandas as pd
 from datetime import datetime
 import sys
 import os
+import zipfile
+import gzip
+import io
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from measurements import export_measurements_csv
+from measurements import cached_excel, export_measurements_csv, export_to_excel, spool_export
+from requests.exceptions import ChunkedEncodingError
+from urllib3.response import HTTPResponse
+import requests
+
+import api
 
 
 class TestMeasurementsExportContract:
@@ -117,4 +127,143 @@ class TestMeasurementsExportContract:
         """Teste: Parâmetros inválidos"""
         # Teste sem token obrigatório
         with pytest.raises(TypeError):
-            export_measurements_csv()
\ No newline at end of file
+            export_measurements_csv()
+
+
+def streamed(chunks, headers=None):
+    """Resposta stream=True falsa: corpo em blocos."""
+    response = Mock()
+    response.status_code = 200
+    response.url = "http://api.test/api/measurements/export"
+    response.headers = headers or {}
+    response.iter_content = Mock(side_effect=lambda chunk_size: iter(chunks))
+    return response
+
+
+class TestExportStreaming:
+    """Testes do recebimento do CSV em blocos (spool_export)"""
+
+    @patch('measurements.api_request')
+    def test_export_can_stream(self, mock_api_request):
+        """Teste: stream=True chega ao api_request"""
+        export_measurements_csv('test_token', stream=True)
+
+        assert mock_api_request.call_args[1]["stream"] is True
+
+    def test_spool_keeps_small_export_in_memory(self):
+        """Teste: abaixo do limite o arquivo não vai para o disco"""
+        response = streamed([b"a,b\n", b"1,2\n"])
+        spool, received = spool_export(response, max_memory=1024)
+
+        with spool:
+            assert spool.read() == b"a,b\n1,2\n"
+            assert not spool._rolled
+        assert received == 8
+        response.close.assert_called_once()
+
+    def test_spool_rolls_to_disk_with_progress(self):
+        """Teste: acima do limite o arquivo vai para o disco; progresso a cada bloco"""
+        chunks = [b"x" * 100] * 5
+        progress = Mock()
+        response = streamed(chunks, headers={"Content-Length": "500"})
+        spool, received = spool_export(response, progress=progress, max_memory=250)
+
+        with spool:
+            assert spool._rolled
+            assert spool.read() == b"".join(chunks)
+        assert received == 500
+        assert [c.args for c in progress.call_args_list] == [(n * 100, 500) for n in range(1, 6)]
+
+    def test_compressed_length_is_not_total(self):
+        """Teste: com Content-Encoding o total fica desconhecido"""
+        progress = Mock()
+        response = streamed([b"abc"], headers={"Content-Length": "2", "Content-Encoding": "gzip"})
+        spool_export(response, progress=progress)[0].close()
+
+        progress.assert_called_once_with(3, None)
+
+    def test_interrupted_stream_closes_response(self):
+        """Teste: falha no meio do corpo propaga o erro e fecha a resposta"""
+        def broken():
+            yield b"a,b\n"
+            raise ChunkedEncodingError("conexão interrompida")
+
+        response = streamed([])
+        response.iter_content = Mock(return_value=broken())
+
+        with pytest.raises(ChunkedEncodingError):
+            spool_export(response)
+        response.close.assert_called_once()
+
+    def test_spool_records_transfer(self):
+        """Teste: bytes da rede (gzip) e recebidos do export entram nas estatísticas"""
+        body = b"id,date,moisture\n" + b"".join(b"%d,2025-01-01T00:00:00Z,30.0\n" % i for i in range(2000))
+        wire = gzip.compress(body)
+        response = requests.Response()
+        response.status_code = 200
+        response.url = "http://api.test/api/measurements/export?sort=desc"
+        response.headers.update({"Content-Encoding": "gzip"})
+        response.raw = HTTPResponse(
+            body=io.BytesIO(wire), headers={"Content-Encoding": "gzip"},
+            preload_content=False, decode_content=True,
+        )
+        api.reset_client_stats()
+
+        spool, received = spool_export(response, chunk_size=1024)
+        spool.close()
+
+        stats = api.get_transfer_stats()["measurements"]
+        assert received == stats["decoded_bytes"] == len(body)
+        assert stats["wire_bytes"] == len(wire)
+        assert stats["responses"] == 1
+
+
+def sheet_xml(excel_data):
+    return zipfile.ZipFile(io.BytesIO(excel_data)).read("xl/worksheets/sheet1.xml").decode()
+
+
+class TestExcelExport:
+    """Testes do Excel local (export_to_excel / cached_excel)"""
+
+    def setup_method(self):
+        self.data = pd.DataFrame({
+            "Data": pd.to_datetime(["2025-01-01 10:00", "2025-01-01 11:00"]).tz_localize("America/Sao_Paulo"),
+            "Umidade (%)": [30.5, None],
+            "Sensor": ["A", "B"],
+        })
+
+    def test_workbook_has_every_cell(self):
+        """Teste: escrita linha a linha no modo constant_memory não perde células"""
+        pytest.importorskip("xlsxwriter")
+        xml = sheet_xml(export_to_excel(self.data, ["Sensor", "Umidade (%)", "Data"]))
+
+        assert '<c r="A3" t="inlineStr"><is><t>B</t></is></c>' in xml
+        assert '<c r="B2"><v>30.5</v></c>' in xml
+        assert 'r="B3"' not in xml  # NaN vira célula vazia
+        assert '<c r="C2" s="2"><v>45658.41666666666' in xml  # horário local, célula de data
+
+    @patch('measurements.export_to_excel', return_value=b"xlsx")
+    def test_built_only_on_request(self, mock_export):
+        """Teste: sem pedido não gera; o pedido gera uma vez e os reruns reaproveitam"""
+        with patch('measurements.st') as mock_st:
+            mock_st.session_state = {}
+            assert cached_excel(self.data, ["Sensor"]) is None
+            assert cached_excel(self.data, ["Sensor"], build=True) == b"xlsx"
+            assert cached_excel(self.data.copy(), ["Sensor"]) == b"xlsx"
+
+        mock_export.assert_called_once()
+
+    @patch('measurements.export_to_excel', return_value=b"xlsx")
+    def test_new_data_or_columns_drop_workbook(self, mock_export):
+        """Teste: dados ou colunas diferentes descartam o workbook guardado"""
+        more = pd.concat([self.data, self.data], ignore_index=True)
+        with patch('measurements.st') as mock_st:
+            mock_st.session_state = {}
+            cached_excel(self.data, ["Sensor"], build=True)
+            assert cached_excel(self.data, ["Sensor", "Data"]) is None
+            assert mock_st.session_state == {}
+
+            cached_excel(self.data, ["Sensor"], build=True)
+            assert cached_excel(more, ["Sensor"]) is None
+
+        assert mock_export.call_count == 2
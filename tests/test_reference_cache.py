@@ -0,0 +1,347 @@
+"""
+Testes unitários para o cache de dados de referência (src/ui_components.py)
+- Compartilhamento entre sessões pelo escopo do token
+- Invalidação por tag após mutations (CacheManager)
+- Stale-while-revalidate dos snapshots do Dashboard (SnapshotCache)
+- Pré-carga da topologia após o login (src/warmup.py)
+"""
+from unittest.mock import Mock, patch
+import threading
+import time
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import warmup
+from src.ui_components import CacheManager, ReferenceCache, SnapshotCache, cache_tag, format_age
+
+STATIONS = [{"id": 1, "name": "Estação 1"}]
+
+
+def scopes(mapping):
+    """token_scope falso: token -> escopo (None = não aceito)."""
+    return patch('api.token_scope', side_effect=lambda token: mapping.get(token))
+
+
+class TestReferenceCache:
+    """Testes do ReferenceCache"""
+
+    def test_tokens_with_same_scope_share_entry(self):
+        """Teste: outro token do mesmo escopo não busca de novo"""
+        cache = ReferenceCache()
+        loader = Mock(return_value=STATIONS)
+
+        with scopes({"token-a": "admin", "token-b": "admin"}):
+            assert cache.get("token-a", "stations", loader) == STATIONS
+            assert cache.get("token-b", "stations", loader) == STATIONS
+
+        loader.assert_called_once_with("token-a")
+        assert len(cache) == 1
+
+    def test_scopes_are_isolated(self):
+        """Teste: escopos diferentes não enxergam a entrada um do outro"""
+        cache = ReferenceCache()
+        loader = Mock(side_effect=lambda token: [{"id": token}])
+
+        with scopes({"token-a": "admin", "token-b": "operador"}):
+            cache.get("token-a", "stations", loader)
+            assert cache.get("token-b", "stations", loader) == [{"id": "token-b"}]
+
+        assert loader.call_count == 2
+
+    def test_unscoped_token_always_fetches(self):
+        """Teste: token sem escopo busca com o próprio token e não grava"""
+        cache = ReferenceCache()
+        loader = Mock(return_value=STATIONS)
+
+        with scopes({}):
+            cache.get("token-x", "stations", loader)
+            cache.get("token-x", "stations", loader)
+
+        assert loader.call_count == 2
+        assert len(cache) == 0
+
+    def test_expired_entry_is_reloaded(self):
+        """Teste: entrada vencida é buscada de novo"""
+        cache = ReferenceCache(ttl=0)
+        loader = Mock(return_value=STATIONS)
+
+        with scopes({"token-a": "admin"}):
+            cache.get("token-a", "stations", loader)
+            cache.get("token-a", "stations", loader)
+
+        assert loader.call_count == 2
+
+    def test_empty_result_uses_negative_ttl(self):
+        """Teste: lista vazia fica guardada só pelo negative_ttl"""
+        loader = Mock(return_value=[])
+
+        with scopes({"token-a": "admin"}):
+            cache = ReferenceCache(negative_ttl=60)
+            cache.get("token-a", "stations", loader)
+            assert cache.get("token-a", "stations", loader) == []
+            assert loader.call_count == 1
+
+            expired = ReferenceCache(negative_ttl=0)
+            expired.get("token-a", "stations", loader)
+            expired.get("token-a", "stations", loader)
+            assert loader.call_count == 3
+            assert len(expired) == 0
+
+    def test_failed_fetch_is_not_stored(self):
+        """Teste: None (busca que não aconteceu, ex.: pré-carga) não é guardado"""
+        cache = ReferenceCache()
+        with scopes({"token-a": "admin"}):
+            cache.put("token-a", "stations", None)
+        assert len(cache) == 0
+
+    def test_refresh_bypasses_entry_and_http_negative_cache(self):
+        """Teste: refresh=True busca de novo, fora do cache negativo do cliente"""
+        import api
+
+        cache = ReferenceCache()
+        seen = []
+        loader = Mock(side_effect=lambda token: seen.append(api._bypass_cache.get()) or [])
+
+        with scopes({"token-a": "admin"}):
+            cache.get("token-a", "stations", loader)
+            cache.get("token-a", "stations", loader, refresh=True)
+
+        assert seen == [False, True]
+
+    def test_stats_by_tag_family(self):
+        """Teste: acertos, faltas e remoções contados pela família da tag"""
+        cache = ReferenceCache()
+        loader = Mock(return_value=STATIONS)
+
+        with scopes({"token-a": "admin"}):
+            cache.get("token-a", "stations", loader)
+            cache.get("token-a", "stations", loader)
+            cache.get("token-a", cache_tag("sensors", station=1), loader)
+            cache.invalidate("sensors")
+
+        stats = cache.cache_stats()
+        assert (stats["by_key"]["stations"]["hits"], stats["by_key"]["stations"]["misses"]) == (1, 1)
+        assert stats["by_key"]["sensors"]["evictions"] == 1
+        assert (stats["entries"], stats["by_key"]["stations"]["entries"]) == (1, 1)
+        assert stats["bytes"] > 0
+
+
+class TestTagInvalidation:
+    """Testes da invalidação por tag (CacheManager)"""
+
+    def setup_method(self):
+        self.cache = ReferenceCache()
+        self.manager = CacheManager(self.cache)
+        with scopes({"token-a": "admin", "token-b": "operador"}):
+            for token in ("token-a", "token-b"):
+                for tag in (
+                    cache_tag("stations"),
+                    cache_tag("sensors", station=7),
+                    cache_tag("sensors", station=8),
+                    cache_tag("valves", controller=3),
+                ):
+                    self.cache.get(token, tag, Mock(return_value=STATIONS))
+
+    def tags(self):
+        return sorted({key[1] for key in self.cache._entries})
+
+    def test_tag_format(self):
+        """Teste: ids normalizados como inteiros"""
+        assert cache_tag("sensors", station="7") == "sensors:station=7"
+        assert cache_tag("stations") == "stations"
+
+    def test_child_mutation_evicts_only_its_parent(self):
+        """Teste: sensor alterado na estação 7 não afeta a estação 8"""
+        evicted = self.manager.invalidate_cache("sensors", station=7)
+
+        assert evicted == 2  # um por escopo
+        assert self.tags() == ["sensors:station=8", "stations", "valves:controller=3"]
+
+    def test_family_eviction_without_parent_id(self):
+        """Teste: sem id do pai, toda a família sai"""
+        self.manager.invalidate_cache("sensors")
+
+        assert self.tags() == ["stations", "valves:controller=3"]
+
+    def test_parent_deletion_evicts_dependents(self):
+        """Teste: excluir a estação 7 remove a lista de estações e os sensores dela"""
+        self.manager.invalidate_cache("stations", station=7)
+        self.manager.invalidate_dependent_caches("stations", station=7)
+
+        assert self.tags() == ["sensors:station=8", "valves:controller=3"]
+
+    def test_entry_is_reloaded_after_eviction(self):
+        """Teste: após invalidar, a próxima leitura vai ao backend"""
+        loader = Mock(return_value=[{"id": 9}])
+        self.manager.invalidate_cache("valves", controller=3)
+
+        with scopes({"token-a": "admin"}):
+            assert self.cache.get("token-a", cache_tag("valves", controller=3), loader) == [{"id": 9}]
+
+        loader.assert_called_once()
+
+
+class TestSnapshotCache:
+    """Testes do stale-while-revalidate (SnapshotCache)"""
+
+    def test_snapshot_served_until_max_age(self):
+        """Teste: snapshot guardado volta com a idade; vencido não volta"""
+        cache = SnapshotCache(fresh_for=0, max_age=60)
+        with scopes({"token-a": "admin"}):
+            assert cache.get("token-a", "home") is None
+            cache.put("token-a", "home", {"gateway": True})
+            value, age = cache.get("token-a", "home")
+
+            assert value == {"gateway": True}
+            assert 0 <= age < 1
+            cache.max_age = 0
+            assert cache.get("token-a", "home") is None
+
+    def test_stale_serves_are_counted(self):
+        """Teste: snapshot fresco é acerto, vencido servido é stale, ausente é falta"""
+        cache = SnapshotCache(fresh_for=60, max_age=120)
+        with scopes({"token-a": "admin"}):
+            cache.get("token-a", "home")
+            cache.put("token-a", "home", {"gateway": True})
+            cache.get("token-a", "home")
+            cache.fresh_for = 0
+            cache.get("token-a", "home")
+            cache.age("token-a", "home")
+
+        counts = cache.cache_stats()["by_key"]["home"]
+        assert (counts["hits"], counts["stale"], counts["misses"]) == (1, 1, 1)
+        assert counts["entries"] == 1
+
+    def test_unscoped_token_is_not_stored(self):
+        """Teste: token sem escopo sempre busca (bloqueando)"""
+        cache = SnapshotCache()
+        with scopes({}):
+            cache.put("token-x", "home", {"gateway": True})
+            assert cache.get("token-x", "home") is None
+
+    def test_single_background_refresh(self):
+        """Teste: leituras seguidas disparam uma só atualização, que troca o snapshot"""
+        cache = SnapshotCache()
+        release = threading.Event()
+        done = threading.Event()
+
+        def loader(token):
+            release.wait(1)
+            done.set()
+            return {"gateway": False}
+
+        loader_mock = Mock(side_effect=loader)
+        with scopes({"token-a": "admin"}):
+            cache.put("token-a", "home", {"gateway": True})
+            cache.refresh("token-a", "home", loader_mock)
+            cache.refresh("token-a", "home", loader_mock)
+            assert cache.get("token-a", "home")[0] == {"gateway": True}
+            release.set()
+            assert done.wait(1)
+            for _ in range(100):
+                if cache.get("token-a", "home")[0] == {"gateway": False}:
+                    break
+                time.sleep(0.01)
+
+            assert cache.get("token-a", "home")[0] == {"gateway": False}
+        loader_mock.assert_called_once_with("token-a")
+
+    def test_failed_refresh_keeps_snapshot(self):
+        """Teste: refresh que falha (None) mantém o snapshot anterior"""
+        cache = SnapshotCache()
+        done = threading.Event()
+
+        def loader(token):
+            done.set()
+            return None
+
+        with scopes({"token-a": "admin"}):
+            cache.put("token-a", "home", {"gateway": True})
+            cache.refresh("token-a", "home", loader)
+            assert done.wait(1)
+            time.sleep(0.05)
+
+            assert cache.get("token-a", "home")[0] == {"gateway": True}
+
+    def test_format_age(self):
+        """Teste: marcador de idade legível"""
+        assert format_age(0.2) == "agora"
+        assert format_age(12.7) == "há 12 s"
+        assert format_age(185) == "há 3 min"
+
+
+TOPOLOGY = {
+    "/api/monitoring-stations": [{"id": 1}, {"id": 2}],
+    "/api/controllers": [{"id": 3}],
+    "/api/tariff-schedules/current": {"id": 9, "daytimeTariff": 0.75},
+    "/api/monitoring-stations/1/sensors": [{"id": 10}],
+    "/api/monitoring-stations/2/sensors": [{"id": 20}],
+    "/api/controllers/3/valves": [{"id": 30}],
+}
+
+
+def fake_backend(routes, batches):
+    """api_request_many falso: responde pelas rotas e registra cada lote."""
+    def request_many(calls, show_errors=True):
+        batches.append(sorted(call["endpoint"] for call in calls))
+        responses = []
+        for call in calls:
+            body = routes.get(call["endpoint"])
+            responses.append(None if body is None else Mock(status_code=200, json=Mock(return_value=body)))
+        return responses
+    return patch('api.api_request_many', side_effect=request_many)
+
+
+class TestWarmUp:
+    """Testes da pré-carga da topologia"""
+
+    def setup_method(self):
+        warmup.reference_cache.clear()
+
+    def teardown_method(self):
+        warmup.reference_cache.clear()
+
+    def test_topology_fills_shared_cache(self):
+        """Teste: duas rodadas paralelas preenchem as tags usadas pelos seletores"""
+        batches = []
+        with scopes({"token-a": "admin"}), fake_backend(TOPOLOGY, batches):
+            assert warmup.warm_up_topology("token-a") == 6
+            loader = Mock()
+            cache = warmup.reference_cache
+            assert cache.get("token-a", cache_tag("sensors", station=2), loader) == [{"id": 20}]
+            assert cache.get("token-a", cache_tag("valves", controller=3), loader) == [{"id": 30}]
+            assert cache.get("token-a", cache_tag("tariffs"), loader)["id"] == 9
+
+        loader.assert_not_called()
+        assert batches == [
+            ["/api/controllers", "/api/monitoring-stations", "/api/tariff-schedules/current"],
+            ["/api/controllers/3/valves", "/api/monitoring-stations/1/sensors",
+             "/api/monitoring-stations/2/sensors"],
+        ]
+
+    def test_failures_are_left_for_on_demand_fetch(self):
+        """Teste: o que falhou não entra no cache"""
+        routes = {k: v for k, v in TOPOLOGY.items() if k != "/api/monitoring-stations/2/sensors"}
+        with scopes({"token-a": "admin"}), fake_backend(routes, []):
+            assert warmup.warm_up_topology("token-a") == 5
+
+        assert sorted(key[1] for key in warmup.reference_cache._entries) == [
+            "controllers", "sensors:station=1", "stations", "tariffs", "valves:controller=3",
+        ]
+
+    def test_start_requires_accepted_token(self):
+        """Teste: sem escopo (token não aceito) não há pré-carga"""
+        with scopes({}):
+            assert warmup.start_warm_up("token-x") is None
+
+    def test_start_runs_in_background(self):
+        """Teste: start_warm_up retorna na hora e a thread preenche o cache"""
+        with scopes({"token-a": "admin"}), fake_backend(TOPOLOGY, []):
+            thread = warmup.start_warm_up("token-a")
+            thread.join(2)
+
+        assert not thread.is_alive()
+        assert len(warmup.reference_cache) == 6
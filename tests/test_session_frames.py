@@ -0,0 +1,161 @@
+"""
+Testes unitários para src/session_frames.py
+- Orçamento por sessão e global com despejo LRU para o disco
+- Releitura transparente do que foi para o disco
+- Append em blocos, com a visão contígua montada só na leitura
+"""
+import gc
+import os
+import sys
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.session_frames import SessionFrameStore
+
+
+def frame(rows, value=1.0):
+    return pd.DataFrame({"Umidade": [value] * rows, "ID do Sensor": range(rows)})
+
+
+SIZE = int(frame(1000).memory_usage(deep=True).sum())
+
+
+class TestSessionFrameStore:
+    """Testes do SessionFrameStore"""
+
+    def test_get_set_append(self, tmp_path):
+        """Teste: get vazio, set e append com ignore_index"""
+        store = SessionFrameStore(spill_dir=str(tmp_path))
+        state = {}
+
+        assert store.get("data", state).empty
+        store.set("data", frame(2), state)
+        store.append("data", frame(3, 2.0), state)
+
+        data = store.get("data", state)
+        assert len(data) == 5
+        assert list(data.index) == list(range(5))
+
+    def test_append_stores_blocks_until_read(self, tmp_path):
+        """Teste: append guarda só o bloco novo; o get monta a visão uma vez e a reusa"""
+        store = SessionFrameStore(spill_dir=str(tmp_path))
+        state = {}
+        store.set("data", frame(2), state)
+        store.append("data", frame(3, 2.0), state)
+        store.append("data", frame(4, 3.0), state)
+
+        entry = store.frames(state)._entries["data"]
+        assert (len(entry.chunks), entry.view) == (3, None)
+        assert entry.size == sum(int(frame(n).memory_usage(deep=True).sum()) for n in (2, 3, 4))
+
+        data = store.get("data", state)
+        assert store.get("data", state) is data
+        assert entry.chunks == [data]
+        assert list(data["Umidade"]) == [1.0] * 2 + [2.0] * 3 + [3.0] * 4
+
+    def test_append_to_empty_or_missing_frame(self, tmp_path):
+        """Teste: append sem frame ou após clear guarda só a página"""
+        store = SessionFrameStore(spill_dir=str(tmp_path))
+        state = {}
+        store.append("data", frame(2), state)
+        store.clear("act_data", state)
+        store.append("act_data", frame(3), state)
+        store.append("act_data", pd.DataFrame(), state)
+
+        pd.testing.assert_frame_equal(store.get("data", state), frame(2))
+        pd.testing.assert_frame_equal(store.get("act_data", state), frame(3))
+
+    def test_append_to_spilled_frame(self, tmp_path):
+        """Teste: append num frame que foi para o disco relê os blocos e continua"""
+        store = SessionFrameStore(session_bytes=int(SIZE * 1.5), spill_dir=str(tmp_path))
+        state = {}
+        store.set("data", frame(500), state)
+        store.append("data", frame(500, 2.0), state)
+        store.set("act_data", frame(1000, 3.0), state)
+        assert store.frames(state)._entries["data"].chunks is None
+
+        store.append("data", frame(10, 4.0), state)
+        data = store.get("data", state)
+
+        assert store.reloads == 1
+        assert len(data) == 1010
+        assert list(data.index) == list(range(1010))
+        assert data["Umidade"].iloc[-1] == 4.0
+
+    def test_session_budget_spills_coldest_frame(self, tmp_path):
+        """Teste: acima do limite da sessão o frame menos usado vai para o disco"""
+        store = SessionFrameStore(session_bytes=int(SIZE * 1.5), spill_dir=str(tmp_path))
+        state = {}
+        store.set("data", frame(1000), state)
+        store.set("act_data", frame(1000, 2.0), state)
+
+        stats = store.stats(state)
+        assert stats["session_bytes"] == SIZE
+        assert stats["session_spilled_bytes"] == SIZE
+        assert store.spills == 1
+
+    def test_spilled_frame_is_reloaded(self, tmp_path):
+        """Teste: ler o frame do disco devolve o mesmo conteúdo e despeja o outro"""
+        store = SessionFrameStore(session_bytes=int(SIZE * 1.5), spill_dir=str(tmp_path))
+        state = {}
+        store.set("data", frame(1000), state)
+        store.set("act_data", frame(1000, 2.0), state)
+
+        pd.testing.assert_frame_equal(store.get("data", state), frame(1000))
+        assert store.reloads == 1
+        assert store.stats(state)["session_spilled_bytes"] == SIZE
+
+    def test_cache_stats_by_frame_name(self, tmp_path):
+        """Teste: leitura em memória é acerto, releitura do disco é falta, despejo é remoção"""
+        store = SessionFrameStore(session_bytes=int(SIZE * 1.5), spill_dir=str(tmp_path))
+        state = {}
+        store.set("data", frame(1000), state)
+        store.set("act_data", frame(1000, 2.0), state)
+        store.get("act_data", state)
+        store.get("data", state)
+
+        stats = store.cache_stats()
+        assert stats["by_key"]["act_data"]["hits"] == 1
+        assert stats["by_key"]["data"]["misses"] == 1
+        assert stats["evictions"] == 2
+        assert (stats["entries"], stats["bytes"]) == (1, SIZE)
+
+    def test_global_budget_evicts_across_sessions(self, tmp_path):
+        """Teste: o limite do processo despeja o frame mais frio de outra sessão"""
+        store = SessionFrameStore(total_bytes=int(SIZE * 1.5), spill_dir=str(tmp_path))
+        idle, active = {}, {}
+        store.set("data", frame(1000), idle)
+        store.set("data", frame(1000, 2.0), active)
+
+        assert store.stats(idle)["session_spilled_bytes"] == SIZE
+        assert store.stats(active)["session_bytes"] == SIZE
+        assert store.resident_bytes() == SIZE
+
+    def test_closed_session_releases_memory_and_files(self, tmp_path):
+        """Teste: sessão encerrada some da contagem e seus arquivos são apagados"""
+        store = SessionFrameStore(session_bytes=int(SIZE * 1.5), spill_dir=str(tmp_path))
+        state = {}
+        store.set("data", frame(1000), state)
+        store.set("act_data", frame(1000, 2.0), state)
+        spill_dir = store._spill_dir
+        assert os.listdir(spill_dir)
+
+        state.clear()
+        gc.collect()
+
+        assert store.resident_bytes() == 0
+        assert os.listdir(spill_dir) == []
+
+    def test_lost_file_returns_empty(self, tmp_path):
+        """Teste: arquivo perdido vira DataFrame vazio (a tela busca de novo)"""
+        store = SessionFrameStore(session_bytes=int(SIZE * 1.5), spill_dir=str(tmp_path))
+        state = {}
+        store.set("data", frame(1000), state)
+        store.set("act_data", frame(1000, 2.0), state)
+        for name in os.listdir(store._spill_dir):
+            os.remove(os.path.join(store._spill_dir, name))
+
+        assert store.get("data", state).empty
@@ -0,0 +1,96 @@
+"""
+Testes unitários para o repositório de estações e sensores (src/stations_repository.py)
+- Uma busca por lista em um rerun com várias telas
+- Índices por id e por controlador
+"""
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import streamlit as st
+
+from src import stations_repository as repo
+from src.ui_components import CacheManager
+
+STATIONS = [
+    {"id": 1, "name": "Estação 1", "controllerId": 3},
+    {"id": 2, "name": "Estação 2", "controllerId": 3},
+    {"id": 4, "name": "Estação 4", "controllerId": 5},
+    {"id": 6, "name": "Estação 6"},
+]
+ROUTES = {
+    "/api/monitoring-stations": STATIONS,
+    "/api/monitoring-stations/1/sensors": [{"id": 10}, {"id": 11}],
+}
+
+
+def fake_backend(calls):
+    """api_request falso: responde pelas rotas e registra cada GET."""
+    def request(method, endpoint, token=None, **kwargs):
+        calls.append((method, endpoint))
+        return Mock(status_code=200, json=Mock(return_value=list(ROUTES.get(endpoint, []))))
+    return patch('src.stations_repository.api_request', side_effect=request)
+
+
+class TestStationsRepository:
+    """Testes do repositório de estações e sensores"""
+
+    def setup_method(self):
+        repo.reference_cache.clear()
+        self.calls = []
+        self.patches = [
+            patch('api.token_scope', side_effect=lambda token: "admin" if token else None),
+            patch.object(st, 'session_state', {"token": "token-a"}),
+            fake_backend(self.calls),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        for p in reversed(self.patches):
+            p.stop()
+        repo.reference_cache.clear()
+
+    def test_rerun_fetches_each_list_once(self):
+        """Teste: Dashboard, Medições e Relatórios no mesmo rerun fazem um GET por lista"""
+        from src import dashboard, measurement_reports, measurements
+
+        estacao_id, _ = measurement_reports.selecionar_estacao()
+        measurement_reports.selecionar_sensores_multiplos(estacao_id)
+        measurements.selecionar_estacao()
+        measurements.selecionar_sensor(estacao_id)
+        dashboard.obter_estacoes_cadastradas()
+        assert dashboard.obter_sensores_por_estacao(estacao_id) == [10, 11]
+
+        assert estacao_id == 1
+        assert sorted(self.calls) == [
+            ("GET", "/api/monitoring-stations"),
+            ("GET", "/api/monitoring-stations/1/sensors"),
+        ]
+
+    def test_mutation_invalidates_repository_lists(self):
+        """Teste: após invalidar as estações, a próxima leitura vai ao backend"""
+        repo.list_stations("token-a")
+        CacheManager(repo.reference_cache).invalidate_cache("stations")
+        repo.list_stations("token-a")
+
+        assert self.calls.count(("GET", "/api/monitoring-stations")) == 2
+
+    def test_station_indexes(self):
+        """Teste: estação por id e estações por controlador"""
+        assert repo.get_station("token-a", "4")["name"] == "Estação 4"
+        assert repo.get_station("token-a", 99) is None
+        assert [s["id"] for s in repo.stations_by_controller("token-a", 3)] == [1, 2]
+        assert repo.stations_by_controller("token-a", 7) == []
+
+    def test_index_reused_until_list_changes(self):
+        """Teste: o índice é montado uma vez por lista guardada"""
+        first = repo.station_index("token-a")
+        assert repo.station_index("token-a") is first
+
+        repo.reference_cache.clear()
+        assert repo.station_index("token-a") is not first
+        assert self.calls.count(("GET", "/api/monitoring-stations")) == 2